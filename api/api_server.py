@@ -0,0 +1,178 @@
+# api/api_server.py
+"""
+WebSocket streaming-audio endpoint for remote voice clients.
+
+    python -m api.api_server --model-family LR
+    python -m api.ws_client recordings/*.wav      # replay WAV files against it
+
+Protocol (one utterance stream per connection):
+
+    client → server   binary frames : raw 16 kHz mono int16 PCM, any chunk size
+                      text  {"type": "eof"}  : end of audio, flush and close
+    server → client   {"type": "ready",   "session": id}
+                      {"type": "partial", "text": ...}
+                      {"type": "final",   "text": ...}
+                      {"type": "intent",  "text": ..., "intent": ..., "intents": [...], "params": {...},
+                       "confidence": ..., "latency_ms": ...}
+                      {"type": "error",   "message": ...}
+                      {"type": "closed"}
+
+All connections share one asyncio loop. Decoding runs on the
+VoskSessionManager worker threads (one loaded model, one pooled recognizer
+per connection) and intent prediction on a small thread pool, so the loop
+only moves bytes. A connection whose audio is not decoded fast enough
+stops being read (TCP backpressure) instead of buffering without bound.
+"""
+
+import json
+import time
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from core import config
+from core import metrics
+from core.logger import log, request_scope
+from io_layer.vosk_sessions import VoskSessionManager, SessionLimitReached
+
+CONNECTIONS = metrics.registry.counter(
+    "intentiq_api_connections_total", "WebSocket connections by outcome (ok, rejected, error).", ("outcome",)
+)
+
+
+class StreamingServer:
+
+    def __init__(self, recognizer, sessions):
+        self.recognizer = recognizer
+        self.sessions = sessions
+        self._predict_pool = ThreadPoolExecutor(max_workers=config.API_INTENT_WORKERS,
+                                                thread_name_prefix="api-intent")
+
+    # ------------------------------------------------------------
+    # Per-connection
+    # ------------------------------------------------------------
+    async def _send_events(self, websocket, events):
+        # Single writer per socket: keeps partial/final/intent in order
+        loop = asyncio.get_running_loop()
+        while True:
+            event = await events.get()
+            if event["type"] == "closed":
+                await websocket.send(json.dumps({"type": "closed"}))
+                return
+
+            await websocket.send(json.dumps(event))
+
+            if event["type"] == "final" and self.recognizer is not None:
+                start = time.perf_counter()
+                parsed = await loop.run_in_executor(self._predict_pool, self._predict, event["text"])
+                probs = parsed["probs"]
+                await websocket.send(json.dumps({
+                    "type": "intent",
+                    "text": event["text"],
+                    "intent": parsed["intent"],
+                    "intents": parsed["intents"],
+                    "params": parsed["params"],
+                    "confidence": float(max(probs)) if probs is not None else None,
+                    "latency_ms": (time.perf_counter() - start) * 1000,
+                }))
+
+    def _predict(self, text):
+        with request_scope():
+            return self.recognizer.parse(text)
+
+    async def handle(self, websocket):
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+
+        def on_result(session_id, event):
+            # Called on a decode worker thread
+            loop.call_soon_threadsafe(events.put_nowait, event)
+
+        try:
+            session = self.sessions.open_session(on_result=on_result, partials=True)
+        except SessionLimitReached as e:
+            CONNECTIONS.inc(outcome="rejected")
+            await websocket.send(json.dumps({"type": "error", "message": str(e)}))
+            await websocket.close(code=1013, reason="server busy")
+            return
+
+        log.info("[API] Session %s opened from %s", session.id, websocket.remote_address)
+        await websocket.send(json.dumps({"type": "ready", "session": session.id}))
+        sender = asyncio.create_task(self._send_events(websocket, events))
+
+        outcome = "ok"
+        try:
+            async for message in websocket:
+                if isinstance(message, bytes):
+                    session.feed(message)
+                    while session.pending() > config.API_MAX_PENDING_CHUNKS:
+                        await asyncio.sleep(0.01)
+                    continue
+
+                try:
+                    command = json.loads(message)
+                except ValueError:
+                    command = {}
+                if command.get("type") == "eof":
+                    break
+                await websocket.send(json.dumps({"type": "error", "message": f"unknown message: {message[:100]}"}))
+        except Exception as e:
+            outcome = "error"
+            log.warn("[API] Session %s receive failed: %s", session.id, e)
+        finally:
+            # Flushes the final transcript; the "closed" event ends the sender
+            self.sessions.close_session(session.id)
+
+        try:
+            await sender
+        except Exception as e:
+            outcome = "error"
+            log.warn("[API] Session %s send failed: %s", session.id, e)
+
+        CONNECTIONS.inc(outcome=outcome)
+        log.info("[API] Session %s closed (%s)", session.id, outcome)
+
+    def close(self):
+        self._predict_pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def serve(host, port, server):
+    from websockets.asyncio.server import serve as ws_serve
+
+    async with ws_serve(server.handle, host, port, max_size=2 ** 20) as ws:
+        log.info(f"[API] Listening on ws://{host}:{port}")
+        await ws.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="IntentIQ WebSocket streaming-audio server")
+    parser.add_argument("--host", default=config.API_HOST)
+    parser.add_argument("--port", type=int, default=config.API_PORT)
+    parser.add_argument("--model-family", default=config.DEFAULT_MODEL_FAMILY)
+    parser.add_argument("--model-version", default=config.DEFAULT_MODEL_VERSION)
+    parser.add_argument("--no-intent", action="store_true", help="Transcripts only")
+    args = parser.parse_args(argv)
+
+    if config.METRICS_PORT:
+        metrics.start_http_server(config.METRICS_PORT)
+
+    recognizer = None
+    if not args.no_intent:
+        from intent_system.intent_recognizer import IntentRecognizer
+        recognizer = IntentRecognizer(model_type=args.model_family, version=args.model_version)
+        recognizer.warmup()
+
+    sessions = VoskSessionManager()
+    server = StreamingServer(recognizer, sessions)
+    try:
+        asyncio.run(serve(args.host, args.port, server))
+    except KeyboardInterrupt:
+        print("\n[API] Interrupted.")
+    finally:
+        server.close()
+        sessions.shutdown()
+        log.info("[API] Clean exit.")
+
+
+if __name__ == "__main__":
+    main()
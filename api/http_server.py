@@ -0,0 +1,135 @@
+# api/http_server.py
+"""
+Minimal JSON-over-HTTP text endpoint (the load-test target for remote runs).
+
+    python -m api.http_server --model-family LR         # http://127.0.0.1:8080
+
+    POST /parse    {"text": "what time is it in Sydney"}
+                → {"intent": ..., "intents": [...], "params": {...},
+                   "confidence": ..., "latency_ms": ...}
+    GET  /health   {"status": "ok", "model": "LR", "version": "2"}
+    GET  /metrics  Prometheus text (same registry as core/metrics.py)
+
+One stdlib ThreadingHTTPServer, one thread per connection, HTTP/1.1
+keep-alive, all threads sharing one IntentRecognizer.
+"""
+
+import json
+import time
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core import config
+from core import metrics
+from core.logger import log, request_scope
+
+HTTP_REQUESTS = metrics.registry.counter(
+    "intentiq_http_requests_total", "HTTP API requests by path and status code.", ("path", "status")
+)
+_PATHS = ("/parse", "/health", "/metrics")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; with Nagle on, keep-alive clients wait out delayed ACKs (~40 ms)
+    disable_nagle_algorithm = True
+    recognizer = None
+
+    def _send(self, status, body, content_type="application/json"):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        path = self.path.split("?")[0]
+        HTTP_REQUESTS.inc(path=path if path in _PATHS else "other", status=status)
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/health":
+            self._send(200, {
+                "status": "ok",
+                "model": self.recognizer.model_type,
+                "version": self.recognizer.version,
+            })
+        elif path == "/metrics":
+            self._send(200, metrics.registry.render().encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8")
+        else:
+            self._send(404, {"error": f"unknown path {path}"})
+
+    def do_POST(self):
+        if self.path.split("?")[0] != "/parse":
+            self._send(404, {"error": f"unknown path {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            text = str(json.loads(self.rfile.read(length) or b"{}").get("text", "")).strip()
+        except (ValueError, AttributeError):
+            self._send(400, {"error": "body must be JSON {\"text\": ...}"})
+            return
+        if not text:
+            self._send(400, {"error": "empty text"})
+            return
+
+        start = time.perf_counter()
+        try:
+            with request_scope():
+                parsed = self.recognizer.parse(text)
+        except Exception as e:
+            log.error("[HTTP] Prediction failed: %s", e)
+            self._send(500, {"error": str(e)})
+            return
+
+        probs = parsed["probs"]
+        self._send(200, {
+            "intent": parsed["intent"],
+            "intents": parsed["intents"],
+            "params": parsed["params"],
+            "confidence": float(max(probs)) if probs is not None else None,
+            "latency_ms": (time.perf_counter() - start) * 1000,
+        })
+
+    def log_message(self, format, *args):
+        # One line per request would dominate the cost under load
+        pass
+
+
+def start_server(recognizer, host=None, port=None):
+    """Builds the server (not yet serving). port=0 picks a free port."""
+    host = config.API_HOST if host is None else host
+    port = config.API_HTTP_PORT if port is None else port
+
+    handler = type("Handler", (_Handler,), {"recognizer": recognizer})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="IntentIQ JSON text API")
+    parser.add_argument("--host", default=config.API_HOST)
+    parser.add_argument("--port", type=int, default=config.API_HTTP_PORT)
+    parser.add_argument("--model-family", default=config.DEFAULT_MODEL_FAMILY)
+    parser.add_argument("--model-version", default=config.DEFAULT_MODEL_VERSION)
+    args = parser.parse_args(argv)
+
+    from intent_system.intent_recognizer import IntentRecognizer
+    recognizer = IntentRecognizer(model_type=args.model_family, version=args.model_version)
+    recognizer.warmup()
+
+    server = start_server(recognizer, args.host, args.port)
+    log.info(f"[HTTP] Serving {recognizer.model_type} v{recognizer.version} on "
+             f"http://{args.host}:{server.server_port}/parse")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[HTTP] Interrupted.")
+    finally:
+        server.server_close()
+        log.info("[HTTP] Clean exit.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# api/ws_client.py
+"""
+Replays WAV files against the WebSocket server (api/api_server.py), one
+connection per file, all concurrently.
+
+    python -m api.ws_client recordings/*.wav
+    python -m api.ws_client recordings/*.wav --url ws://host:8765 --realtime --quiet
+"""
+
+import json
+import time
+import asyncio
+import argparse
+
+from core import config
+from io_layer.audio_utils import iter_wav_chunks
+
+
+async def stream_file(url, path, chunk_frames=4000, realtime=False, quiet=False):
+    """Streams one WAV file; returns its final transcripts, intents and end-of-audio latency."""
+    from websockets.asyncio.client import connect
+
+    result = {"path": path, "finals": [], "intents": [], "latency_ms": None}
+    chunk_seconds = chunk_frames / 16000
+
+    async with connect(url, max_size=2 ** 20) as ws:
+        ready = json.loads(await ws.recv())
+        if ready.get("type") != "ready":
+            raise RuntimeError(f"{path}: server refused the stream: {ready}")
+
+        async def send_audio():
+            for chunk in iter_wav_chunks(path, chunk_frames):
+                await ws.send(chunk)
+                if realtime:
+                    await asyncio.sleep(chunk_seconds)
+            await ws.send(json.dumps({"type": "eof"}))
+            return time.perf_counter()
+
+        sender = asyncio.create_task(send_audio())
+        async for message in ws:
+            event = json.loads(message)
+            kind = event["type"]
+            if kind == "final":
+                result["finals"].append(event["text"])
+            elif kind == "intent":
+                result["intents"].append(event["intent"])
+            elif kind == "error":
+                print(f"[Client] {path}: error: {event['message']}")
+            elif kind == "closed":
+                break
+
+            if not quiet and kind != "partial":
+                print(f"[Client] {path}: {kind}: {event.get('intent') or event.get('text')}")
+
+        eof_at = await sender
+        result["latency_ms"] = (time.perf_counter() - eof_at) * 1000
+
+    return result
+
+
+async def replay(url, paths, chunk_frames, realtime, quiet):
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(stream_file(url, p, chunk_frames, realtime, quiet) for p in paths),
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - start
+
+    ok = [r for r in results if isinstance(r, dict)]
+    for path, r in zip(paths, results):
+        if isinstance(r, Exception):
+            print(f"[Client] {path}: failed: {r}")
+        else:
+            print(f"[Client] {path}: '{' '.join(r['finals'])}' → {', '.join(r['intents']) or '-'} "
+                  f"(final {r['latency_ms']:.0f}ms after end of audio)")
+
+    if ok:
+        avg = sum(r["latency_ms"] for r in ok) / len(ok)
+        print(f"\n[Client] {len(ok)}/{len(paths)} streams ok in {elapsed:.2f}s, "
+              f"avg end-of-audio → closed {avg:.0f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay WAV files over the streaming WebSocket API")
+    parser.add_argument("wav", nargs="+", help="16 kHz mono int16 WAV files")
+    parser.add_argument("--url", default=f"ws://{config.API_HOST}:{config.API_PORT}")
+    parser.add_argument("--chunk-frames", type=int, default=4000)
+    parser.add_argument("--realtime", action="store_true", help="Pace chunks like a live microphone")
+    parser.add_argument("--quiet", action="store_true", help="Only print the summary")
+    args = parser.parse_args(argv)
+
+    asyncio.run(replay(args.url, args.wav, args.chunk_frames, args.realtime, args.quiet))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# benchmarks/bench_utils.py
+"""
+Timing / memory helpers shared by the benchmark suite.
+"""
+
+import os
+import gc
+import sys
+import time
+import platform
+import statistics
+import tracemalloc
+
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "TOKENIZERS_PARALLELISM",
+)
+
+
+# ================================================================
+# Thread pinning
+# ================================================================
+def pin_threads(n_threads):
+    """
+    Must be called BEFORE numpy / torch / sklearn are imported, otherwise
+    the BLAS pools are already sized and the env vars are ignored.
+    """
+    for var in THREAD_ENV_VARS:
+        if var == "TOKENIZERS_PARALLELISM":
+            os.environ[var] = "false"
+        else:
+            os.environ[var] = str(n_threads)
+
+
+def pin_runtime_threads(n_threads):
+    # Runtime pools that can still be resized after import
+    try:
+        import torch
+        torch.set_num_threads(n_threads)
+    except Exception:
+        pass
+
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(limits=n_threads)
+    except Exception:
+        pass
+
+
+# ================================================================
+# Memory
+# ================================================================
+def current_rss_mb():
+    # /proc is exact on Linux, resource.ru_maxrss is the fallback (peak only)
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def peak_rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS reports bytes, Linux reports kilobytes
+        return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+    except Exception:
+        return 0.0
+
+
+def measure_memory(fn):
+    """
+    Runs fn once under tracemalloc and returns (result, memory stats).
+    Kept separate from timing because tracemalloc slows allocation down.
+    Note: tracemalloc only sees Python-level allocations, native buffers
+    (torch / BLAS) show up in the RSS delta instead.
+    """
+    gc.collect()
+    rss_before = current_rss_mb()
+
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, {
+        "tracemalloc_peak_mb": round(peak / (1024.0 * 1024.0), 3),
+        "rss_delta_mb": round(current_rss_mb() - rss_before, 3),
+        "rss_peak_mb": round(peak_rss_mb(), 3),
+    }
+
+
+# ================================================================
+# Timing
+# ================================================================
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(samples_ns, items_per_call=1):
+    ms = sorted(s / 1e6 for s in samples_ns)
+    median = statistics.median(ms)
+    return {
+        "runs": len(ms),
+        "min_ms": round(ms[0], 4),
+        "median_ms": round(median, 4),
+        "mean_ms": round(statistics.fmean(ms), 4),
+        "p95_ms": round(_percentile(ms, 95), 4),
+        "max_ms": round(ms[-1], 4),
+        "stdev_ms": round(statistics.stdev(ms), 4) if len(ms) > 1 else 0.0,
+        "items_per_sec": round(items_per_call / (median / 1000.0), 2) if median else 0.0,
+    }
+
+
+def latency_summary(values_ms):
+    """Tail-oriented summary for load tests (many samples, the high percentiles matter)."""
+    ms = sorted(values_ms)
+    if not ms:
+        return {"count": 0}
+    return {
+        "count": len(ms),
+        "mean_ms": round(statistics.fmean(ms), 4),
+        "p50_ms": round(_percentile(ms, 50), 4),
+        "p90_ms": round(_percentile(ms, 90), 4),
+        "p99_ms": round(_percentile(ms, 99), 4),
+        "p999_ms": round(_percentile(ms, 99.9), 4),
+        "max_ms": round(ms[-1], 4),
+    }
+
+
+def time_call(fn, repeat=20, warmup=3, items_per_call=1):
+    for _ in range(warmup):
+        fn()
+
+    # GC pauses are noise for micro-benchmarks
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    samples = []
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            fn()
+            samples.append(time.perf_counter_ns() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return summarize(samples, items_per_call)
+
+
+def environment_info(n_threads):
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "threads": n_threads,
+    }
+
+    for mod in ("numpy", "sklearn", "torch", "sentence_transformers"):
+        try:
+            info[mod] = __import__(mod).__version__
+        except Exception:
+            info[mod] = None
+
+    return info
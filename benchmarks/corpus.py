@@ -0,0 +1,59 @@
+# benchmarks/corpus.py
+"""
+Fixed benchmark corpora drawn from dataset/*.csv.
+
+Every run samples the same sentences in the same order (seeded shuffle over
+sorted rows), so timings from different machines / commits are comparable.
+"""
+
+import os
+import csv
+import random
+
+from core import config
+
+DEFAULT_SEED = 1234
+DEFAULT_SIZE = 256
+
+
+def _read_text_intent_csv(path):
+    rows = []
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        if not reader.fieldnames or "text" not in reader.fieldnames:
+            return rows
+
+        for row in reader:
+            text = (row.get("text") or "").strip()
+            if text:
+                rows.append((text, (row.get("intent") or "").strip()))
+    return rows
+
+
+def available_corpora():
+    # Only datasets with the standard (text, intent) layout are used
+    names = []
+    for f in sorted(os.listdir(config.DATASET_DIR)):
+        if f.endswith(".csv") and _read_text_intent_csv(os.path.join(config.DATASET_DIR, f)):
+            names.append(f)
+    return names
+
+
+def load_corpus(size=DEFAULT_SIZE, seed=DEFAULT_SEED, datasets=None):
+    """
+    Returns a list of (text, intent) tuples of exactly `size` entries.
+    Small datasets are cycled so batch sizes stay fixed across runs.
+    """
+    datasets = datasets or available_corpora()
+
+    rows = []
+    for name in sorted(datasets):
+        rows.extend(_read_text_intent_csv(os.path.join(config.DATASET_DIR, name)))
+
+    if not rows:
+        raise FileNotFoundError(f"[BENCH] No (text, intent) rows found in {config.DATASET_DIR}")
+
+    rows.sort()
+    random.Random(seed).shuffle(rows)
+
+    return [rows[i % len(rows)] for i in range(size)]
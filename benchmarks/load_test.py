@@ -0,0 +1,564 @@
+# benchmarks/load_test.py
+"""
+Load generator: replays traffic against an in-process IntentRecognizer or
+the HTTP API (api/http_server.py) and reports the latency distribution,
+achieved QPS and CPU / RSS over time.
+
+Usage (from the project root):
+    python -m benchmarks.load_test run --model-family LR --clients 8 --duration 30
+    python -m benchmarks.load_test run --rate 200 --duration 60 --model-family SVC
+    python -m benchmarks.load_test run --target http://127.0.0.1:8080 --rate 100 --server-pid 4242
+    python -m benchmarks.load_test run --traffic traffic.jsonl --replay-timing --speed 2
+    python -m benchmarks.load_test compare results/load_a.json results/load_b.json
+
+Traffic is a JSONL file (one request per line: a string, or an object whose
+text is "text", "query", "utterance", "title" or "body", optionally with a
+numeric "ts" in seconds) replayed in file order, or a seeded sample of
+dataset/*.csv (benchmarks/corpus.py). Requests are cycled until the
+duration / request count is reached.
+
+Modes:
+    closed loop (--clients N)  N clients, each sends its next request when
+                               the previous one returns
+    open loop   (--rate R)     requests scheduled at R/s (--poisson: random
+                               gaps; --replay-timing: the file's "ts" gaps)
+                               whether or not earlier ones have completed
+
+Coordinated omission: when the system stalls, a closed-loop client (or a
+lagging dispatcher) sends fewer requests, so the slow period is
+under-sampled and the percentiles look better than what users see.
+"corrected" latencies fix this: open loop measures from the scheduled send
+time instead of the actual one; closed loop back-fills the requests a
+client would have sent during a stall at the expected interval
+(HdrHistogram's recordValueWithExpectedInterval; default: median service
+time). "service" latencies are the uncorrected send → response times.
+
+The in-process target never journals; start an HTTP target with
+INTENTIQ_JOURNAL=0 so replayed traffic stays out of its prediction journal.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import datetime
+import itertools
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+from core import config
+from benchmarks import bench_utils
+from benchmarks.corpus import load_corpus, DEFAULT_SEED
+from benchmarks.run_benchmarks import RESULTS_DIR
+
+TEXT_FIELDS = ("text", "query", "utterance", "title", "body")
+
+
+# ================================================================
+# Traffic
+# ================================================================
+def load_traffic(path=None, size=1024, seed=DEFAULT_SEED):
+    """
+    Returns (texts, timestamps). timestamps is a list of seconds when every
+    JSONL record carries a numeric "ts", else None.
+    """
+    if path is None or path.endswith(".csv"):
+        datasets = [os.path.abspath(path)] if path else None
+        return [t for t, _ in load_corpus(size=size, seed=seed, datasets=datasets)], None
+
+    texts, timestamps = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+
+            record = json.loads(line)
+            if isinstance(record, str):
+                record = {"text": record}
+            text = next((str(record[k]).strip() for k in TEXT_FIELDS if str(record.get(k) or "").strip()), "")
+            if not text:
+                continue
+
+            texts.append(text)
+            ts = record.get("ts")
+            timestamps.append(float(ts) if isinstance(ts, (int, float)) else None)
+
+    if not texts:
+        raise ValueError(f"[LOAD] No request text found in {path} (fields: {', '.join(TEXT_FIELDS)})")
+    if any(ts is None for ts in timestamps):
+        timestamps = None
+    return texts, timestamps
+
+
+# ================================================================
+# Targets
+# ================================================================
+class InProcessTarget:
+    """Calls IntentRecognizer.parse() directly; the generator shares the process."""
+
+    def __init__(self, model_family, version=None):
+        from intent_system.intent_recognizer import IntentRecognizer
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.recognizer = IntentRecognizer(model_type=model_family, version=version)
+        self.recognizer.warmup()
+
+        self.pid = os.getpid()
+        self.info = {"target": "inproc", "model": model_family, "version": self.recognizer.version}
+
+    def __call__(self, text):
+        self.recognizer.parse(text, journal=False)
+
+    def close(self):
+        pass
+
+
+class HttpTarget:
+    """POSTs {"text": ...} to /parse; one keep-alive connection per generator thread."""
+
+    def __init__(self, url, timeout=30.0, pid=None):
+        from urllib.parse import urlsplit
+
+        parts = urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.path = parts.path if parts.path not in ("", "/") else "/parse"
+        self.timeout = timeout
+        self.pid = pid
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+        self.info = {"target": url}
+        try:
+            health = self._request("GET", "/health")
+            self.info.update(model=health.get("model"), version=health.get("version"))
+        except Exception as e:
+            print(f"[LOAD] {url}/health unavailable ({e}), model version not recorded")
+
+    def _connection(self):
+        import http.client
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _request(self, method, path, payload=None):
+        conn = self._connection()
+        body = json.dumps(payload) if payload is not None else None
+        try:
+            conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            data = response.read()
+        except Exception:
+            # Reconnects on the next request
+            conn.close()
+            raise
+
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}")
+        return json.loads(data)
+
+    def __call__(self, text):
+        self._request("POST", self.path, {"text": text})
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+
+
+# ================================================================
+# Resource sampling
+# ================================================================
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _cpu_seconds(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # Fields after the parenthesised command name; utime / stime are 14 and 15
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+    except (OSError, IndexError, ValueError):
+        if pid == os.getpid():
+            t = os.times()
+            return t.user + t.system
+        return None
+
+
+def _rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return bench_utils.current_rss_mb() if pid == os.getpid() else None
+
+
+class ResourceSampler(threading.Thread):
+    """
+    Samples CPU (% of one core, so >100 on several cores) and RSS of a
+    process every `interval` seconds.
+    """
+
+    def __init__(self, pid, interval=1.0):
+        super().__init__(name="load-resources", daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        t0 = last_t = time.perf_counter()
+        last_cpu = _cpu_seconds(self.pid)
+
+        while not self._stop_event.wait(self.interval):
+            now, cpu = time.perf_counter(), _cpu_seconds(self.pid)
+            rss = _rss_mb(self.pid)
+            sample = {"t": round(now - t0, 3), "rss_mb": round(rss, 1) if rss is not None else None}
+            if cpu is not None and last_cpu is not None:
+                sample["cpu_percent"] = round(100.0 * (cpu - last_cpu) / (now - last_t), 1)
+            self.samples.append(sample)
+            last_t, last_cpu = now, cpu
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        return self.samples
+
+
+# ================================================================
+# Load generation
+# ================================================================
+def _issue(target, text, intended, samples):
+    start = time.perf_counter()
+    error = None
+    try:
+        target(text)
+    except Exception as e:
+        error = type(e).__name__ if not str(e) else f"{type(e).__name__}: {e}"[:120]
+    # list.append is atomic; samples are only read after all workers finish
+    samples.append((intended, start, time.perf_counter(), error))
+
+
+def run_closed_loop(target, texts, clients, duration, max_requests=None):
+    samples = []
+    counter = itertools.count()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        while True:
+            i = next(counter)
+            now = time.perf_counter()
+            if (max_requests and i >= max_requests) or now >= deadline:
+                return
+            _issue(target, texts[i % len(texts)], now, samples)
+
+    threads = [threading.Thread(target=client, name=f"load-client-{n}") for n in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples
+
+
+def _arrival_offsets(rate, poisson=False, seed=DEFAULT_SEED, timestamps=None, speed=1.0):
+    """Scheduled send times in seconds from the start of the run."""
+    if timestamps:
+        first = timestamps[0]
+        for ts in timestamps:
+            yield max(0.0, ts - first) / speed
+        return
+
+    rng = random.Random(seed)
+    offset = 0.0
+    while True:
+        yield offset
+        offset += rng.expovariate(rate) if poisson else 1.0 / rate
+
+
+def run_open_loop(target, texts, offsets, duration, max_in_flight, max_requests=None):
+    samples = []
+    pool = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="load-worker")
+    t0 = time.perf_counter()
+
+    for i, offset in enumerate(offsets):
+        if (max_requests and i >= max_requests) or offset >= duration:
+            break
+
+        intended = t0 + offset
+        delay = intended - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        # A saturated pool queues the request; its wait counts against it
+        pool.submit(_issue, target, texts[i % len(texts)], intended, samples)
+
+    pool.shutdown(wait=True)
+    return samples
+
+
+def _backfill(latencies_ms, interval_ms):
+    """Adds the requests a closed-loop client skipped while waiting on slow ones."""
+    if interval_ms <= 0:
+        return list(latencies_ms)
+
+    corrected = []
+    for latency in latencies_ms:
+        corrected.append(latency)
+        missing = latency - interval_ms
+        while missing >= interval_ms:
+            corrected.append(missing)
+            missing -= interval_ms
+    return corrected
+
+
+def _timeline(samples, t0, window):
+    """Per-window completions, errors, QPS and service latency percentiles."""
+    buckets = {}
+    for intended, start, end, error in samples:
+        buckets.setdefault(int((end - t0) // window), []).append(((end - start) * 1000, error))
+
+    timeline = []
+    for index in range(max(buckets) + 1 if buckets else 0):
+        entries = buckets.get(index, [])
+        latencies = [ms for ms, error in entries if error is None]
+        stats = bench_utils.latency_summary(latencies)
+        timeline.append({
+            "t": round((index + 1) * window, 3),
+            "completed": len(entries),
+            "errors": len(entries) - len(latencies),
+            "qps": round(len(entries) / window, 2),
+            "p50_ms": stats.get("p50_ms"),
+            "p99_ms": stats.get("p99_ms"),
+        })
+    return timeline
+
+
+def summarize_run(samples, mode, window=1.0, expected_interval_ms=None):
+    samples = sorted(samples, key=lambda s: s[0])
+    if not samples:
+        return {"summary": {"requests": 0}, "latency": {}, "timeline": []}
+
+    t0 = samples[0][0]
+    elapsed = max(s[2] for s in samples) - t0
+    ok = [s for s in samples if s[3] is None]
+    errors = {}
+    for s in samples:
+        if s[3] is not None:
+            errors[s[3]] = errors.get(s[3], 0) + 1
+
+    service = [(end - start) * 1000 for _, start, end, _ in ok]
+    if mode == "open":
+        corrected = [(end - intended) * 1000 for intended, _, end, _ in ok]
+        interval = None
+    else:
+        interval = expected_interval_ms or bench_utils.latency_summary(service).get("p50_ms", 0.0)
+        corrected = _backfill(service, interval)
+
+    lag = [(start - intended) * 1000 for intended, start, _, _ in samples]
+    return {
+        "summary": {
+            "requests": len(samples),
+            "errors": len(samples) - len(ok),
+            "error_types": errors,
+            "elapsed_s": round(elapsed, 3),
+            "achieved_qps": round(len(ok) / elapsed, 2) if elapsed > 0 else 0.0,
+            "max_send_lag_ms": round(max(lag), 3),
+        },
+        "latency": {
+            "service": bench_utils.latency_summary(service),
+            "corrected": bench_utils.latency_summary(corrected),
+            "expected_interval_ms": round(interval, 4) if interval is not None else None,
+        },
+        "timeline": _timeline(samples, t0, window),
+    }
+
+
+# ================================================================
+# Commands
+# ================================================================
+def run(args):
+    if args.threads:
+        bench_utils.pin_threads(args.threads)
+    # Replayed traffic stays out of the prediction journal (and its enqueue cost out of the timings)
+    config.JOURNAL_ENABLED = False
+
+    texts, timestamps = load_traffic(args.traffic, size=args.corpus_size, seed=args.seed)
+    if args.replay_timing and not timestamps:
+        print("[LOAD] --replay-timing needs a numeric 'ts' on every JSONL record")
+        return 2
+
+    if args.target == "inproc":
+        target = InProcessTarget(args.model_family, args.model_version)
+        if args.threads:
+            bench_utils.pin_runtime_threads(args.threads)
+    else:
+        target = HttpTarget(args.target, timeout=args.timeout, pid=args.server_pid)
+
+    open_loop = args.rate is not None or args.replay_timing
+    mode = "open" if open_loop else "closed"
+    print(f"[LOAD] {len(texts)} distinct requests, target {target.info}, {mode} loop")
+
+    for text in texts[:args.warmup]:
+        _issue(target, text, time.perf_counter(), [])
+
+    sampler = ResourceSampler(target.pid, args.sample_interval) if target.pid else None
+    if sampler:
+        sampler.start()
+
+    if open_loop:
+        offsets = _arrival_offsets(args.rate, args.poisson, args.seed,
+                                   timestamps if args.replay_timing else None, args.speed)
+        samples = run_open_loop(target, texts, offsets, args.duration, args.max_in_flight, args.requests)
+    else:
+        samples = run_closed_loop(target, texts, args.clients, args.duration, args.requests)
+
+    resources = sampler.stop() if sampler else []
+    target.close()
+
+    report = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "environment": bench_utils.environment_info(args.threads),
+        "config": {
+            **target.info,
+            "mode": mode,
+            "clients": None if open_loop else args.clients,
+            "rate": args.rate,
+            "poisson": args.poisson,
+            "replay_timing": args.replay_timing,
+            "max_in_flight": args.max_in_flight if open_loop else None,
+            "duration": args.duration,
+            "requests": args.requests,
+            "traffic": args.traffic or "dataset/*.csv",
+            "warmup": args.warmup,
+        },
+        **summarize_run(samples, mode, args.sample_interval, args.expected_interval_ms),
+        "resources": resources,
+    }
+    _print_report(report)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    label = report["config"].get("model") or "http"
+    out = args.out or os.path.join(
+        RESULTS_DIR, datetime.datetime.now().strftime(f"load_{label}_{mode}_%Y%m%d_%H%M%S.json")
+    )
+    with open(out, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"\n[LOAD] Results saved to {out}")
+    return 0
+
+
+def _peak(resources, key):
+    values = [r[key] for r in resources if r.get(key) is not None]
+    return max(values) if values else None
+
+
+def _print_report(report):
+    summary, latency = report["summary"], report["latency"]
+    print(f"\n[LOAD] {summary['requests']} requests, {summary['errors']} errors, "
+          f"{summary['achieved_qps']} QPS over {summary['elapsed_s']} s")
+    for name in ("service", "corrected"):
+        stats = latency.get(name) or {}
+        if stats.get("count"):
+            print(f"[LOAD] {name:<9} p50 {stats['p50_ms']:>9.2f} ms  p90 {stats['p90_ms']:>9.2f} ms  "
+                  f"p99 {stats['p99_ms']:>9.2f} ms  p99.9 {stats['p999_ms']:>9.2f} ms  max {stats['max_ms']:>9.2f} ms")
+    for error, count in summary.get("error_types", {}).items():
+        print(f"[LOAD] error x{count}: {error}")
+
+    resources = report.get("resources", [])
+    if resources:
+        print(f"[LOAD] peak CPU {_peak(resources, 'cpu_percent')}%  peak RSS {_peak(resources, 'rss_mb')} MB")
+
+
+def compare(args):
+    rows = []
+    for path in args.results:
+        with open(path) as f:
+            report = json.load(f)
+        config, corrected = report["config"], report["latency"].get("corrected", {})
+        rows.append((
+            os.path.basename(path),
+            f"{config.get('model') or config.get('target')} v{config.get('version')}",
+            config["mode"],
+            report["summary"].get("achieved_qps", 0.0),
+            corrected.get("p50_ms"), corrected.get("p99_ms"), corrected.get("p999_ms"),
+            report["summary"].get("errors", 0),
+            _peak(report.get("resources", []), "rss_mb"),
+        ))
+
+    def fmt(value, spec):
+        return format(value, spec) if value is not None else "-"
+
+    print(f"\n{'results':<36} {'model':<12} {'mode':<6} {'QPS':>9} {'p50':>9} {'p99':>9} {'p99.9':>9} "
+          f"{'errors':>7} {'RSS MB':>8}")
+    print("-" * 111)
+    for name, model, mode, qps, p50, p99, p999, errors, rss in rows:
+        print(f"{name:<36} {model:<12} {mode:<6} {qps:>9.1f} {fmt(p50, '>9.2f')} {fmt(p99, '>9.2f')} "
+              f"{fmt(p999, '>9.2f')} {errors:>7} {fmt(rss, '>8.1f')}")
+    print("(latencies: coordinated-omission corrected, ms)")
+    return 0
+
+
+# ================================================================
+# CLI
+# ================================================================
+def build_parser():
+    from core import config
+
+    parser = argparse.ArgumentParser(description="IntentIQ load generator")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="Generate load and save the results")
+    p_run.add_argument("--target", default="inproc", help="'inproc' or the HTTP API base URL")
+    p_run.add_argument("--model-family", default=config.DEFAULT_MODEL_FAMILY, help="inproc target only")
+    p_run.add_argument("--model-version", default=config.DEFAULT_MODEL_VERSION, help="inproc target only")
+    p_run.add_argument("--server-pid", type=int, help="Sample CPU / RSS of this process (HTTP target)")
+    p_run.add_argument("--timeout", type=float, default=30.0, help="HTTP request timeout (s)")
+
+    p_run.add_argument("--traffic", help="JSONL traffic file or CSV dataset (default: dataset/*.csv)")
+    p_run.add_argument("--corpus-size", type=int, default=1024, help="Requests sampled from CSV datasets")
+    p_run.add_argument("--seed", type=int, default=DEFAULT_SEED)
+
+    p_run.add_argument("--clients", type=int, default=4, help="Closed loop: concurrent clients")
+    p_run.add_argument("--rate", type=float, help="Open loop: requests per second")
+    p_run.add_argument("--poisson", action="store_true", help="Open loop: exponential inter-arrival gaps")
+    p_run.add_argument("--replay-timing", action="store_true", help="Open loop: use the traffic file's 'ts' gaps")
+    p_run.add_argument("--speed", type=float, default=1.0, help="Time compression for --replay-timing")
+    p_run.add_argument("--max-in-flight", type=int, default=64, help="Open loop: concurrent requests")
+
+    p_run.add_argument("--duration", type=float, default=30.0, help="Seconds of load")
+    p_run.add_argument("--requests", type=int, help="Stop after this many requests")
+    p_run.add_argument("--warmup", type=int, default=20, help="Unrecorded requests sent first")
+    p_run.add_argument("--expected-interval-ms", type=float,
+                       help="Closed loop correction interval (default: median service time)")
+    p_run.add_argument("--sample-interval", type=float, default=1.0, help="Timeline / resource window (s)")
+    p_run.add_argument("--threads", type=int, help="Pin BLAS / torch threads (inproc)")
+    p_run.add_argument("--out", help="Output JSON path")
+
+    p_cmp = sub.add_parser("compare", help="Side-by-side summary of load test results")
+    p_cmp.add_argument("results", nargs="+", help="Results JSON files produced by 'run'")
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "run":
+        return run(args)
+    return compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+# benchmarks/run_benchmarks.py
+"""
+Micro- and macro-benchmarks for the IntentIQ inference pipeline.
+
+Usage (from the project root):
+    python -m benchmarks.run_benchmarks run [--threads 1] [--out results.json]
+    python -m benchmarks.run_benchmarks run --save-baseline
+    python -m benchmarks.run_benchmarks compare results.json [--baseline path] [--threshold 0.10]
+
+Heavy libraries are imported lazily inside the benchmarks so thread pinning
+(env vars) takes effect and the transformer "cold load" really is cold.
+"""
+
+import io
+import gc
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+import contextlib
+
+from core import config
+from benchmarks import bench_utils
+from benchmarks.corpus import load_corpus, DEFAULT_SEED
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+BASELINE_PATH = os.path.join(RESULTS_DIR, "baseline.json")
+
+ENCODE_BATCH_SIZES = (1, 8, 32, 128)
+CLASSIFIER_BATCH_SIZES = (1, 128)
+
+
+# ================================================================
+# Helpers
+# ================================================================
+def _resolve_version(model_type):
+    """Version a deployment would load (production alias, else latest); None if untrained."""
+    from intent_system.registry import get_registry
+
+    try:
+        return get_registry(model_type).resolve()
+    except FileNotFoundError:
+        return None
+
+
+def _record(results, name, stats, memory=None, **extra):
+    entry = dict(stats)
+    if memory:
+        entry["memory"] = memory
+    entry.update(extra)
+    results[name] = entry
+    print(f"[BENCH] {name:<40} median {entry['median_ms']:>10.3f} ms   p95 {entry['p95_ms']:>10.3f} ms")
+
+
+# ================================================================
+# Benchmarks
+# ================================================================
+def bench_transformer_load(results, args):
+    # Cold: first load in this process (imports + weights from disk), timed
+    # without tracemalloc; memory comes from the RSS delta of the same run
+    gc.collect()
+    rss_before = bench_utils.current_rss_mb()
+    start = time.perf_counter_ns()
+    from utils.ensure_transformer import get_transformer_model
+    model = get_transformer_model()
+    cold = bench_utils.summarize([time.perf_counter_ns() - start])
+    memory = {
+        "rss_delta_mb": round(bench_utils.current_rss_mb() - rss_before, 3),
+        "rss_peak_mb": round(bench_utils.peak_rss_mb(), 3),
+    }
+    _record(results, "transformer_load_cold", cold, memory)
+
+    # Warm: libraries imported, weights in the OS page cache;
+    # Python-level allocations are traced in a separate, untimed load
+    warm = bench_utils.time_call(get_transformer_model, repeat=args.load_repeat, warmup=0)
+    _, memory = bench_utils.measure_memory(get_transformer_model)
+    _record(results, "transformer_load_warm", warm, memory)
+
+    return model
+
+
+def bench_preprocess(results, args, texts):
+    from intent_system.preprocess import preprocess_text
+
+    def run_all():
+        for t in texts:
+            preprocess_text(t)
+
+    stats = bench_utils.time_call(run_all, repeat=args.repeat, items_per_call=len(texts))
+    _, memory = bench_utils.measure_memory(run_all)
+    _record(results, "preprocess_text", stats, memory, corpus_size=len(texts))
+
+
+def bench_encode(results, args, model, texts):
+    for bs in ENCODE_BATCH_SIZES:
+        batch = texts[:bs]
+        fn = lambda: model.encode(batch, batch_size=bs)
+
+        stats = bench_utils.time_call(fn, repeat=args.repeat, items_per_call=len(batch))
+        _, memory = bench_utils.measure_memory(fn)
+        _record(results, f"encode_batch_{bs}", stats, memory, batch_size=bs)
+
+
+def bench_classifiers(results, args, embeddings):
+    import joblib
+    from core import config
+
+    for model_type in ("LR", "SVC", "Hierarchical"):
+        version = _resolve_version(model_type)
+        if version is None:
+            print(f"[BENCH] Skipping {model_type}: no trained versions found.")
+            continue
+
+        from intent_system.registry import get_registry
+        classifier = joblib.load(get_registry(model_type).artifact_path(version, "classifier"))
+
+        for bs in CLASSIFIER_BATCH_SIZES:
+            batch = embeddings[:bs]
+
+            for method in ("predict", "predict_proba", "predict_with_proba"):
+                if not hasattr(classifier, method):
+                    continue
+
+                fn = lambda m=getattr(classifier, method): m(batch)
+                stats = bench_utils.time_call(fn, repeat=args.repeat, items_per_call=len(batch))
+                _record(
+                    results, f"{model_type}_v{version}_{method}_batch_{bs}", stats,
+                    model_type=model_type, version=version, batch_size=len(batch),
+                )
+
+
+def bench_router(results, args, intents):
+    from core.router import IntentRouter
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        router = IntentRouter()
+
+    # Never route to intents that would exit or create placeholder files
+    routable = [i for i in intents if i in router.skill_map and i != "exit"]
+    if not routable:
+        print("[BENCH] Skipping router: no routable intents in corpus.")
+        return
+
+    def run_all():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for intent in routable:
+                router.route(intent, "benchmark")
+
+    stats = bench_utils.time_call(run_all, repeat=args.repeat, items_per_call=len(routable))
+    _record(results, "router_route", stats, routes_per_call=len(routable))
+
+
+def bench_end_to_end(results, args, texts):
+    from intent_system.intent_recognizer import IntentRecognizer
+    from core.router import IntentRouter
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        router = IntentRouter()
+
+    for model_type in ("LR", "SVC", "Hierarchical"):
+        version = _resolve_version(model_type)
+        if version is None:
+            continue
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            recognizer = IntentRecognizer(model_type=model_type, version=version)
+
+        sample = texts[:args.e2e_size]
+
+        def run_all():
+            with contextlib.redirect_stdout(io.StringIO()):
+                for t in sample:
+                    intent, _ = recognizer.predict_intent(t)
+                    if intent != "exit" and intent in router.skill_map:
+                        router.route(intent, t)
+
+        stats = bench_utils.time_call(run_all, repeat=max(3, args.repeat // 4), items_per_call=len(sample))
+        _record(results, f"end_to_end_{model_type}_v{version}", stats, requests_per_call=len(sample))
+
+
+# ================================================================
+# Commands
+# ================================================================
+def run(args):
+    # Must happen before numpy / torch are imported anywhere
+    bench_utils.pin_threads(args.threads)
+    # Synthetic queries stay out of the prediction journal (and its enqueue cost out of the timings)
+    config.JOURNAL_ENABLED = False
+
+    corpus = load_corpus(size=args.corpus_size, seed=args.seed)
+    texts = [t for t, _ in corpus]
+    intents = sorted({i for _, i in corpus})
+
+    results = {}
+
+    model = bench_transformer_load(results, args)
+    bench_utils.pin_runtime_threads(args.threads)
+
+    bench_preprocess(results, args, texts)
+    bench_encode(results, args, model, texts)
+
+    embeddings = model.encode(texts[:max(CLASSIFIER_BATCH_SIZES)])
+    bench_classifiers(results, args, embeddings)
+    bench_router(results, args, intents)
+    bench_end_to_end(results, args, texts)
+
+    report = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "environment": bench_utils.environment_info(args.threads),
+        "config": {
+            "seed": args.seed,
+            "corpus_size": args.corpus_size,
+            "repeat": args.repeat,
+        },
+        "benchmarks": results,
+    }
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out = args.out or os.path.join(
+        RESULTS_DIR, datetime.datetime.now().strftime("bench_%Y%m%d_%H%M%S.json")
+    )
+    _write_json(out, report)
+    print(f"\n[BENCH] Results saved to {out}")
+
+    if args.save_baseline:
+        _write_json(BASELINE_PATH, report)
+        print(f"[BENCH] Baseline updated: {BASELINE_PATH}")
+
+    return 0
+
+
+def compare(args):
+    with open(args.results) as f:
+        current = json.load(f)["benchmarks"]
+    with open(args.baseline) as f:
+        baseline = json.load(f)["benchmarks"]
+
+    regressions = []
+
+    print(f"\n{'benchmark':<40} {'baseline':>12} {'current':>12} {'change':>9}")
+    print("-" * 76)
+
+    for name in sorted(set(current) | set(baseline)):
+        if name not in baseline or name not in current:
+            side = "baseline" if name not in current else "current"
+            print(f"{name:<40} {'(only in ' + side + ')':>35}")
+            continue
+
+        old = baseline[name][args.metric]
+        new = current[name][args.metric]
+        change = (new - old) / old if old else 0.0
+
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -args.threshold:
+            flag = "  improved"
+
+        print(f"{name:<40} {old:>10.3f}ms {new:>10.3f}ms {change * 100:>+8.1f}%{flag}")
+
+    print("-" * 76)
+    if regressions:
+        print(f"[BENCH] {len(regressions)} regression(s) above {args.threshold * 100:.0f}%: {', '.join(regressions)}")
+        return 1
+
+    print("[BENCH] No regressions.")
+    return 0
+
+
+def _write_json(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=4)
+
+
+# ================================================================
+# CLI
+# ================================================================
+def build_parser():
+    parser = argparse.ArgumentParser(description="IntentIQ inference benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="Run the benchmark suite")
+    p_run.add_argument("--threads", type=int, default=1, help="BLAS / torch thread count")
+    p_run.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    p_run.add_argument("--corpus-size", type=int, default=256)
+    p_run.add_argument("--repeat", type=int, default=20)
+    p_run.add_argument("--load-repeat", type=int, default=3)
+    p_run.add_argument("--e2e-size", type=int, default=32)
+    p_run.add_argument("--out", help="Output JSON path")
+    p_run.add_argument("--save-baseline", action="store_true", help="Also store as baseline")
+
+    p_cmp = sub.add_parser("compare", help="Compare results against a baseline")
+    p_cmp.add_argument("results", help="Results JSON produced by 'run'")
+    p_cmp.add_argument("--baseline", default=BASELINE_PATH)
+    p_cmp.add_argument("--metric", default="median_ms")
+    p_cmp.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown (0.10 = 10%%)")
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "run":
+        return run(args)
+    return compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -28,8 +28,41 @@ MODEL_TYPES = {
     "LR": os.path.join(INTENT_MODEL_DIR, "LR"),
     "SVC": os.path.join(INTENT_MODEL_DIR, "SVC"),
     "NeuralNet": os.path.join(INTENT_MODEL_DIR, "NeuralNet"),
+    "Joint": os.path.join(INTENT_MODEL_DIR, "Joint"),
+    "Hierarchical": os.path.join(INTENT_MODEL_DIR, "Hierarchical"),
 }
 
+# Per-family manifest (intent_system/registry.py): versions, checksums, metrics, aliases
+MODEL_MANIFEST_NAME = "manifest.json"
+MODEL_PRODUCTION_ALIAS = "production"     # loaded when no version is given (falls back to latest)
+MODEL_VERIFY_CHECKSUMS = os.environ.get("INTENTIQ_VERIFY_MODELS", "1") == "1"
+
+# =========================
+# SVC CALIBRATION CONFIG (intent_system/calibration.py)
+# =========================
+# "sigmoid" | "isotonic": fit on all rows, calibrate on cross-fitted scores
+# "platt_cv": SVC(probability=True), libsvm's internal 5-fold Platt scaling
+SVC_CALIBRATION = os.environ.get("INTENTIQ_SVC_CALIBRATION", "sigmoid")
+SVC_CALIBRATION_FOLDS = 3          # cross-fitted SVCs that produce the calibration scores
+SVC_CALIBRATION_HOLDOUT = 0.2      # fraction held out for calibration when refit=False
+
+# =========================
+# HIERARCHICAL CONFIG (intent_system/hierarchical.py)
+# =========================
+# Domain classifier + per-domain heads. Taxonomy from dataset/<stem>.taxonomy.json,
+# else KMeans over label centroids with HIER_NUM_DOMAINS clusters (0 = sqrt(intents))
+HIER_TAXONOMY_SUFFIX = ".taxonomy.json"
+HIER_NUM_DOMAINS = 0
+HIER_HEAD = "LR"                   # "LR" | "SVC" (calibrated per SVC_CALIBRATION)
+HIER_BEAM = 1                      # domains evaluated per query
+
+# =========================
+# JOINT INTENT + SLOT CONFIG (intent_system/joint_model.py)
+# =========================
+# One-vs-rest scores: every intent at or above the threshold is reported
+JOINT_INTENT_THRESHOLD = 0.5
+JOINT_MAX_INTENTS = 3
+
 # =========================
 # VOICE MODELS
 # =========================
@@ -52,4 +85,152 @@ BLOCK_SIZE = 2000
 # LOGGING CONFIG
 # =========================
 LOG_DIR = os.path.join(PROJECT_ROOT, "logs")
-LOG_LEVEL = "INFO"  # INFO | DEBUG | WARNING | ERROR
+LOG_LEVEL = os.environ.get("INTENTIQ_LOG_LEVEL", "INFO")  # INFO | DEBUG | WARNING | ERROR
+LOG_FILE_NAME = "intent_iq.log"
+LOG_CONSOLE = True                         # echo log lines to stdout
+LOG_JSON = os.environ.get("INTENTIQ_LOG_JSON", "0") == "1"   # also write intent_iq.jsonl
+LOG_BATCH_SIZE = 256                       # max records written per background flush
+LOG_MAX_BYTES = 10 * 1024 * 1024           # size-based rotation (0 = off)
+LOG_ROTATE_SECONDS = 24 * 60 * 60          # time-based rotation (0 = off)
+LOG_BACKUP_COUNT = 5
+LOG_COMPRESS = True                        # gzip rotated files
+
+# =========================
+# TRACING CONFIG
+# =========================
+# Per-stage spans aggregated into in-memory histograms (utils/timer.py)
+TRACING_ENABLED = os.environ.get("INTENTIQ_TRACE", "0") == "1"
+
+# =========================
+# METRICS CONFIG
+# =========================
+# Prometheus text endpoint (0 = disabled) and file dump used by the CLI engine
+METRICS_PORT = int(os.environ.get("INTENTIQ_METRICS_PORT", "0"))
+METRICS_FILE = os.environ.get("INTENTIQ_METRICS_FILE", os.path.join(LOG_DIR, "metrics.prom"))
+
+# =========================
+# PREDICTION JOURNAL CONFIG
+# =========================
+# Append-only Arrow journal of every prediction (core/journal.py), written off the request path
+JOURNAL_ENABLED = os.environ.get("INTENTIQ_JOURNAL", "1") == "1"
+JOURNAL_DIR = os.environ.get("INTENTIQ_JOURNAL_DIR", os.path.join(LOG_DIR, "journal"))
+JOURNAL_TOP_K = 3                          # intents (with probabilities) kept per entry
+JOURNAL_BATCH_SIZE = 256                   # entries per Arrow record batch
+JOURNAL_QUEUE_SIZE = 10000                 # pending entries; record() drops beyond this
+JOURNAL_FLUSH_SECONDS = 2.0                # a partial batch is written after this long
+JOURNAL_MAX_BYTES = 64 * 1024 * 1024       # size-based segment rotation (0 = off)
+JOURNAL_ROTATE_SECONDS = 24 * 60 * 60      # time-based segment rotation (0 = off)
+JOURNAL_MAX_SEGMENTS = 30                  # oldest segments deleted beyond this (0 = keep all)
+JOURNAL_LOW_CONFIDENCE = 0.5               # export threshold for active-learning samples
+
+# =========================
+# SKILLS CONFIG
+# =========================
+SKILLS_DIR = os.path.join(PROJECT_ROOT, "skills")
+SKILLS_PACKAGE = "skills"
+SKILL_RELOAD_INTERVAL = 1.0   # seconds between mtime scans for hot reload (0 = off)
+
+# =========================
+# SKILL EXECUTION CONFIG
+# =========================
+# Skills may override per module: EXECUTOR = "thread" | "process" | "inline",
+# TIMEOUT = <seconds>, MAX_CONCURRENCY = <int>, CACHE_TTL = <seconds>
+SKILL_EXECUTOR = "thread"          # default executor for skills
+SKILL_THREAD_WORKERS = 8           # bounded pool for I/O-bound skills
+SKILL_PROCESS_WORKERS = 2          # optional pool for CPU-bound / untrusted skills (created lazily)
+SKILL_TIMEOUT = 10.0               # seconds a caller waits for a skill result
+SKILL_MAX_CONCURRENCY = 4          # in-flight runs per skill
+SKILL_MAX_PENDING = 64             # in-flight runs across all skills (backpressure)
+SKILL_ADMISSION_TIMEOUT = 0.5      # seconds to wait for a free slot before rejecting
+SKILL_CACHE_MAX_ENTRIES = 1024     # cached skill results across all skills (LRU)
+
+# =========================
+# ENGINE CONFIG
+# =========================
+# Pipelined mode overlaps capture, STT, recognition and skill dispatch
+ENGINE_PIPELINED = os.environ.get("INTENTIQ_PIPELINE", "0") == "1"
+PIPELINE_AUDIO_QUEUE_SIZE = 64     # ~32s of 8000-sample blocks; oldest dropped on overflow
+PIPELINE_STAGE_QUEUE_SIZE = 8      # bounded hand-off between text / intent stages
+PIPELINE_JOIN_TIMEOUT = 2.0        # seconds to wait for each stage on shutdown
+
+# =========================
+# STARTUP CONFIG
+# =========================
+# Headless mode skips all prompts (service restarts); CLI args in main.py override these
+HEADLESS = os.environ.get("INTENTIQ_HEADLESS", "0") == "1"
+DEFAULT_INPUT_MODE = os.environ.get("INTENTIQ_INPUT_MODE", "text")        # "text" | "voice"
+DEFAULT_MODEL_FAMILY = os.environ.get("INTENTIQ_MODEL_FAMILY", "LR")      # warm-up / headless family
+DEFAULT_MODEL_VERSION = os.environ.get("INTENTIQ_MODEL_VERSION") or None  # None = production alias, else latest
+
+# =========================
+# STREAMING SPECULATION CONFIG
+# =========================
+# Predict intent from stable Vosk partial results before the final transcript
+SPECULATION_ENABLED = os.environ.get("INTENTIQ_SPECULATE", "0") == "1"
+SPECULATION_STABLE_CHUNKS = 2      # partial must be unchanged for this many chunks
+SPECULATION_MIN_WORDS = 1
+SPECULATION_MIN_CONFIDENCE = 0.6   # top probability needed to start speculative work
+
+# =========================
+# STT CASCADE CONFIG (Vosk → Whisper)
+# =========================
+WHISPER_MODEL_NAME = "medium"
+CASCADE_MIN_CONFIDENCE = 0.75      # mean Vosk word confidence needed to skip Whisper
+CASCADE_WORD_CONFIDENCE = 0.5      # any word below this marks a low-confidence segment
+CASCADE_SEGMENT_PAD = 0.25         # seconds of context around a re-decoded segment
+CASCADE_FULL_REDECODE_RATIO = 0.6  # re-decode everything if the segment covers more than this
+CASCADE_WHISPER_TIMEOUT = 30.0     # seconds transcribe() waits for a fallback result
+CASCADE_WHISPER_MAX_RESTARTS = 2   # worker load/crash failures in a row before the fallback is disabled
+# Engine voice input through the cascade (sequential mode; not with speculation / pipelined)
+STT_CASCADE = os.environ.get("INTENTIQ_STT_CASCADE", "0") == "1"
+CASCADE_LISTEN_SECONDS = 5.0       # max recording per utterance (the VAD ends it earlier)
+
+# =========================
+# VAD CONFIG (io_layer/audio_utils.py)
+# =========================
+VAD_ENABLED = os.environ.get("INTENTIQ_VAD", "1") == "1"
+VAD_FRAME_MS = 20                  # analysis frame length
+VAD_ENERGY_DBFS = -45.0            # absolute floor: quieter frames are never speech
+VAD_NOISE_MARGIN_DB = 9.0          # speech must be this far above the adaptive noise floor
+VAD_NOISE_PERCENTILE = 10          # offline: initial noise floor = this percentile of the clip's frame levels
+VAD_ZCR_MAX = 0.35                 # low-energy frames above this zero-crossing rate are noise/hiss
+VAD_HANGOVER_MS = 200              # keep marking speech this long after the last speech frame
+VAD_PRE_ROLL_MS = 150              # audio kept before the first speech frame (word onsets)
+VAD_MIN_SPEECH_MS = 100            # shorter bursts (clicks, taps) are ignored
+VAD_END_SILENCE_MS = 700           # silence after speech that ends the utterance
+
+# =========================
+# OFFLINE TRANSCRIPTION CONFIG (io_layer/file_transcriber.py)
+# =========================
+FILE_STT_WORKERS = 2               # Vosk processes; each loads its own copy of the model
+FILE_WHISPER_BATCH = 8             # clips per Whisper forward pass
+
+# =========================
+# AUDIO CAPTURE CONFIG (io_layer/audio_utils.py)
+# =========================
+AUDIO_DEVICE_RATE = int(os.environ.get("INTENTIQ_MIC_RATE", "16000"))  # e.g. 44100 on mics without 16 kHz
+AUDIO_BLOCKSIZE = 4000             # frames per callback at the device rate
+AUDIO_RING_SECONDS = 10            # capture ring capacity
+
+# =========================
+# VOSK SESSION POOL CONFIG (io_layer/vosk_sessions.py)
+# =========================
+VOSK_SESSION_WORKERS = 4           # decode threads shared by all sessions
+VOSK_MAX_SESSIONS = 32             # open_session() raises beyond this
+VOSK_RECOGNIZER_POOL = 8           # idle KaldiRecognizers kept for reuse
+VOSK_SESSION_IDLE_TIMEOUT = 60.0   # seconds without audio before a session is evicted
+
+# =========================
+# STREAMLIT UI CONFIG
+# =========================
+UI_VERSION_CACHE_TTL = 60          # seconds before the version list is rescanned
+UI_BATCH_SIZE = 256                # rows per predict_batch() call in CSV scoring
+
+# =========================
+# API SERVER CONFIG (api/api_server.py, api/http_server.py)
+# =========================
+API_HOST = os.environ.get("INTENTIQ_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("INTENTIQ_API_PORT", "8765"))
+API_INTENT_WORKERS = 4             # threads running intent prediction for final transcripts
+API_MAX_PENDING_CHUNKS = 32        # stop reading a socket while this many chunks await decoding
+API_HTTP_PORT = int(os.environ.get("INTENTIQ_API_HTTP_PORT", "8080"))   # api/http_server.py (JSON text)
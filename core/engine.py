@@ -1,18 +1,37 @@
 # core/engine.py
 
-from core.logger import log
+import threading
+
+from core.logger import log, request_scope
 from core import config
+from core import metrics
 
 from io_layer.stt_vosk import VoskSTT
 from intent_system.intent_recognizer import IntentRecognizer
+from intent_system.registry import get_registry
 from core.router import IntentRouter
+from utils import timer
+from utils.timer import span, start_trace
 
 
 class IntentIQEngine:
-    def __init__(self):
-        self.input_mode = None    # "voice" or "text"
+    def __init__(self, headless=False, input_mode=None, model_type=None, version=None, warmup=None):
+        """
+        headless   : skip all prompts; missing choices fall back to config defaults
+        input_mode / model_type / version : preselected choices (skip their prompt)
+        warmup     : a started core.warmup.ModelWarmup to wait on before "Ready"
+        """
+        self.headless = headless
+        self.input_mode = input_mode    # "voice" or "text"
+        self.model_type = model_type
+        self.version = version
+        self.warmup = warmup
+
         self.stt = None
+        self.cascade = None             # Vosk → Whisper STTRouter (INTENTIQ_STT_CASCADE=1)
         self.recognizer = None
+        self.speculator = None
+        self.pipeline = None
         self.router = IntentRouter()
     
     def select_input_mode(self):
@@ -20,6 +39,7 @@ class IntentIQEngine:
         print("1. Voice Input (Vosk STT)")
         print("2. Text Input (Keyboard)")
 
+        log.flush()
         choice = int(input("Choose mode: ").strip())
 
         if choice == 1:
@@ -40,6 +60,7 @@ class IntentIQEngine:
         for i, m in enumerate(model_types, 1):
             print(f"{i}. {m}")
 
+        log.flush()
         idx = int(input("Select model type: "))
         model_type = model_types[idx - 1]
 
@@ -47,22 +68,19 @@ class IntentIQEngine:
         return model_type
 
     def select_model_version(self, model_type):
-        from os import listdir
-
-        model_dir = config.MODEL_TYPES[model_type]
-        versions = []
-
-        for f in listdir(model_dir):
-            if f.startswith("classifier_v") and f.endswith(".pkl"):
-                versions.append(f.split("_v")[1].split(".")[0])
+        registry = get_registry(model_type)
+        versions = registry.versions()
 
         if not versions:
-            raise FileNotFoundError(f"[Engine] No trained versions found in {model_dir}")
+            raise FileNotFoundError(f"[Engine] No trained versions found in {config.MODEL_TYPES[model_type]}")
 
+        aliases = registry.aliases()
         print("\nAvailable Versions:")
         for i, v in enumerate(versions, 1):
-            print(f"{i}. v{v}")
+            tags = " ".join(f"({a})" for a, target in aliases.items() if target == v)
+            print(f"{i}. v{v} {tags}".rstrip())
 
+        log.flush()
         idx = int(input("Select version: "))
         version = versions[idx - 1]
 
@@ -72,36 +90,114 @@ class IntentIQEngine:
     # ============================================================
     # INITIALIZE COMPONENTS
     # ============================================================
+    def _load_stt(self):
+        log.info("[Engine] Initializing STT...")
+        try:
+            if self._use_cascade():
+                from io_layer.advanced_io.stt_router import STTRouter
+                self.cascade = STTRouter()
+                ring = self.cascade.vosk.ring
+            else:
+                self.stt = VoskSTT(
+                    model_path=config.VOSK_MODEL_PATH,
+                )
+                ring = self.stt.ring
+        except Exception as e:
+            log.error(f"[Engine] Failed to load Vosk model: {e}")
+            return
+        metrics.track_queue("stt_audio", ring)
+
+    def _use_cascade(self):
+        # Pipelined mode needs Vosk's streaming decoder; the cascade records whole utterances
+        if config.STT_CASCADE and config.ENGINE_PIPELINED:
+            log.warn("[Engine] STT cascade is not available in pipelined mode, using Vosk only.")
+            return False
+        return config.STT_CASCADE
+
     def initialize(self):
-        self.select_input_mode()
+        if config.METRICS_PORT:
+            metrics.start_http_server(config.METRICS_PORT)
+
+        if self.input_mode is None:
+            if self.headless:
+                self.input_mode = config.DEFAULT_INPUT_MODE
+            else:
+                self.select_input_mode()
 
+        # The Vosk model is large: load it while the remaining prompts are answered
+        stt_thread = None
         if self.input_mode == "voice":
-            log.info("[Engine] Initializing STT...")
-            self.stt = VoskSTT(
-                model_path=config.VOSK_MODEL_PATH,
-            )
+            stt_thread = threading.Thread(target=self._load_stt, name="stt-loader", daemon=True)
+            stt_thread.start()
 
         # ---- MODEL SELECTION UI ----
-        model_type = self.select_model_family()
-        version = self.select_model_version(model_type)
+        model_type = self.model_type
+        if model_type is None:
+            model_type = config.DEFAULT_MODEL_FAMILY if self.headless else self.select_model_family()
+
+        version = self.version
+        if version is None:
+            if self.headless:
+                version = get_registry(model_type).resolve(config.DEFAULT_MODEL_VERSION)
+            else:
+                version = self.select_model_version(model_type)
+
+        self.model_type, self.version = model_type, version
+
+        if self.warmup is not None:
+            self.warmup.wait()
 
         log.info("[Engine] Loading Intent Recognizer...")
         self.recognizer = IntentRecognizer(
             model_type=model_type,
             version=version
         )
+        self.recognizer.warmup()
+
+        if stt_thread is not None:
+            stt_thread.join()
+            if self.stt is None and self.cascade is None:
+                raise RuntimeError("[Engine] STT failed to initialize (see log).")
 
-        log.info("[Engine] Ready.\n")
+            if config.SPECULATION_ENABLED and not config.ENGINE_PIPELINED and self.stt is not None:
+                from core.speculation import SpeculativeRecognizer
+                self.speculator = SpeculativeRecognizer(self.stt, self.recognizer, self.router)
+
+        log.info(f"[Engine] Ready. ({model_type} v{version}, {self.input_mode} input)\n")
     
     def shutdown(self):
         print("[Engine] Shutting down...")
 
-        # Stop STT safely
+        # Pipelined mode owns the mic stream; sequential listen() closes its own
+        if self.pipeline is not None:
+            self.pipeline.stop()
+            self.pipeline.join()
+
+        self.router.close()
+
+        if self.speculator is not None:
+            s = self.speculator.summary()
+            log.info(f"[Engine] Speculation hit rate {s['hit_rate']:.1%}, avg saved {s['avg_saved_ms']:.1f}ms")
+            self.speculator.close()
+
+        if self.cascade is not None:
+            s = self.cascade.summary()
+            log.info(f"[Engine] Whisper fallback rate {s['fallback_rate']:.1%}, "
+                     f"avg extra {s['avg_extra_latency_ms']:.1f}ms")
+            self.cascade.close()
+
+        if self.recognizer is not None and self.recognizer.journal is not None:
+            self.recognizer.journal.flush()
+
         try:
-            import sounddevice as sd
-            sd.stop()
-        except:
-            pass
+            path = metrics.dump_to_file()
+            log.info(f"[Engine] Metrics written to {path}")
+        except OSError as e:
+            log.warn(f"[Engine] Could not write metrics file: {e}")
+
+        if timer.is_enabled():
+            print("\n[Timing] Span summary")
+            print(timer.report())
 
         log.info("[Engine] Clean exit.")
 
@@ -112,47 +208,103 @@ class IntentIQEngine:
     def run(self):
         self.initialize()
 
+        if config.ENGINE_PIPELINED:
+            from core.pipeline import PipelinedEngine
+            self.pipeline = PipelinedEngine(self)
+            self.pipeline.run()
+            self.shutdown()
+            return
+
         while True:
+            with request_scope():
+                if not timer.is_enabled():
+                    keep_running = self._handle_once()
+                else:
+                    with start_trace("engine.request") as trace:
+                        keep_running = self._handle_once()
 
-            # Select input source
-            if self.input_mode == "voice":
-                print("\n[Listening...] Say something:")
+                    stages = ", ".join(f"{k}={v:.1f}ms" for k, v in trace.breakdown().items())
+                    print(f"[Timing] {stages}")
+
+            if not keep_running:
+                break
+
+    def _handle_once(self):
+        """Processes one utterance. Returns False when the engine should stop."""
+
+        # Select input source
+        speculated = None
+        if self.speculator is not None:
+            with span("engine.stt"):
+                speculated = self.speculator.listen()
+            text = speculated.text
+        elif self.cascade is not None:
+            with span("engine.stt"):
+                text = self.cascade.transcribe(duration=config.CASCADE_LISTEN_SECONDS).text
+        elif self.input_mode == "voice":
+            print("\n[Listening...] Say something:")
+            with span("engine.stt"):
                 text = self.stt.listen()
-            else:
-                text = input("\n[You] ").strip()
+        else:
+            log.flush()
+            text = input("\n[You] ").strip()
 
-            if not text:
-                continue
+        if not text:
+            return True
 
-            print(f"[User] {text}")
-            
-            # User-triggered shutdown
-            if text.lower() in ("exit", "quit", "stop", "shutdown"):
-                print("[System] Shutdown command received.")
-                self.shutdown()
-                break
+        print(f"[User] {text}")
 
-            # Intent recognition
-            intent, probs = self.recognizer.predict_intent(text)
-            print(f"[Predicted Intent] {intent}")
-            
-            # Shutdown if predicted intent is exit
-            if intent == "exit":
-                print("[System] Exit intent detected. Shutting down...")
-                self.shutdown()
-                break
+        # User-triggered shutdown
+        if text.lower() in ("exit", "quit", "stop", "shutdown"):
+            print("[System] Shutdown command received.")
+            self.shutdown()
+            return False
 
-            # Probability visualization
-            if probs is not None:
-                labels = self.recognizer.label_encoder.classes_
-                print("\n[Probabilities]")
-                print("-" * 40)
+        # Intent recognition (already done while listening when speculating)
+        if speculated is not None:
+            intent, probs, params = speculated.intent, speculated.probs, speculated.params
+            log.info("[Engine] Speculation %s, saved %.1fms", speculated.outcome, speculated.saved_ms)
+        else:
+            parsed = self.recognizer.parse(text)
+            intent, probs, params = parsed["intent"], parsed["probs"], parsed["params"]
+        print(f"[Predicted Intent] {intent}")
+        if params:
+            print(f"[Parameters] {params}")
+
+        # Shutdown if predicted intent is exit
+        if intent == "exit":
+            print("[System] Exit intent detected. Shutting down...")
+            self.shutdown()
+            return False
+
+        # Probability visualization
+        self.show_prediction(intent, probs, show_intent=False)
+
+        # Route to skill (or collect the committed speculative run)
+        if speculated is not None and speculated.skill_future is not None:
+            try:
+                result = speculated.skill_future.result(timeout=config.SKILL_TIMEOUT)
+                if result is not None:
+                    print(f"[Task] {result}")
+            except Exception as e:
+                log.error("[Engine] Speculative skill '%s' failed: %s", intent, e)
+        else:
+            result = self.router.route(intent, text, params)
+            if result is not None:
+                print(f"[Task] {result}")
+        return True
+
+    def show_prediction(self, intent, probs, show_intent=True):
+        if show_intent:
+            print(f"[Predicted Intent] {intent}")
 
-                for label, p in zip(labels, probs):
-                    pct = float(p) * 100
-                    print(f"{label:<20} {pct:>6.2f}%")
+        if probs is not None:
+            labels = self.recognizer.label_encoder.classes_
+            print("\n[Probabilities]")
+            print("-" * 40)
 
-                print("-" * 40)
+            for label, p in zip(labels, probs):
+                pct = float(p) * 100
+                print(f"{label:<20} {pct:>6.2f}%")
 
-            # Route to skill
-            self.router.route(intent, text)
+            print("-" * 40)
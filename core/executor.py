@@ -0,0 +1,361 @@
+# core/executor.py
+"""
+Concurrent skill execution for the IntentRouter.
+
+Skills run off the caller's thread so a slow skill cannot stall the engine
+loop or a server built on the router:
+
+- "thread"  : bounded ThreadPoolExecutor (default, I/O-bound skills)
+- "process" : lazily created ProcessPoolExecutor (CPU-bound / untrusted skills);
+              workers re-import a skill once the router has hot-reloaded it
+- "inline"  : caller's thread (skills that must, e.g. exit)
+
+`async def run(text)` skills are scheduled on a shared background event loop.
+
+Skills may take extracted parameters: `def run(text, params=None)` receives
+the slot values of the Joint model family ({"location": "Sydney"}); plain
+`run(text)` skills are called as before.
+
+Each skill module may declare:
+    EXECUTOR = "thread" | "process" | "inline"
+    TIMEOUT = 5.0
+    MAX_CONCURRENCY = 2
+    SPECULATIVE = False
+    CACHE_TTL = 0
+
+Skills with CACHE_TTL > 0 (and optionally cache_key(text, params)) have
+their return values cached and identical in-flight calls coalesced, see
+core/skill_cache.py.
+
+Admission is bounded per skill and globally; when no slot frees up within
+SKILL_ADMISSION_TIMEOUT the call is rejected instead of queueing forever.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import inspect
+import importlib
+import weakref
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from core import config
+from core.logger import log
+from core.metrics import registry, STAGE_LATENCY
+from core.skill_cache import SkillCache, follow
+from utils import timer
+
+SKILL_QUEUE_WAIT = registry.histogram(
+    "intentiq_skill_queue_wait_seconds", "Time between skill submission and start of execution.", ("skill",)
+)
+SKILL_EXEC = registry.histogram(
+    "intentiq_skill_exec_seconds", "Skill execution time.", ("skill",)
+)
+SKILL_OUTCOMES = registry.counter(
+    "intentiq_skill_runs_total", "Skill runs by outcome (ok, error, timeout, rejected).", ("skill", "outcome")
+)
+
+
+class SkillRejected(RuntimeError):
+    """Raised when a skill cannot be admitted (concurrency cap / backpressure)."""
+
+
+class SkillSpec:
+    """Resolved skill: run callable plus its execution settings."""
+
+    __slots__ = ("intent", "module_path", "version", "run", "executor", "timeout", "max_concurrency",
+                 "is_async", "speculative", "takes_params", "cache_ttl", "cache_key")
+
+    def __init__(self, intent, module_path, module):
+        self.intent = intent
+        self.module_path = module_path
+        # mtime of the loaded file; process-pool workers reload the skill when it changes
+        try:
+            self.version = os.path.getmtime(module.__file__)
+        except (AttributeError, TypeError, OSError):
+            self.version = None
+        self.run = module.run
+        self.executor = getattr(module, "EXECUTOR", config.SKILL_EXECUTOR)
+        self.timeout = getattr(module, "TIMEOUT", config.SKILL_TIMEOUT)
+        self.max_concurrency = getattr(module, "MAX_CONCURRENCY", config.SKILL_MAX_CONCURRENCY)
+        self.is_async = inspect.iscoroutinefunction(module.run)
+        # Side-effect free skills may be started from partial transcripts (core/speculation.py)
+        self.speculative = getattr(module, "SPECULATIVE", False)
+        self.takes_params = _takes_params(module.run)
+        # Cacheable skills return their response; 0 = never cached
+        self.cache_ttl = float(getattr(module, "CACHE_TTL", 0) or 0)
+        self.cache_key = getattr(module, "cache_key", None)
+
+        if self.executor not in ("thread", "process", "inline"):
+            raise ValueError(f"Skill '{intent}' has unknown EXECUTOR '{self.executor}'")
+
+
+def _takes_params(run):
+    try:
+        parameters = inspect.signature(run).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(p.name == "params" or p.kind is p.VAR_KEYWORD for p in parameters)
+
+
+def _call(run, takes_params, text, params):
+    return run(text, params=params) if takes_params else run(text)
+
+
+_worker_versions = {}   # module_path → version of the skill loaded in this pool worker
+
+
+def _worker_module(module_path, version):
+    # Workers keep skills in their own sys.modules, so hot reloads must be replayed here
+    module = sys.modules.get(module_path)
+    if module is None:
+        importlib.invalidate_caches()
+        module = importlib.import_module(module_path)
+    elif _worker_versions.get(module_path) != version:
+        module = importlib.reload(module)
+    _worker_versions[module_path] = version
+    return module
+
+
+def _run_in_process(module_path, version, text, params=None):
+    # Top-level so it pickles; the worker imports the skill itself
+    module = _worker_module(module_path, version)
+    result = _call(module.run, _takes_params(module.run), text, params)
+    if inspect.iscoroutine(result):
+        return asyncio.run(result)
+    return result
+
+
+class _SkillStats:
+    __slots__ = ("runs", "errors", "timeouts", "rejected", "wait_total", "exec_total")
+
+    def __init__(self):
+        self.runs = self.errors = self.timeouts = self.rejected = 0
+        self.wait_total = self.exec_total = 0.0
+
+
+class SkillExecutor:
+
+    def __init__(self, thread_workers=None, process_workers=None, max_pending=None):
+        self._threads = ThreadPoolExecutor(
+            max_workers=thread_workers or config.SKILL_THREAD_WORKERS, thread_name_prefix="skill"
+        )
+        self._process_workers = process_workers or config.SKILL_PROCESS_WORKERS
+        self._processes = None
+        self._loop = None
+        self._lock = threading.Lock()
+
+        self._pending = threading.BoundedSemaphore(max_pending or config.SKILL_MAX_PENDING)
+        self._skill_slots = {}
+        self._stats = {}
+        self._timed_out = weakref.WeakSet()   # futures run() already counted as "timeout"
+        self._work = weakref.WeakKeyDictionary()   # caller's cached-skill future → the run it follows
+        self.cache = SkillCache()
+
+    # ------------------------------------------------------------
+    # Lazy resources
+    # ------------------------------------------------------------
+    def _process_pool(self):
+        with self._lock:
+            if self._processes is None:
+                log.info(f"[Executor] Starting process pool ({self._process_workers} workers)")
+                self._processes = ProcessPoolExecutor(max_workers=self._process_workers)
+            return self._processes
+
+    def _event_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name="skill-async-loop", daemon=True
+                ).start()
+            return self._loop
+
+    def _slots(self, spec):
+        slots = self._skill_slots.get(spec.intent)
+        if slots is None:
+            with self._lock:
+                slots = self._skill_slots.setdefault(
+                    spec.intent, threading.BoundedSemaphore(spec.max_concurrency)
+                )
+        return slots
+
+    def _stat(self, intent):
+        stats = self._stats.get(intent)
+        if stats is None:
+            stats = self._stats.setdefault(intent, _SkillStats())
+        return stats
+
+    # ------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------
+    def submit(self, spec, text, params=None):
+        """
+        Schedules spec.run(text[, params]). Returns a concurrent.futures.Future.
+        Cacheable skills (CACHE_TTL) may be answered from the cache or by a
+        run already in flight for the same key, without being admitted.
+        """
+        if spec.cache_ttl > 0:
+            key = self.cache.key(spec, text, params)
+            if key is not None:
+                return self._submit_cached(spec, text, params, key)
+        return self._submit(spec, text, params)
+
+    def _submit_cached(self, spec, text, params, key):
+        future, leader = self.cache.lookup(spec, key)
+        if future is not None:
+            return future
+
+        try:
+            work = self._submit(spec, text, params)
+        except BaseException as e:
+            self.cache.abandon(spec, key, e)
+            raise
+
+        work.add_done_callback(lambda f: self.cache.complete(spec, key, f))
+        future = follow(leader)
+        self._work[future] = work
+        return future
+
+    def _submit(self, spec, text, params):
+        stats = self._stat(spec.intent)
+
+        slots = self._slots(spec)
+        if not slots.acquire(timeout=config.SKILL_ADMISSION_TIMEOUT):
+            stats.rejected += 1
+            SKILL_OUTCOMES.inc(skill=spec.intent, outcome="rejected")
+            raise SkillRejected(f"Skill '{spec.intent}' is at its concurrency limit ({spec.max_concurrency})")
+
+        if not self._pending.acquire(timeout=config.SKILL_ADMISSION_TIMEOUT):
+            slots.release()
+            stats.rejected += 1
+            SKILL_OUTCOMES.inc(skill=spec.intent, outcome="rejected")
+            raise SkillRejected("Skill executor is saturated")
+
+        submitted = time.perf_counter()
+        timing = {}
+
+        def release(_):
+            slots.release()
+            self._pending.release()
+
+        try:
+            if spec.executor == "inline":
+                future = Future()
+                self._execute(spec, text, params, submitted, timing, future)
+            elif spec.executor == "process":
+                # The worker's start time isn't observable here, so process-pool
+                # runs report their queue wait as part of execution time
+                future = self._process_pool().submit(_run_in_process, spec.module_path, spec.version, text, params)
+                timing["started"] = submitted
+            elif spec.is_async:
+                future = asyncio.run_coroutine_threadsafe(
+                    self._execute_async(spec, text, params, submitted, timing), self._event_loop()
+                )
+            else:
+                future = Future()
+                self._threads.submit(timer.bind(self._execute), spec, text, params, submitted, timing, future)
+        except BaseException:
+            # Pool shut down / broken: nothing will ever call release()
+            release(None)
+            raise
+
+        future.add_done_callback(release)
+        future.add_done_callback(lambda f: self._account(spec, f, submitted, timing))
+        return future
+
+    def _execute(self, spec, text, params, submitted, timing, future):
+        if not future.set_running_or_notify_cancel():
+            return
+        timing["started"] = time.perf_counter()
+        try:
+            with timer.span(f"skill.{spec.intent}"):
+                result = _call(spec.run, spec.takes_params, text, params)
+        except BaseException as e:
+            timing["finished"] = time.perf_counter()
+            future.set_exception(e)
+        else:
+            timing["finished"] = time.perf_counter()
+            future.set_result(result)
+
+    async def _execute_async(self, spec, text, params, submitted, timing):
+        timing["started"] = time.perf_counter()
+        try:
+            with timer.span(f"skill.{spec.intent}"):
+                return await _call(spec.run, spec.takes_params, text, params)
+        finally:
+            timing["finished"] = time.perf_counter()
+
+    def _account(self, spec, future, submitted, timing):
+        stats = self._stat(spec.intent)
+        started = timing.get("started", submitted)
+        finished = timing.get("finished", time.perf_counter())
+
+        wait, run = started - submitted, finished - started
+        stats.runs += 1
+        stats.wait_total += wait
+        stats.exec_total += run
+
+        SKILL_QUEUE_WAIT.observe(wait, skill=spec.intent)
+        SKILL_EXEC.observe(run, skill=spec.intent)
+        STAGE_LATENCY.observe(run, stage="skill")
+
+        if future in self._timed_out:
+            return   # outcome already recorded by run()
+        if future.cancelled():
+            outcome = "cancelled"
+        elif future.exception() is not None:
+            outcome = "error"
+            stats.errors += 1
+        else:
+            outcome = "ok"
+        SKILL_OUTCOMES.inc(skill=spec.intent, outcome=outcome)
+
+    # ------------------------------------------------------------
+    # Blocking helper
+    # ------------------------------------------------------------
+    def run(self, spec, text, params=None):
+        """
+        Runs the skill and waits up to its timeout for the result.
+        Timed-out skills keep running in the background (threads cannot be
+        killed) but keep holding their concurrency slot until they finish.
+        """
+        future = self.submit(spec, text, params)
+        try:
+            return future.result(timeout=spec.timeout)
+        except FutureTimeout:
+            # Before cancel(): a successful cancel runs _account synchronously.
+            # A cache leader's caller gets a follow() wrapper; _account sees the run itself
+            self._timed_out.add(self._work.get(future, future))
+            future.cancel()
+            self._stat(spec.intent).timeouts += 1
+            SKILL_OUTCOMES.inc(skill=spec.intent, outcome="timeout")
+            raise
+
+    # ------------------------------------------------------------
+    # Reporting / lifecycle
+    # ------------------------------------------------------------
+    def stats(self):
+        out = {}
+        for intent, s in list(self._stats.items()):
+            out[intent] = {
+                "runs": s.runs,
+                "errors": s.errors,
+                "timeouts": s.timeouts,
+                "rejected": s.rejected,
+                "avg_queue_wait_ms": (s.wait_total / s.runs * 1000) if s.runs else 0.0,
+                "avg_exec_ms": (s.exec_total / s.runs * 1000) if s.runs else 0.0,
+            }
+        for intent, cache_stats in self.cache.stats().items():
+            out.setdefault(intent, {}).update(cache_stats)
+        return out
+
+    def shutdown(self, wait=False):
+        self._threads.shutdown(wait=wait, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=wait, cancel_futures=True)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
@@ -0,0 +1,436 @@
+# core/journal.py
+"""
+Append-only prediction journal.
+
+Every IntentRecognizer.parse() / predict_intent() call is recorded as one
+entry: timestamp, request ID, input text, model family / version, predicted
+intent, top-k intents with probabilities, slot params and stage latencies.
+The caller only pays for a queue.put() on a bounded queue (entries are
+dropped and counted when the writer falls behind); top-k selection, Arrow conversion
+and file I/O happen in batches on a background writer thread.
+
+Segments are Arrow IPC streams (one record batch per flush):
+
+    logs/journal/predictions-20250101-120000-<pid>-000000.arrows
+
+rotated by size / age, oldest deleted beyond JOURNAL_MAX_SEGMENTS. A
+segment still being written can be read up to its last complete batch.
+
+    python -m core.journal stats                          # entries, confidence, latency per model
+    python -m core.journal show --last 20
+    python -m core.journal export --threshold 0.5 --out dataset/review.csv
+
+`export` writes the low-confidence queries as a text,intent CSV (the
+trainer's format; intent = the model's guess, to be reviewed), so
+active-learning loops read the journal instead of the serving process.
+"""
+
+import os
+import csv
+import json
+import time
+import queue
+import atexit
+import argparse
+import datetime
+import threading
+
+from core import config
+from core.logger import log, current_request_id
+
+SEGMENT_PREFIX = "predictions-"
+SEGMENT_SUFFIX = ".arrows"
+
+
+def _schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("ts", pa.timestamp("ms", tz="UTC")),
+        ("request_id", pa.string()),
+        ("text", pa.string()),
+        ("model", pa.string()),
+        ("version", pa.string()),
+        ("intent", pa.string()),
+        ("confidence", pa.float32()),
+        ("top_k", pa.list_(pa.struct([("intent", pa.string()), ("prob", pa.float32())]))),
+        ("params", pa.string()),
+        ("latency_ms", pa.map_(pa.string(), pa.float32())),
+    ])
+
+
+# ================================================================
+# Segment files
+# ================================================================
+class _Segment:
+    """One Arrow IPC stream file, written batch by batch."""
+
+    _sequence = 0
+
+    def __init__(self, directory, schema):
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        # Zero-padded so name order stays age order past -9
+        name = f"{SEGMENT_PREFIX}{stamp}-{os.getpid()}-{_Segment._sequence:06d}{SEGMENT_SUFFIX}"
+        self.path = os.path.join(directory, name)
+        _Segment._sequence += 1
+
+        self._sink = pa.OSFile(self.path, "wb")
+        self._writer = ipc.new_stream(self._sink, schema)
+        self.opened = time.time()
+
+    @property
+    def size(self):
+        return self._sink.tell()
+
+    def write(self, batch):
+        self._writer.write_batch(batch)
+        self._sink.flush()
+
+    def close(self):
+        self._writer.close()
+        self._sink.close()
+
+
+def list_segments(directory=None):
+    """Segment paths, oldest first."""
+    directory = directory or config.JOURNAL_DIR
+    if not os.path.isdir(directory):
+        return []
+    # Names start with the opening time, so name order is age order
+    names = sorted(f for f in os.listdir(directory) if f.startswith(SEGMENT_PREFIX) and f.endswith(SEGMENT_SUFFIX))
+    return [os.path.join(directory, f) for f in names]
+
+
+# ================================================================
+# Writer
+# ================================================================
+class PredictionJournal:
+
+    def __init__(self, directory=None):
+        self.directory = directory or config.JOURNAL_DIR
+        self.top_k = config.JOURNAL_TOP_K
+
+        self._queue = queue.Queue(maxsize=config.JOURNAL_QUEUE_SIZE)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+        self._start()
+        atexit.register(self.close)
+
+        # A forked child inherits the queue but not the writer thread
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    # ------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------
+    def record(self, text, model, version, result, labels=None):
+        """
+        result: IntentRecognizer parse() output ({"intent", "probs",
+        "params", "timings"}); labels: class names aligned with probs.
+        """
+        try:
+            self._queue.put_nowait((time.time(), current_request_id(), text, model, str(version), result, labels))
+        except queue.Full:
+            # Never block a prediction on the journal
+            with self._lock:
+                self.dropped += 1
+                first = self.dropped == 1
+            if first:
+                log.warn(f"[Journal] Queue full ({config.JOURNAL_QUEUE_SIZE}), dropping entries")
+
+    def flush(self, timeout=5.0):
+        """Blocks until everything recorded so far is written."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return
+        done.wait(timeout)
+
+    def close(self):
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=10.0)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=10.0)
+        self._thread = None
+
+    # ------------------------------------------------------------
+    # Background writer
+    # ------------------------------------------------------------
+    def _start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._writer_loop, name="intentiq-journal", daemon=True)
+            self._thread.start()
+
+    def _after_fork(self):
+        self._queue = queue.Queue(maxsize=config.JOURNAL_QUEUE_SIZE)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._start()
+
+    def _row(self, item):
+        ts, request_id, text, model, version, result, labels = item
+        probs = result.get("probs")
+
+        top_k, confidence = [], None
+        if probs is not None and labels is not None:
+            ranked = sorted(range(len(probs)), key=lambda i: probs[i], reverse=True)[:self.top_k]
+            top_k = [{"intent": str(labels[i]), "prob": float(probs[i])} for i in ranked]
+            confidence = top_k[0]["prob"] if top_k else None
+
+        return {
+            "ts": int(ts * 1000),
+            "request_id": request_id,
+            "text": text,
+            "model": model,
+            "version": version,
+            "intent": str(result.get("intent")),
+            "confidence": confidence,
+            "top_k": top_k,
+            "params": json.dumps(result.get("params") or {}, default=str),
+            "latency_ms": list((result.get("timings") or {}).items()),
+        }
+
+    def _retain(self):
+        if config.JOURNAL_MAX_SEGMENTS <= 0:
+            return
+        segments = list_segments(self.directory)
+        for path in segments[:-config.JOURNAL_MAX_SEGMENTS]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _writer_loop(self):
+        import pyarrow as pa
+
+        schema = _schema()
+        segment = None
+        pending, waiters = [], []
+        flush_at = None
+        running = True
+
+        while running:
+            timeout = max(0.0, flush_at - time.monotonic()) if pending else None
+            try:
+                items = [self._queue.get(timeout=timeout)]
+            except queue.Empty:
+                items = []
+            while items and len(pending) + len(items) < config.JOURNAL_BATCH_SIZE:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for item in items:
+                if item is None:
+                    running = False
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    if not pending:
+                        flush_at = time.monotonic() + config.JOURNAL_FLUSH_SECONDS
+                    pending.append(item)
+
+            due = not running or waiters or len(pending) >= config.JOURNAL_BATCH_SIZE
+            if pending and (due or time.monotonic() >= flush_at):
+                try:
+                    batch = pa.RecordBatch.from_pylist([self._row(item) for item in pending], schema=schema)
+                    if segment is not None and (
+                        (config.JOURNAL_MAX_BYTES and segment.size >= config.JOURNAL_MAX_BYTES)
+                        or (config.JOURNAL_ROTATE_SECONDS
+                            and time.time() - segment.opened >= config.JOURNAL_ROTATE_SECONDS)
+                    ):
+                        segment.close()
+                        segment = None
+                    if segment is None:
+                        segment = _Segment(self.directory, schema)
+                        self._retain()
+                    segment.write(batch)
+                except Exception as e:
+                    # Never let a journal failure kill the writer thread
+                    with self._lock:
+                        self.dropped += len(pending)
+                    log.warn(f"[Journal] Dropped {len(pending)} entries: {e}")
+                pending = []
+
+            for w in waiters:
+                w.set()
+            waiters = []
+
+        if segment is not None:
+            segment.close()
+
+
+_journal = None
+_journal_lock = threading.Lock()
+
+
+def get_journal():
+    """Process-wide journal, or None when JOURNAL_ENABLED is off."""
+    global _journal
+    if not config.JOURNAL_ENABLED:
+        return None
+    if _journal is None:
+        with _journal_lock:
+            if _journal is None:
+                _journal = PredictionJournal()
+    return _journal
+
+
+# ================================================================
+# Reading
+# ================================================================
+def iter_batches(paths=None):
+    """
+    Streams record batches from the segments (oldest first). A segment that
+    is still being written, or was cut off by a crash, ends at its last
+    complete batch.
+    """
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    for path in paths if paths is not None else list_segments():
+        try:
+            with pa.OSFile(path, "rb") as source:
+                reader = ipc.open_stream(source)
+                while True:
+                    try:
+                        yield reader.read_next_batch()
+                    except StopIteration:
+                        break
+        except (pa.ArrowInvalid, OSError) as e:
+            # Empty or partially written tail: nothing more to read in this segment
+            log.debug("[Journal] End of %s: %s", os.path.basename(path), e)
+
+
+def iter_entries(paths=None, since=None):
+    """Journal entries as dicts (params and latency_ms decoded), oldest first."""
+    for batch in iter_batches(paths):
+        for row in batch.to_pylist():
+            if since is not None and row["ts"] < since:
+                continue
+            row["params"] = json.loads(row["params"]) if row["params"] else {}
+            row["latency_ms"] = dict(row["latency_ms"] or [])
+            yield row
+
+
+def read_journal(paths=None):
+    """The whole journal as a pandas DataFrame."""
+    import pyarrow as pa
+
+    batches = list(iter_batches(paths))
+    return pa.Table.from_batches(batches, schema=_schema()).to_pandas()
+
+
+def export_low_confidence(out_path, threshold=None, model=None, since=None, paths=None):
+    """
+    Writes queries whose top probability is below `threshold` to a
+    text,intent CSV, least confident first, one row per distinct text.
+    Returns the number of rows written.
+    """
+    threshold = config.JOURNAL_LOW_CONFIDENCE if threshold is None else threshold
+
+    lowest = {}
+    for entry in iter_entries(paths, since):
+        confidence = entry["confidence"]
+        if confidence is None or confidence >= threshold:
+            continue
+        if model is not None and entry["model"] != model:
+            continue
+
+        key = entry["text"].strip().lower()
+        if key not in lowest or confidence < lowest[key][0]:
+            lowest[key] = (confidence, entry["text"].strip(), entry["intent"])
+
+    rows = sorted(lowest.values())
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["text", "intent"])
+        for _, text, intent in rows:
+            writer.writerow([text, intent])
+    return len(rows)
+
+
+# ================================================================
+# CLI
+# ================================================================
+def _since(hours):
+    if hours is None:
+        return None
+    return datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=hours)
+
+
+def _stats(args):
+    df = read_journal()
+    if args.hours is not None:
+        df = df[df["ts"] >= _since(args.hours)]
+    if df.empty:
+        print("[Journal] No entries.")
+        return
+
+    print(f"\n[Journal] {len(df)} entries in {len(list_segments())} segments "
+          f"({df['ts'].min()} → {df['ts'].max()})")
+    for (model, version), group in df.groupby(["model", "version"]):
+        confidence = group["confidence"].dropna()
+        low = (confidence < args.threshold).mean() if len(confidence) else 0.0
+        latencies = {}
+        for stages in group["latency_ms"]:
+            for stage, ms in stages or []:
+                latencies.setdefault(stage, []).append(ms)
+        stage_str = "  ".join(
+            f"{stage} p50 {sorted(v)[len(v) // 2]:.1f}ms" for stage, v in sorted(latencies.items())
+        )
+        print(f"  {model} v{version}: {len(group)} predictions, mean confidence "
+              f"{confidence.mean():.3f}, {low:.1%} below {args.threshold}  {stage_str}")
+
+
+def _show(args):
+    entries = list(iter_entries(since=_since(args.hours)))
+    for e in entries[-args.last:]:
+        top = ", ".join(f"{t['intent']} {t['prob']:.2f}" for t in e["top_k"])
+        print(f"{e['ts']:%Y-%m-%d %H:%M:%S}  {e['model']} v{e['version']}  {e['intent']:<16} "
+              f"[{top}]  {e['text']!r}")
+
+
+def _export(args):
+    count = export_low_confidence(args.out, args.threshold, args.model, _since(args.hours))
+    log.info(f"[Journal] Exported {count} low-confidence queries (< {args.threshold}) to {args.out}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect and export the prediction journal")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_stats = sub.add_parser("stats", help="Entries, confidence and stage latency per model version")
+    p_show = sub.add_parser("show", help="Print the most recent entries")
+    p_show.add_argument("--last", type=int, default=20)
+    p_export = sub.add_parser("export", help="Low-confidence queries as a trainer (text,intent) CSV")
+    p_export.add_argument("--out", default=os.path.join(config.JOURNAL_DIR, "low_confidence.csv"))
+    p_export.add_argument("--model", help="Only this model family")
+
+    for p in (p_stats, p_export):
+        p.add_argument("--threshold", type=float, default=config.JOURNAL_LOW_CONFIDENCE)
+    for p in (p_stats, p_show, p_export):
+        p.add_argument("--hours", type=float, help="Only the last N hours")
+
+    args = parser.parse_args(argv)
+    {"stats": _stats, "show": _show, "export": _export}[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
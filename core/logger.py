@@ -1,32 +1,313 @@
 #logger.py
+"""
+Non-blocking logger for IntentIQ.
+
+Callers only pay for a level check and a queue.put(); timestamp formatting,
+console echo and file I/O happen in batches on a background writer thread.
+
+    log.info("[Router] Routed %s in %.1fms", intent, ms)   # formatted lazily
+    log.debug(...)                                          # dropped before formatting unless LOG_LEVEL=DEBUG
+
+    with request_scope() as rid:     # request ID attached to every record (JSON-lines output)
+        ...
+"""
 
 import os
+import gzip
+import json
+import time
+import queue
+import uuid
+import atexit
+import shutil
 import datetime
+import threading
+import contextvars
 from core import config
 
+DEBUG, INFO, WARN, ERROR = 10, 20, 30, 40
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARN: "WARN", ERROR: "ERROR"}
+_LEVELS_BY_NAME = {"DEBUG": DEBUG, "INFO": INFO, "WARN": WARN, "WARNING": WARN, "ERROR": ERROR}
+
+_request_id = contextvars.ContextVar("intentiq_request_id", default=None)
+
+
+# ================================================================
+# Request IDs
+# ================================================================
+def new_request_id():
+    return uuid.uuid4().hex[:12]
+
+
+def current_request_id():
+    return _request_id.get()
+
+
+class request_scope:
+    """Binds a request ID to every log record (and trace) created inside the block."""
+
+    def __init__(self, request_id=None):
+        self.request_id = request_id or new_request_id()
+        self._token = None
+
+    def __enter__(self):
+        self._token = _request_id.set(self.request_id)
+        return self.request_id
+
+    def __exit__(self, exc_type, exc, tb):
+        _request_id.reset(self._token)
+        return False
+
+
+# ================================================================
+# Rotating file
+# ================================================================
+class _RotatingFile:
+    """Append-only file with size/time based rotation and gzip compression."""
+
+    def __init__(self, path, max_bytes, rotate_seconds, backup_count, compress):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backup_count = backup_count
+        self.compress = compress
+        self._open()
+
+    def _open(self):
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+        self._rotate_at = time.time() + self.rotate_seconds if self.rotate_seconds else None
+
+    def write(self, data):
+        if self._should_rotate(len(data)):
+            self.rotate()
+        self._file.write(data)
+        self._size += len(data)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def _should_rotate(self, incoming):
+        if self._size == 0:
+            return False
+        if self.max_bytes and self._size + incoming > self.max_bytes:
+            return True
+        return self._rotate_at is not None and time.time() >= self._rotate_at
+
+    def _backup_name(self, index):
+        return f"{self.path}.{index}" + (".gz" if self.compress else "")
+
+    def rotate(self):
+        self._file.close()
+
+        if self.backup_count > 0:
+            oldest = self._backup_name(self.backup_count)
+            if os.path.exists(oldest):
+                os.remove(oldest)
+
+            for i in range(self.backup_count - 1, 0, -1):
+                src = self._backup_name(i)
+                if os.path.exists(src):
+                    os.replace(src, self._backup_name(i + 1))
+
+            if self.compress:
+                with open(self.path, "rb") as src, gzip.open(self._backup_name(1), "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self._backup_name(1))
+        else:
+            os.remove(self.path)
+
+        self._open()
+
+
+# ================================================================
+# Logger
+# ================================================================
 class Logger:
 
-    def __init__(self):
-        os.makedirs(config.LOG_DIR, exist_ok=True)
-        self.log_file = os.path.join(config.LOG_DIR, "intent_iq.log")
+    def __init__(self, log_dir=None, level=None, console=None, json_lines=None):
+        self.log_dir = log_dir or config.LOG_DIR
+        os.makedirs(self.log_dir, exist_ok=True)
+        self.log_file = os.path.join(self.log_dir, config.LOG_FILE_NAME)
+        self.json_file = os.path.splitext(self.log_file)[0] + ".jsonl"
+
+        self.level = _LEVELS_BY_NAME.get(str(level or config.LOG_LEVEL).upper(), INFO)
+        self.console = config.LOG_CONSOLE if console is None else console
+        self.json_lines = config.LOG_JSON if json_lines is None else json_lines
+
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._ts_cache = (None, "")
+        self._rotate = True
+
+        self._start()
+        atexit.register(self.close)
+
+        # A forked child (process pools) inherits the queue but not the writer thread
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    # ------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------
+    def set_level(self, level):
+        self.level = _LEVELS_BY_NAME.get(str(level).upper(), self.level)
+
+    def is_enabled_for(self, levelno):
+        return levelno >= self.level
+
+    def debug(self, msg, *args):
+        if DEBUG >= self.level:
+            self._queue.put((time.time(), DEBUG, msg, args, _request_id.get()))
+
+    def info(self, msg, *args):
+        if INFO >= self.level:
+            self._queue.put((time.time(), INFO, msg, args, _request_id.get()))
+
+    def warn(self, msg, *args):
+        if WARN >= self.level:
+            self._queue.put((time.time(), WARN, msg, args, _request_id.get()))
+
+    warning = warn
+
+    def error(self, msg, *args):
+        if ERROR >= self.level:
+            self._queue.put((time.time(), ERROR, msg, args, _request_id.get()))
+
+    def flush(self, timeout=2.0):
+        """Blocks until everything logged so far is written (used before interactive prompts)."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self):
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=5.0)
+        self._thread = None
+
+    # ------------------------------------------------------------
+    # Background writer
+    # ------------------------------------------------------------
+    def _start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._writer_loop, name="intentiq-logger", daemon=True)
+            self._thread.start()
+
+    def _after_fork(self):
+        # The parent keeps appending to and rotating intent_iq.log; two processes rotating one
+        # file would clobber segments, so the child writes its own non-rotating intent_iq.<pid>.log
+        pid = os.getpid()
+        base, ext = os.path.splitext(os.path.join(self.log_dir, config.LOG_FILE_NAME))
+        self.log_file = f"{base}.{pid}{ext}"
+        self.json_file = f"{base}.{pid}.jsonl"
+        self._rotate = False
+
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._start()
+
+    def _rotating(self, path):
+        return _RotatingFile(
+            path,
+            max_bytes=config.LOG_MAX_BYTES if self._rotate else 0,
+            rotate_seconds=config.LOG_ROTATE_SECONDS if self._rotate else 0,
+            backup_count=config.LOG_BACKUP_COUNT,
+            compress=config.LOG_COMPRESS,
+        )
+
+    def _writer_loop(self):
+        text_out = self._rotating(self.log_file)
+        json_out = self._rotating(self.json_file) if self.json_lines else None
+
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while len(batch) < config.LOG_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines, records, waiters = [], [], []
+            for item in batch:
+                if item is None:
+                    running = False
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    line, record = self._format(item)
+                    lines.append(line)
+                    if json_out is not None:
+                        records.append(record)
+
+            try:
+                if lines:
+                    text = "\n".join(lines) + "\n"
+                    if self.console:
+                        print(text, end="", flush=True)
+                    text_out.write(text)
+                    text_out.flush()
+
+                if records:
+                    json_out.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+                    json_out.flush()
+            except Exception as e:
+                # Never let a logging failure kill the writer thread
+                print(f"[Logger] Write failed: {e}", flush=True)
+
+            for w in waiters:
+                w.set()
 
-    def _write(self, level, msg):
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        line = f"{timestamp} [{level}] {msg}"
+        text_out.close()
+        if json_out is not None:
+            json_out.close()
 
-        print(line)
+    def _timestamp(self, ts):
+        # strftime once per second, not once per line
+        second = int(ts)
+        cached_second, cached = self._ts_cache
+        if second != cached_second:
+            cached = datetime.datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S")
+            self._ts_cache = (second, cached)
+        return cached
 
-        with open(self.log_file, "a") as f:
-            f.write(line + "\n")
+    def _format(self, item):
+        ts, levelno, msg, args, request_id = item
 
-    def info(self, msg):
-        self._write("INFO", msg)
+        if args:
+            try:
+                msg = msg % args
+            except Exception:
+                msg = f"{msg} {args}"
+        else:
+            msg = str(msg)
 
-    def warn(self, msg):
-        self._write("WARN", msg)
+        level = LEVEL_NAMES[levelno]
+        line = f"{self._timestamp(ts)} [{level}] {msg}"
 
-    def error(self, msg):
-        self._write("ERROR", msg)
+        record = None
+        if self.json_lines:
+            record = {
+                "ts": datetime.datetime.fromtimestamp(ts).isoformat(timespec="milliseconds"),
+                "level": level,
+                "msg": msg,
+                "request_id": request_id,
+            }
+        return line, record
 
 # global logger instance
 log = Logger()
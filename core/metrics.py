@@ -0,0 +1,374 @@
+# core/metrics.py
+"""
+In-process metrics registry with Prometheus text exposition.
+
+Recording is lock-free on the hot path: every thread writes into its own
+shard (a plain dict held in threading.local), and shards are only summed
+when the metrics are rendered. The single lock is taken once per thread,
+the first time that thread touches a given metric. Shards of threads that
+have exited are folded into one retired total, so servers that spawn a
+thread per connection don't accumulate shards.
+
+    from core.metrics import REQUESTS, STAGE_LATENCY
+
+    REQUESTS.inc(intent="greeting")
+    STAGE_LATENCY.observe(0.004, stage="embed")
+
+Exposition:
+    start_http_server(9100)         # GET /metrics
+    dump_to_file("metrics.prom")    # CLI engine, on shutdown
+"""
+
+import os
+import time
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core import config
+from core.logger import log
+
+
+# ================================================================
+# Sharded storage
+# ================================================================
+class _Sharded:
+    """Base for metrics whose per-label values live in per-thread shards."""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []         # (owning thread, shard)
+        self._retired = {}        # merged shards of exited threads
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            self._local.shard = shard
+            with self._lock:
+                self._prune()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _prune(self):
+        # Caller holds _lock. A dead thread can no longer write to its shard
+        alive = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                self._merge(self._retired, shard)
+        self._shards = alive
+
+    def _merge(self, totals, shard):
+        raise NotImplementedError
+
+    def values(self):
+        totals = {}
+        with self._lock:
+            self._prune()
+            self._merge(totals, self._retired)
+            shards = [shard for _, shard in self._shards]
+        for shard in shards:
+            self._merge(totals, shard)
+        return totals
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"[Metrics] {self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _label_str(self, key, extra=None):
+        pairs = list(zip(self.labelnames, key))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+        return "{" + body + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# ================================================================
+# Metric types
+# ================================================================
+class Counter(_Sharded):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def _merge(self, totals, shard):
+        for key, v in list(shard.items()):
+            totals[key] = totals.get(key, 0) + v
+
+    def render(self):
+        lines = []
+        for key, v in sorted(self.values().items()):
+            lines.append(f"{self.name}{self._label_str(key)} {_fmt(v)}")
+        return lines
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    # Seconds; tuned for the 1ms – 10s range the pipeline stages live in
+    DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        state = shard.get(key)
+        if state is None:
+            # [bucket counts..., +Inf count, sum]
+            state = [0] * (len(self.buckets) + 1) + [0.0]
+            shard[key] = state
+
+        # bisect_left → first bucket with bound >= value (Prometheus "le" semantics)
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def _merge(self, totals, shard):
+        for key, state in list(shard.items()):
+            agg = totals.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0])
+            for i, v in enumerate(state):
+                agg[i] += v
+
+    def render(self):
+        lines = []
+        for key, state in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{self._label_str(key, ('le', _fmt(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_str(key)} {_fmt(state[-1])}")
+            lines.append(f"{self.name}_count{self._label_str(key)} {cumulative}")
+        return lines
+
+
+class Gauge(_Sharded):
+    """
+    Last-write-wins value per label set. Gauges are written rarely (model
+    loads) or computed at scrape time via set_function (queue depth, RSS),
+    so a plain dict under the GIL is enough here.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+        self._functions = {}
+
+    def set(self, value, **labels):
+        self._values[self._key(labels)] = value
+
+    def set_function(self, fn, **labels):
+        self._functions[self._key(labels)] = fn
+
+    def remove_function(self, **labels):
+        self._functions.pop(self._key(labels), None)
+
+    def values(self):
+        out = dict(self._values)
+        for key, fn in list(self._functions.items()):
+            try:
+                out[key] = fn()
+            except Exception:
+                continue
+        return out
+
+    def render(self):
+        return [f"{self.name}{self._label_str(key)} {_fmt(v)}" for key, v in sorted(self.values().items())]
+
+
+# ================================================================
+# Registry
+# ================================================================
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=Histogram.DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+# ================================================================
+# Process metrics
+# ================================================================
+def _process_rss_bytes():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    import resource
+    import sys
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# ================================================================
+# IntentIQ metrics
+# ================================================================
+REQUESTS = registry.counter(
+    "intentiq_requests_total", "Predictions served, by predicted intent.", ("intent",)
+)
+STAGE_LATENCY = registry.histogram(
+    "intentiq_stage_latency_seconds", "Latency of pipeline stages (embed, classify, skill).", ("stage",)
+)
+MODEL_LOAD_SECONDS = registry.gauge(
+    "intentiq_model_load_seconds", "Time taken by the last load of each model component.", ("component",)
+)
+QUEUE_DEPTH = registry.gauge(
+    "intentiq_queue_depth", "Current number of items waiting in internal queues.", ("queue",)
+)
+CACHE_REQUESTS = registry.counter(
+    "intentiq_cache_requests_total", "Cache lookups by cache and result (hit / miss).", ("cache", "result")
+)
+CACHE_HIT_RATIO = registry.gauge(
+    "intentiq_cache_hit_ratio", "Hit ratio per cache since process start.", ("cache",)
+)
+PROCESS_RSS = registry.gauge(
+    "intentiq_process_resident_memory_bytes", "Resident set size of the process."
+)
+PROCESS_RSS.set_function(_process_rss_bytes)
+
+
+_RATIO_CACHES = set()
+
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+    if cache not in _RATIO_CACHES:
+        _RATIO_CACHES.add(cache)
+        CACHE_HIT_RATIO.set_function(lambda c=cache: _hit_ratio(c), cache=cache)
+
+
+def _hit_ratio(cache):
+    values = CACHE_REQUESTS.values()
+    hits = values.get((cache, "hit"), 0)
+    total = hits + values.get((cache, "miss"), 0)
+    return hits / total if total else 0.0
+
+
+def track_queue(name, q):
+    """Registers a queue-like object (anything with qsize()) for depth reporting."""
+    QUEUE_DEPTH.set_function(q.qsize, queue=name)
+
+
+class timed_load:
+    """Context manager: `with timed_load("classifier"): ...` sets the load-time gauge."""
+
+    def __init__(self, component):
+        self.component = component
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            MODEL_LOAD_SECONDS.set(time.perf_counter() - self._start, component=self.component)
+        return False
+
+
+# ================================================================
+# Exposition
+# ================================================================
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the console
+        pass
+
+
+def start_http_server(port=None, host="127.0.0.1"):
+    """Serves /metrics on a daemon thread. Returns the server instance."""
+    port = config.METRICS_PORT if port is None else port
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+
+    thread = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+    thread.start()
+
+    log.info(f"[Metrics] Serving Prometheus metrics on http://{host}:{server.server_port}/metrics")
+    return server
+
+
+def dump_to_file(path=None):
+    path = path or config.METRICS_FILE
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    # Write-then-rename so node_exporter's textfile collector never reads a partial file
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(registry.render())
+    os.replace(tmp, path)
+    return path
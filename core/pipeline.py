@@ -0,0 +1,246 @@
+# core/pipeline.py
+"""
+Pipelined engine mode.
+
+    capture ──audio_ring──▶ stt ──text_q──▶ recognize ──intent_q──▶ dispatch
+
+Every stage runs on its own thread and hands work to the next through a
+bounded queue, so the microphone keeps being read while the previous
+utterance is still being recognized or its skill is still running.
+
+- Audio goes from the sounddevice callback into a preallocated ring buffer,
+  which never blocks the callback: on overflow the oldest audio is dropped
+  (and counted).
+- The other queues block when full, which throttles upstream stages
+  (backpressure) instead of growing without bound.
+- stop() sets a shared event, closes the mic stream and pushes a sentinel
+  through every queue so each stage drains and exits in order.
+"""
+
+import queue
+import threading
+import time
+
+from core import config
+from core import metrics
+from core.logger import log, request_scope
+from utils.timer import span
+from io_layer.audio_utils import AudioRingBuffer
+
+_STOP = object()
+
+EXIT_WORDS = ("exit", "quit", "stop", "shutdown")
+
+AUDIO_DROPPED = metrics.registry.counter(
+    "intentiq_pipeline_audio_dropped_total", "Audio samples dropped because the capture ring overflowed."
+)
+
+
+class _Utterance:
+    __slots__ = ("text", "captured_at", "intent", "probs", "params", "request_id")
+
+    def __init__(self, text):
+        self.text = text
+        self.captured_at = time.perf_counter()
+        self.intent = None
+        self.probs = None
+        self.params = None
+        self.request_id = None
+
+
+class PipelinedEngine:
+    """Runs an initialized IntentIQEngine (recognizer, router, optional stt) as a pipeline."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.voice = engine.input_mode == "voice"
+
+        self.blocksize = engine.stt.blocksize if self.voice else 0
+        self.audio_ring = AudioRingBuffer(
+            max(self.blocksize, 1) * config.PIPELINE_AUDIO_QUEUE_SIZE,
+            max_read=max(self.blocksize, 1),
+            overflow="drop_oldest",
+        )
+        self.text_q = queue.Queue(maxsize=config.PIPELINE_STAGE_QUEUE_SIZE)
+        self.intent_q = queue.Queue(maxsize=config.PIPELINE_STAGE_QUEUE_SIZE)
+
+        self._stopping = threading.Event()
+        self._stream = None
+        self._threads = []
+
+        metrics.track_queue("pipeline_audio", self.audio_ring)
+        metrics.track_queue("pipeline_text", self.text_q)
+        metrics.track_queue("pipeline_intent", self.intent_q)
+
+    # ------------------------------------------------------------
+    # Queue helpers
+    # ------------------------------------------------------------
+    def _put(self, q, item):
+        # Blocking put that still notices shutdown
+        while not self._stopping.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _forward_stop(self, q):
+        try:
+            q.put(_STOP, timeout=config.PIPELINE_JOIN_TIMEOUT)
+        except queue.Full:
+            pass
+
+    # ------------------------------------------------------------
+    # Stage 1: capture
+    # ------------------------------------------------------------
+    def _keyboard_stage(self):
+        # Text-mode producer; input() cannot be interrupted, so this thread is a daemon
+        while not self._stopping.is_set():
+            try:
+                log.flush()
+                text = input("\n[You] ").strip()
+            except EOFError:
+                self.stop()
+                return
+            if text and not self._put(self.text_q, _Utterance(text)):
+                return
+
+    # ------------------------------------------------------------
+    # Stage 2: speech-to-text
+    # ------------------------------------------------------------
+    def _stt_stage(self):
+        stt = self.engine.stt
+        dropped = 0
+        while not self._stopping.is_set():
+            block = self.audio_ring.read(self.blocksize, timeout=0.1)
+            if self.audio_ring.dropped != dropped:
+                AUDIO_DROPPED.inc(self.audio_ring.dropped - dropped)
+                dropped = self.audio_ring.dropped
+            if block is None:
+                continue
+
+            text = stt.accept_speech(block)
+            if text is not None:
+                print(f"[Voice Captured] : {text}")
+                if not self._put(self.text_q, _Utterance(text)):
+                    break
+
+        self._forward_stop(self.text_q)
+
+    # ------------------------------------------------------------
+    # Stage 3: intent recognition
+    # ------------------------------------------------------------
+    def _recognize_stage(self):
+        while True:
+            utt = self.text_q.get()
+            if utt is _STOP:
+                break
+
+            print(f"[User] {utt.text}")
+            if utt.text.lower() in EXIT_WORDS:
+                print("[System] Shutdown command received.")
+                self.stop()
+                break
+
+            with request_scope() as rid, span("pipeline.recognize"):
+                utt.request_id = rid
+                parsed = self.engine.recognizer.parse(utt.text)
+                utt.intent, utt.probs, utt.params = parsed["intent"], parsed["probs"], parsed["params"]
+
+            if not self._put(self.intent_q, utt):
+                break
+
+        self._forward_stop(self.intent_q)
+
+    # ------------------------------------------------------------
+    # Stage 4: skill dispatch
+    # ------------------------------------------------------------
+    def _dispatch_stage(self):
+        while True:
+            utt = self.intent_q.get()
+            if utt is _STOP:
+                break
+
+            if utt.intent == "exit":
+                print("[System] Exit intent detected. Shutting down...")
+                self.stop()
+                break
+
+            with request_scope(utt.request_id):
+                self.engine.show_prediction(utt.intent, utt.probs)
+                result = self.engine.router.route(utt.intent, utt.text, utt.params)
+                if result is not None:
+                    print(f"[Task] {result}")
+
+            log.info(
+                "[Pipeline] '%s' handled %.1fms after capture", utt.intent, (time.perf_counter() - utt.captured_at) * 1000
+            )
+
+    # ------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------
+    def _spawn(self, target, name, daemon=False):
+        t = threading.Thread(target=target, name=f"pipeline-{name}", daemon=daemon)
+        t.start()
+        self._threads.append(t)
+        return t
+
+    def start(self):
+        self._spawn(self._dispatch_stage, "dispatch")
+        self._spawn(self._recognize_stage, "recognize")
+
+        if self.voice:
+            self._spawn(self._stt_stage, "stt")
+            # Mic blocks (resampled to 16 kHz) go straight into audio_ring
+            self._stream = self.engine.stt.open_stream(self.audio_ring)
+            self._stream.start()
+            print("\n[Listening...] Pipelined mode, speak any time.")
+        else:
+            self._spawn(self._keyboard_stage, "keyboard", daemon=True)
+
+        log.info("[Pipeline] All stages running.")
+
+    def stop(self):
+        if self._stopping.is_set():
+            return
+        self._stopping.set()
+
+        # Stop producing audio first, then let the sentinel drain each stage
+        if self._stream is not None:
+            try:
+                self._stream.stop()
+            except Exception as e:
+                log.warn(f"[Pipeline] Error closing audio stream: {e}")
+            self._stream = None
+
+        # The stt stage notices the event itself; in text mode the sentinel starts the drain
+        if not self.voice:
+            try:
+                self.text_q.put_nowait(_STOP)
+            except queue.Full:
+                try:
+                    self.text_q.get_nowait()
+                except queue.Empty:
+                    pass
+                self.text_q.put_nowait(_STOP)
+
+    def join(self):
+        current = threading.current_thread()
+        for t in self._threads:
+            if t is not current and not t.daemon:
+                t.join(timeout=config.PIPELINE_JOIN_TIMEOUT)
+
+    def run(self):
+        self.start()
+        try:
+            # Wait on the event so Ctrl+C is delivered to the main thread
+            while not self._stopping.wait(0.5):
+                pass
+        except KeyboardInterrupt:
+            print("\n[System] Interrupted.")
+            self.stop()
+
+        self.join()
+        for name in ("pipeline_audio", "pipeline_text", "pipeline_intent"):
+            metrics.QUEUE_DEPTH.remove_function(queue=name)
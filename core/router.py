@@ -1,102 +1,269 @@
 # core/router.py
 
 import os
+import sys
+import queue
+import threading
 import importlib
+from concurrent.futures import Future
+from core import config
 from core.logger import log
+from core.executor import SkillExecutor, SkillSpec, SkillRejected, FutureTimeout
+from utils.timer import span
 
 
 class IntentRouter:
     """
     Maps predicted intent → corresponding skill module.
     Each skill file MUST contain a function: run(text)
+    (or run(text, params=None) to receive extracted slot values)
+
+    All skills are imported once at startup into a dispatch table
+    (intent → SkillSpec), so routing is a single dict lookup.
+    Skills execute through a SkillExecutor (bounded pools, per-skill
+    timeouts and concurrency caps), see core/executor.py.
+    A background watcher rescans skills/ by mtime and swaps in a new
+    table when a skill is added, edited or removed (hot reload).
     """
 
-    SKILLS_DIR = "skills"
+    SKILLS_DIR = config.SKILLS_DIR
+    SKILLS_PACKAGE = config.SKILLS_PACKAGE
+
+    def __init__(self, watch=True, executor=None):
+        self.executor = executor or SkillExecutor()
+        self.skill_map = {}       # intent → module path
+        self._dispatch = {}       # intent → SkillSpec (swapped atomically, never mutated)
+        self._mtimes = {}         # intent → mtime of the loaded file
+        self._broken = {}         # intent → import error of a skill file that exists but won't load
+
+        self._reload_lock = threading.Lock()
+        self._pending_placeholders = set()
+        self._placeholder_lock = threading.Lock()
+        self._placeholder_queue = queue.Queue()
+        self._stop = threading.Event()
 
-    def __init__(self):
-        self.skill_map = self._discover_skills()
+        self._discover_skills()
+
+        threading.Thread(
+            target=self._placeholder_worker, name="skill-placeholders", daemon=True
+        ).start()
+
+        if watch and config.SKILL_RELOAD_INTERVAL > 0:
+            threading.Thread(
+                target=self._watch_skills, name="skill-watcher", daemon=True
+            ).start()
 
     # -------------------------------------------------------------
     # Discover skill modules dynamically
     # -------------------------------------------------------------
-    def _discover_skills(self):
-        skills = {}
-        base_path = self.SKILLS_DIR
+    def _scan_skill_files(self):
+        found = {}
+        for file in os.listdir(self.SKILLS_DIR):
+            if file.endswith(".py") and file != "__init__.py":
+                path = os.path.join(self.SKILLS_DIR, file)
+                found[file[:-3]] = os.path.getmtime(path)
+        return found
 
-        try:
-            for file in os.listdir(base_path):
-                if file.endswith(".py") and file != "__init__.py":
-                    intent_name = file.replace(".py", "")
-                    module_path = f"{self.SKILLS_DIR}.{intent_name}"
-                    skills[intent_name] = module_path
+    def _load_skill(self, intent, reload=False):
+        module_path = f"{self.SKILLS_PACKAGE}.{intent}"
+
+        if reload and module_path in sys.modules:
+            module = importlib.reload(sys.modules[module_path])
+        else:
+            module = importlib.import_module(module_path)
+
+        if not callable(getattr(module, "run", None)):
+            raise AttributeError(f"Skill '{intent}' has no run(text) function.")
 
-            log.info(f"[Router] Skills discovered: {list(skills.keys())}")
+        return module_path, SkillSpec(intent, module_path, module)
 
+    def _discover_skills(self):
+        try:
+            files = self._scan_skill_files()
         except Exception as e:
             log.error(f"[Router] Failed to scan skills directory: {e}")
+            return
+
+        # Make sure new files are visible to the import system
+        importlib.invalidate_caches()
+
+        dispatch, skill_map, mtimes, broken = {}, {}, {}, {}
+        for intent, mtime in files.items():
+            mtimes[intent] = mtime
+            try:
+                module_path, skill = self._load_skill(intent)
+            except Exception as e:
+                log.error(f"[Router] Failed to load skill '{intent}': {e}")
+                broken[intent] = f"{type(e).__name__}: {e}"
+                continue
 
-        return skills
+            dispatch[intent] = skill
+            skill_map[intent] = module_path
+
+        self._dispatch, self.skill_map, self._mtimes, self._broken = dispatch, skill_map, mtimes, broken
+        log.info(f"[Router] Skills discovered: {list(skill_map.keys())}")
 
     # -------------------------------------------------------------
-    # Route intent → correct skill module
+    # Hot reload
     # -------------------------------------------------------------
-    def route(self, intent: str, text: str):
-        intent = intent.strip()
+    def reload_changed(self):
+        """
+        Rescans skills/ and reloads added / modified / removed skills.
+        Builds a fresh table and swaps it in with one assignment so
+        concurrent route() calls always see a consistent table.
+        Returns the list of intents that changed.
+        """
+        with self._reload_lock:
+            try:
+                files = self._scan_skill_files()
+            except Exception as e:
+                log.error(f"[Router] Failed to scan skills directory: {e}")
+                return []
+
+            changed = [i for i, m in files.items() if self._mtimes.get(i) != m]
+            removed = [i for i in self._mtimes if i not in files]
+            if not changed and not removed:
+                return []
+
+            importlib.invalidate_caches()
+
+            dispatch = dict(self._dispatch)
+            skill_map = dict(self.skill_map)
+            mtimes = dict(self._mtimes)
+            broken = dict(self._broken)
+
+            for intent in removed:
+                dispatch.pop(intent, None)
+                skill_map.pop(intent, None)
+                mtimes.pop(intent, None)
+                broken.pop(intent, None)
+
+            for intent in changed:
+                # Record the mtime even on failure so a broken file isn't retried every scan
+                mtimes[intent] = files[intent]
+                try:
+                    module_path, skill = self._load_skill(intent, reload=intent in self._mtimes)
+                except Exception as e:
+                    if intent in dispatch:
+                        log.error(f"[Router] Failed to reload skill '{intent}' (keeping previous version): {e}")
+                    else:
+                        log.error(f"[Router] Failed to load skill '{intent}': {e}")
+                        broken[intent] = f"{type(e).__name__}: {e}"
+                    continue
 
-        # ---------------------------------------------------------
-        # AUTO-CREATE PLACEHOLDER SKILL IF MISSING
-        # ---------------------------------------------------------
-        if intent not in self.skill_map:
-            print(f"[Router] No existing skill for '{intent}'. Creating placeholder...")
+                dispatch[intent] = skill
+                skill_map[intent] = module_path
+                broken.pop(intent, None)
+
+            self.skill_map, self._mtimes, self._broken = skill_map, mtimes, broken
+            self._dispatch = dispatch
+
+            # Results of the old code must not outlive it
+            for intent in changed + removed:
+                self.executor.cache.invalidate(intent)
+
+        log.info(f"[Router] Reloaded skills: changed={changed} removed={removed}")
+        return changed + removed
+
+    def _watch_skills(self):
+        while not self._stop.wait(config.SKILL_RELOAD_INTERVAL):
+            self.reload_changed()
+
+    def close(self):
+        self._stop.set()
+        self._placeholder_queue.put(None)
+        self.executor.shutdown()
+
+    # -------------------------------------------------------------
+    # Placeholder skills (generated off the request path)
+    # -------------------------------------------------------------
+    def _placeholder_worker(self):
+        while True:
+            intent = self._placeholder_queue.get()
+            if intent is None:
+                return
 
             skill_path = os.path.join(self.SKILLS_DIR, f"{intent}.py")
+            try:
+                if not os.path.exists(skill_path):
+                    with open(skill_path, "w") as f:
+                        f.write(
+                            "def run(text):\n"
+                            f"    print('Placeholder skill executed for intent: {intent}. Input:', text)\n"
+                        )
+                    log.info(f"[Router] Auto-created placeholder skill for '{intent}'")
+                self.reload_changed()
+            except Exception as e:
+                log.error(f"[Router] Failed to create placeholder skill '{intent}': {e}")
+            finally:
+                with self._placeholder_lock:
+                    self._pending_placeholders.discard(intent)
 
-            # Auto-create new skill file
-            with open(skill_path, "w") as f:
-                f.write(
-                    "def run(text):\n"
-                    f"    print('Placeholder skill executed for intent: {intent}. Input:', text)\n"
-                )
+    def _run_placeholder(self, intent, text):
+        with self._placeholder_lock:
+            queued = intent not in self._pending_placeholders
+            self._pending_placeholders.add(intent)
+        if queued:
+            log.info(f"[Router] No existing skill for '{intent}'. Creating placeholder...")
+            self._placeholder_queue.put(intent)
 
-            # Register new module
-            self.skill_map[intent] = f"{self.SKILLS_DIR}.{intent}"
-            print(f"[Router] Auto-created placeholder skill for '{intent}'")
+        print(f"Placeholder skill executed for intent: {intent}. Input:", text)
 
-        # ---------------------------------------------------------
-        # IMPORT MODULE
-        # ---------------------------------------------------------
-        module_name = self.skill_map[intent]
+    def get_skill(self, intent):
+        """Loaded SkillSpec for intent, or None (missing or failed to import)."""
+        return self._dispatch.get(intent.strip())
 
-        try:
-            module = importlib.import_module(module_name)
-        except Exception as e:
-            msg = f"[Router] Failed to import module '{module_name}': {e}"
-            if self.logger:
-                self.logger.error(msg)
-            else:
-                print(msg)
-            return
+    def _broken_skill(self, intent):
+        """SkillRejected for a skill file that exists but fails to import, else None."""
+        error = self._broken.get(intent)
+        if error is None:
+            return None
+        return SkillRejected(f"Skill '{intent}' failed to load ({error}); fix skills/{intent}.py")
 
-        # ---------------------------------------------------------
-        # CHECK IF run() EXISTS
-        # ---------------------------------------------------------
-        if not hasattr(module, "run"):
-            msg = f"[Router] Skill '{intent}' has no run(text) function."
-            if self.logger:
-                self.logger.error(msg)
-            else:
-                print(msg)
-            return
+    # -------------------------------------------------------------
+    # Route intent → correct skill module
+    # -------------------------------------------------------------
+    @span("router.route")
+    def route(self, intent: str, text: str, params=None):
+        """
+        Runs the skill and waits (up to its TIMEOUT) for the result.
+        params (slot values from IntentRecognizer.parse) are passed to
+        skills whose run() accepts them.
+        """
+        intent = intent.strip()
+
+        skill = self._dispatch.get(intent)
+        if skill is None:
+            broken = self._broken_skill(intent)
+            if broken is not None:
+                log.error("[Router] %s", broken)
+                return None
+            return self._run_placeholder(intent, text)
 
-        # ---------------------------------------------------------
-        # EXECUTE SKILL
-        # ---------------------------------------------------------
         try:
-            return module.run(text)
+            return self.executor.run(skill, text, params)
+        except FutureTimeout:
+            log.warn("[Router] Skill '%s' timed out after %ss", intent, skill.timeout)
+        except SkillRejected as e:
+            log.warn("[Router] %s", e)
         except Exception as e:
-            msg = f"[Router] Error running skill '{intent}': {e}"
-            if self.logger:
-                self.logger.error(msg)
-            else:
-                print(msg)
-            return
\ No newline at end of file
+            log.error("[Router] Error running skill '%s': %s", intent, e)
+
+    def route_async(self, intent: str, text: str, params=None):
+        """
+        Non-blocking variant for servers: returns a Future with the skill
+        result. Raises SkillRejected when the executor applies backpressure
+        or the skill's file fails to import.
+        """
+        intent = intent.strip()
+
+        skill = self._dispatch.get(intent)
+        if skill is None:
+            broken = self._broken_skill(intent)
+            if broken is not None:
+                raise broken
+            future = Future()
+            future.set_result(self._run_placeholder(intent, text))
+            return future
+
+        return self.executor.submit(skill, text, params)
@@ -0,0 +1,198 @@
+# core/skill_cache.py
+"""
+Result cache for skills (used by SkillExecutor.submit).
+
+A skill opts in at module level:
+
+    CACHE_TTL = 300                    # seconds a result stays valid
+
+    def cache_key(text, params):       # optional; returning None skips the cache
+        return (params or {}).get("location")
+
+Without cache_key the key is the normalized text plus the params. Only the
+return value is cached, so a cacheable skill must return its response
+rather than print it.
+
+- one LRU for all skills, bounded by SKILL_CACHE_MAX_ENTRIES
+- identical calls arriving while the first one runs wait for it instead of
+  running again (singleflight); every caller gets its own Future, so one
+  caller timing out never cancels the shared run
+- only successful results are stored; errors reach every waiting caller
+- a hot-reloaded skill's entries are dropped (invalidate)
+"""
+
+import json
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from core import config
+from core.logger import log
+from core.metrics import record_cache
+
+
+def follow(source):
+    """A Future that completes with `source`; cancelling it leaves `source` alone."""
+    child = Future()
+
+    def copy(f):
+        if not child.set_running_or_notify_cancel():
+            return
+        error = f.exception()
+        if error is not None:
+            child.set_exception(error)
+        else:
+            child.set_result(f.result())
+
+    source.add_done_callback(copy)
+    return child
+
+
+def _resolved(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def default_key(text, params):
+    text = " ".join(str(text).lower().split())
+    return (text, json.dumps(params, sort_keys=True, default=str)) if params else (text, "")
+
+
+class _CacheStats:
+    __slots__ = ("hits", "misses", "coalesced", "expired", "evictions")
+
+    def __init__(self):
+        self.hits = self.misses = self.coalesced = self.expired = self.evictions = 0
+
+
+class SkillCache:
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or config.SKILL_CACHE_MAX_ENTRIES
+
+        self._entries = OrderedDict()   # (intent, key) → (expires_at, result)
+        self._inflight = {}             # (intent, key) → (leader Future, generation)
+        self._generation = {}           # intent → bumped on invalidate
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _stat(self, intent):
+        stats = self._stats.get(intent)
+        if stats is None:
+            stats = self._stats.setdefault(intent, _CacheStats())
+        return stats
+
+    def key(self, spec, text, params):
+        """Cache key for this call, or None when it must not be cached."""
+        if spec.cache_key is None:
+            return default_key(text, params)
+        try:
+            key = spec.cache_key(text, params)
+            hash(key)
+            return key
+        except Exception as e:
+            log.warn("[Cache] cache_key of '%s' failed, running uncached: %s", spec.intent, e)
+            return None
+
+    # ------------------------------------------------------------
+    # Lookup / completion
+    # ------------------------------------------------------------
+    def lookup(self, spec, key):
+        """
+        Returns (future, None) when the result is cached or already being
+        computed, else (None, leader): the caller runs the skill and reports
+        the outcome with complete().
+        """
+        cache_key = (spec.intent, key)
+        now = time.monotonic()
+        outcome = "miss"
+
+        with self._lock:
+            stats = self._stat(spec.intent)
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[cache_key]
+                stats.expired += 1
+                entry = None
+
+            if entry is not None:
+                self._entries.move_to_end(cache_key)
+                stats.hits += 1
+                outcome, value = "hit", entry[1]
+            elif cache_key in self._inflight:
+                stats.coalesced += 1
+                outcome, leader = "coalesced", self._inflight[cache_key][0]
+            else:
+                stats.misses += 1
+                leader = Future()
+                leader.set_running_or_notify_cancel()
+                self._inflight[cache_key] = (leader, self._generation.get(spec.intent, 0))
+
+        record_cache(f"skill_{spec.intent}", hit=outcome != "miss")
+        if outcome == "hit":
+            return _resolved(value), None
+        if outcome == "coalesced":
+            return follow(leader), None
+        return None, leader
+
+    def complete(self, spec, key, future):
+        """Stores a successful result and hands the outcome to every waiting caller."""
+        cache_key = (spec.intent, key)
+        failed = future.cancelled() or future.exception() is not None
+
+        with self._lock:
+            leader, generation = self._inflight.pop(cache_key)
+            if not failed and generation == self._generation.get(spec.intent, 0):
+                self._entries[cache_key] = (time.monotonic() + spec.cache_ttl, future.result())
+                self._entries.move_to_end(cache_key)
+                while len(self._entries) > self.max_entries:
+                    (evicted_intent, _), _ = self._entries.popitem(last=False)
+                    self._stat(evicted_intent).evictions += 1
+
+        if future.cancelled():
+            leader.set_exception(RuntimeError(f"Skill '{spec.intent}' run was cancelled"))
+        elif failed:
+            leader.set_exception(future.exception())
+        else:
+            leader.set_result(future.result())
+
+    def abandon(self, spec, key, error):
+        """The leader could not even be submitted (e.g. SkillRejected): fail its waiters."""
+        with self._lock:
+            leader, _ = self._inflight.pop((spec.intent, key))
+        leader.set_exception(error)
+
+    # ------------------------------------------------------------
+    # Maintenance / reporting
+    # ------------------------------------------------------------
+    def invalidate(self, intent=None):
+        """Drops the cached results of one skill (all skills when intent is None)."""
+        with self._lock:
+            if intent is None:
+                self._entries.clear()
+                for name in set(self._generation) | {i for i, _ in self._inflight}:
+                    self._generation[name] = self._generation.get(name, 0) + 1
+                return
+            for cache_key in [k for k in self._entries if k[0] == intent]:
+                del self._entries[cache_key]
+            self._generation[intent] = self._generation.get(intent, 0) + 1
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        out = {}
+        for intent, s in list(self._stats.items()):
+            served = s.hits + s.coalesced
+            total = served + s.misses
+            out[intent] = {
+                "cache_hits": s.hits,
+                "cache_misses": s.misses,
+                "cache_coalesced": s.coalesced,
+                "cache_expired": s.expired,
+                "cache_evictions": s.evictions,
+                "cache_hit_rate": served / total if total else 0.0,
+            }
+        return out
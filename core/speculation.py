@@ -0,0 +1,293 @@
+# core/speculation.py
+"""
+Streaming partial-result intent speculation for Vosk.
+
+While the user is still speaking, Vosk's PartialResult() is watched. Once a
+partial hypothesis stays unchanged for SPECULATION_STABLE_CHUNKS chunks, the
+intent is predicted from it on a worker thread. If the prediction is
+confident and the target skill declares
+
+    SPECULATIVE = True      # run() is side-effect free; its return value is the response
+
+the skill is started too (skills/get_time.py does). When the final transcript arrives:
+
+- final == speculated text → hit: prediction (and skill run) reused
+- otherwise                → miss: discard, handle the final transcript normally
+
+A skill run started on the partial text is never handed over for a different
+final text, even when intent and params agree ("what's the weather" vs
+"what's the weather in Paris": params are {} outside the Joint family).
+
+Only hits count towards the latency saved.
+
+Replay WAV files offline to measure hit rate and latency saved:
+    python -m core.speculation --model-family LR recordings/*.wav
+"""
+
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from core import config
+from core.logger import log
+from core.metrics import registry
+
+SPECULATION_OUTCOMES = registry.counter(
+    "intentiq_speculation_total", "Utterances by speculation outcome (hit, miss, none).", ("outcome",)
+)
+SPECULATION_SAVED = registry.histogram(
+    "intentiq_speculation_saved_seconds", "Latency hidden by committed speculations."
+)
+
+
+class _Speculation:
+    __slots__ = ("text", "started", "finished", "prediction", "ready",
+                 "intent", "probs", "params", "skill_future")
+
+    def __init__(self, text, prediction):
+        self.text = text
+        self.started = time.perf_counter()
+        self.finished = None
+        self.prediction = prediction      # Future[parse() result]
+        self.ready = threading.Event()    # set once _on_prediction has settled skill_future
+        self.intent = None
+        self.probs = None
+        self.params = None
+        self.skill_future = None
+
+
+class SpeculationResult:
+    __slots__ = ("text", "intent", "probs", "params", "outcome", "saved_ms", "skill_future")
+
+    def __init__(self, text, intent, probs, outcome, saved_ms=0.0, skill_future=None, params=None):
+        self.text = text
+        self.intent = intent
+        self.probs = probs
+        self.params = params or {}
+        self.outcome = outcome            # "hit" | "miss" | "none"
+        self.saved_ms = saved_ms
+        self.skill_future = skill_future  # committed speculative skill run, if any
+
+
+class SpeculativeRecognizer:
+
+    def __init__(self, stt, recognizer, router=None):
+        self.stt = stt
+        self.recognizer = recognizer
+        self.router = router
+
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculate")
+        self._lock = threading.Lock()
+        self._reset()
+
+        self.stats = {"utterances": 0, "speculated": 0, "hits": 0, "misses": 0, "saved_ms": 0.0}
+
+    def _reset(self):
+        self._last_partial = ""
+        self._stable = 0
+        self._spec = None
+
+    # ------------------------------------------------------------
+    # Speculation
+    # ------------------------------------------------------------
+    def _predict(self, text):
+        parsed = self.recognizer.parse(text)
+        return parsed["intent"], parsed["probs"], parsed["params"]
+
+    def _speculate(self, text):
+        # Partials are not journaled unless the final transcript reuses them
+        return self.recognizer.parse(text, journal=False)
+
+    def _on_prediction(self, spec, future):
+        try:
+            self._start_skill(spec, future)
+        finally:
+            spec.ready.set()
+
+    def _start_skill(self, spec, future):
+        try:
+            parsed = future.result()
+            spec.intent, spec.probs, spec.params = parsed["intent"], parsed["probs"], parsed["params"]
+        except Exception as e:
+            log.warn("[Speculation] Prediction failed for '%s': %s", spec.text, e)
+            spec.finished = time.perf_counter()
+            return
+
+        confidence = float(max(spec.probs)) if spec.probs is not None else 1.0
+        skill = self.router.get_skill(spec.intent) if self.router is not None else None
+
+        if (skill is not None and confidence >= config.SPECULATION_MIN_CONFIDENCE
+                and getattr(skill, "speculative", False)):
+            try:
+                spec.skill_future = self.router.executor.submit(skill, spec.text, spec.params)
+                spec.skill_future.add_done_callback(lambda _: setattr(spec, "finished", time.perf_counter()))
+                return
+            except Exception as e:
+                log.warn("[Speculation] Could not start '%s' speculatively: %s", spec.intent, e)
+
+        spec.finished = time.perf_counter()
+
+    def _on_partial(self, partial):
+        if not partial or len(partial.split()) < config.SPECULATION_MIN_WORDS:
+            self._last_partial, self._stable = partial, 0
+            return
+
+        if partial != self._last_partial:
+            self._last_partial, self._stable = partial, 0
+            return
+
+        self._stable += 1
+        if self._stable < config.SPECULATION_STABLE_CHUNKS:
+            return
+        if self._spec is not None and self._spec.text == partial:
+            return
+
+        # Newer stable hypothesis replaces the old speculation
+        self._discard(self._spec)
+
+        spec = _Speculation(partial, self._pool.submit(self._speculate, partial))
+        spec.prediction.add_done_callback(lambda f: self._on_prediction(spec, f))
+        self._spec = spec
+        self.stats["speculated"] += 1
+        log.debug("[Speculation] Started on partial '%s'", partial)
+
+    def _discard(self, spec):
+        if spec is not None and spec.skill_future is not None:
+            spec.skill_future.cancel()
+
+    # ------------------------------------------------------------
+    # Final transcript
+    # ------------------------------------------------------------
+    def _on_final(self, text):
+        final_at = time.perf_counter()
+        spec, self._spec = self._spec, None
+        self._last_partial, self._stable = "", 0
+
+        if not text:
+            self._discard(spec)
+            return None
+
+        self.stats["utterances"] += 1
+
+        if spec is None:
+            intent, probs, params = self._predict(text)
+            SPECULATION_OUTCOMES.inc(outcome="none")
+            return SpeculationResult(text, intent, probs, "none", params=params)
+
+        # result() wakes before the done-callback has run; ready covers skill_future too
+        try:
+            parsed = spec.prediction.result()   # usually already done
+        except Exception:
+            parsed = None                       # logged by _on_prediction
+        spec.ready.wait()
+
+        reused = parsed is not None and text == spec.text
+        if reused:
+            intent, probs, params = parsed["intent"], parsed["probs"], parsed["params"]
+            self.recognizer.record(text, parsed)
+        else:
+            intent, probs, params = self._predict(text)
+
+        if not reused:
+            # The skill ran on the partial text; the final transcript is routed again
+            self._discard(spec)
+            self.stats["misses"] += 1
+            SPECULATION_OUTCOMES.inc(outcome="miss")
+            return SpeculationResult(text, intent, probs, "miss", params=params)
+
+        # Work that overlapped with the rest of the utterance
+        done_at = spec.finished if spec.finished is not None else final_at
+        saved = max(0.0, min(final_at, done_at) - spec.started)
+
+        self.stats["hits"] += 1
+        self.stats["saved_ms"] += saved * 1000
+        SPECULATION_OUTCOMES.inc(outcome="hit")
+        SPECULATION_SAVED.observe(saved)
+        return SpeculationResult(text, intent, probs, "hit", saved * 1000, spec.skill_future, params)
+
+    # ------------------------------------------------------------
+    # Driving audio
+    # ------------------------------------------------------------
+    def feed(self, chunk):
+        """Feeds one audio chunk. Returns a SpeculationResult when an utterance ends."""
+        final, partial = self.stt.accept_chunk_streaming(chunk)
+        if final is None:
+            self._on_partial(partial)
+            return None
+        return self._on_final(final)
+
+    def finish(self):
+        """Flushes buffered audio (end of a replayed stream)."""
+        return self._on_final(self.stt.flush())
+
+    def listen(self):
+        """Live microphone: blocks until one utterance is recognized."""
+        print("\n[Listening...] Speak now.")
+        self.stt.ring.clear()
+        with self.stt.open_stream():
+            while True:
+                result = self.feed(self.stt.read_block())
+                if result is not None:
+                    print(f"[Voice Captured] : {result.text}")
+                    return result
+
+    def replay(self, chunks, realtime=False, chunk_seconds=0.25):
+        """Runs an iterable of audio chunks (e.g. a WAV file) and returns all results."""
+        results = []
+        for chunk in chunks:
+            if realtime:
+                time.sleep(chunk_seconds)
+            result = self.feed(chunk)
+            if result is not None:
+                results.append(result)
+
+        tail = self.finish()
+        if tail is not None:
+            results.append(tail)
+        return results
+
+    def summary(self):
+        s = dict(self.stats)
+        decided = s["hits"] + s["misses"]
+        s["hit_rate"] = s["hits"] / decided if decided else 0.0
+        s["avg_saved_ms"] = s["saved_ms"] / s["hits"] if s["hits"] else 0.0
+        return s
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ================================================================
+# Offline replay
+# ================================================================
+def main(argv=None):
+    from io_layer.stt_vosk import VoskSTT
+    from io_layer.audio_utils import iter_wav_chunks
+    from intent_system.intent_recognizer import IntentRecognizer
+
+    parser = argparse.ArgumentParser(description="Replay WAV files through streaming speculation")
+    parser.add_argument("wav", nargs="+", help="16 kHz mono int16 WAV files")
+    parser.add_argument("--model-family", default=config.DEFAULT_MODEL_FAMILY)
+    parser.add_argument("--model-version", default=config.DEFAULT_MODEL_VERSION)
+    parser.add_argument("--chunk-frames", type=int, default=4000)
+    parser.add_argument("--realtime", action="store_true", help="Pace chunks like a live microphone")
+    args = parser.parse_args(argv)
+
+    stt = VoskSTT(model_path=config.VOSK_MODEL_PATH)
+    recognizer = IntentRecognizer(model_type=args.model_family, version=args.model_version)
+    speculator = SpeculativeRecognizer(stt, recognizer)
+
+    chunk_seconds = args.chunk_frames / stt.samplerate
+    for path in args.wav:
+        for r in speculator.replay(iter_wav_chunks(path, args.chunk_frames), args.realtime, chunk_seconds):
+            print(f"{path}: '{r.text}' → {r.intent} [{r.outcome}, saved {r.saved_ms:.1f}ms]")
+
+    s = speculator.summary()
+    print("\n[Speculation] utterances={utterances} speculated={speculated} hits={hits} "
+          "misses={misses} hit_rate={hit_rate:.1%} avg_saved={avg_saved_ms:.1f}ms".format(**s))
+    speculator.close()
+
+
+if __name__ == "__main__":
+    main()
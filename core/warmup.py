@@ -0,0 +1,80 @@
+# core/warmup.py
+"""
+Background model warm-up.
+
+Started from main.py before the engine asks any questions, so the slow
+loads (sentence-transformer, spaCy via the preprocess module, the most
+likely classifier) overlap with the interactive prompts instead of
+following them. Everything goes through the same process-wide caches the
+recognizer uses, so nothing is loaded twice.
+"""
+
+import threading
+import time
+
+from core import config
+from core.logger import log
+
+
+class ModelWarmup:
+
+    def __init__(self, model_type=None, version=None):
+        self.model_type = model_type or config.DEFAULT_MODEL_FAMILY
+        self.version = version
+        self._threads = []
+        self.timings = {}
+
+    def _task(self, name, fn):
+        def runner():
+            start = time.perf_counter()
+            try:
+                fn()
+                self.timings[name] = time.perf_counter() - start
+                log.info(f"[Warmup] {name} ready in {self.timings[name]:.2f}s")
+            except Exception as e:
+                log.warn(f"[Warmup] {name} failed: {e}")
+
+        t = threading.Thread(target=runner, name=f"warmup-{name}", daemon=True)
+        t.start()
+        self._threads.append(t)
+
+    # ------------------------------------------------------------
+    # Tasks
+    # ------------------------------------------------------------
+    def _load_embedder(self):
+        from utils.ensure_transformer import get_shared_transformer_model
+        model = get_shared_transformer_model()
+        # First encode pays tokenizer / kernel initialization
+        model.encode(["warm up"])
+
+    def _load_spacy(self):
+        # spaCy is loaded at import time of the preprocess module
+        from intent_system.preprocess import preprocess_text
+        preprocess_text("warm up")
+
+    def _load_classifier(self):
+        from intent_system.intent_recognizer import load_artifact
+        from intent_system.registry import get_registry
+
+        registry = get_registry(self.model_type)
+        version = registry.resolve(self.version)
+
+        load_artifact(registry.artifact_path(version, "classifier"))
+        load_artifact(registry.artifact_path(version, "label_encoder"))
+
+    # ------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------
+    def start(self):
+        log.info("[Warmup] Loading models in the background...")
+        self._task("embedder", self._load_embedder)
+        self._task("spacy", self._load_spacy)
+        if self.model_type in config.MODEL_TYPES:
+            self._task(f"classifier_{self.model_type}", self._load_classifier)
+        return self
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for t in self._threads:
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            t.join(remaining)
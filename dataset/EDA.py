@@ -0,0 +1,276 @@
+# dataset/EDA.py
+"""
+Exploratory data analysis and near-duplicate removal for intent datasets.
+
+    python -m dataset.EDA intents.csv
+    python -m dataset.EDA merged.csv --cos-threshold 0.9 --model-family SVC
+
+Near-duplicates are found two ways, both sub-quadratic:
+- MinHash / LSH over character 3-gram shingles (spelling-level variants)
+- random-hyperplane (SimHash) blocking over sentence embeddings, with exact
+  cosine similarity only computed inside each block (paraphrases)
+
+Pairs from both are merged into clusters (union-find). The report lists
+label conflicts (same or near-identical text, different intents), writes
+<name>_dedup.csv (one row per cluster and intent) plus <name>_conflicts.csv,
+and trains the chosen model family on the original and the deduplicated
+training split to compare training time and held-out accuracy.
+"""
+
+import os
+import re
+import time
+import zlib
+import argparse
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from core import config
+
+_MERSENNE = (1 << 61) - 1
+
+
+# ================================================================
+# Text normalization / shingles
+# ================================================================
+def normalize(text):
+    text = str(text).lower()
+    text = re.sub(r"[^\w\s']", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def shingles(text, k=3):
+    padded = f" {text} "
+    if len(padded) <= k:
+        return {padded}
+    return {padded[i:i + k] for i in range(len(padded) - k + 1)}
+
+
+# ================================================================
+# Union-find
+# ================================================================
+class DisjointSet:
+
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+    def labels(self):
+        return np.array([self.find(i) for i in range(len(self.parent))])
+
+
+# ================================================================
+# MinHash / LSH (text)
+# ================================================================
+def minhash_signatures(shingle_sets, num_perm=64, seed=7):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _MERSENNE, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, _MERSENNE, size=num_perm, dtype=np.uint64)
+
+    sigs = np.empty((len(shingle_sets), num_perm), dtype=np.uint64)
+    for i, sh in enumerate(shingle_sets):
+        h = np.array([zlib.crc32(s.encode()) for s in sh], dtype=np.uint64)
+        # (a*h + b) mod p, all permutations at once; uint64 wrap-around is fine for hashing
+        sigs[i] = ((np.outer(h, a) + b) % _MERSENNE).min(axis=0)
+    return sigs
+
+
+def minhash_pairs(texts, threshold=0.8, num_perm=64, bands=16):
+    """Candidate pairs from LSH buckets, verified by exact Jaccard similarity."""
+    sets = [shingles(t) for t in texts]
+    sigs = minhash_signatures(sets, num_perm)
+    rows = num_perm // bands
+
+    candidates = set()
+    for band in range(bands):
+        buckets = defaultdict(list)
+        block = sigs[:, band * rows:(band + 1) * rows]
+        for i, key in enumerate(map(bytes, block)):
+            buckets[key].append(i)
+        for members in buckets.values():
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    candidates.add((members[x], members[y]))
+
+    pairs = []
+    for i, j in candidates:
+        union = len(sets[i] | sets[j])
+        if union and len(sets[i] & sets[j]) / union >= threshold:
+            pairs.append((i, j))
+    return pairs, len(candidates)
+
+
+# ================================================================
+# Blocked cosine search (embeddings)
+# ================================================================
+def embedding_pairs(embeddings, threshold=0.92, tables=6, bits=10, block_size=1024, seed=11):
+    """
+    Pairs with cosine >= threshold. Rows are bucketed by random-hyperplane
+    signatures (several tables, so near vectors share at least one bucket
+    with high probability); similarities are only computed within buckets,
+    block_size rows at a time.
+    """
+    E = np.asarray(embeddings, dtype=np.float32)
+    E = E / np.maximum(np.linalg.norm(E, axis=1, keepdims=True), 1e-12)
+    rng = np.random.default_rng(seed)
+    weights = 1 << np.arange(bits)
+
+    pairs, compared = set(), 0
+    for _ in range(tables):
+        planes = rng.standard_normal((E.shape[1], bits)).astype(np.float32)
+        codes = ((E @ planes) > 0) @ weights
+
+        order = np.argsort(codes, kind="stable")
+        bounds = np.flatnonzero(np.diff(codes[order])) + 1
+        for members in np.split(order, bounds):
+            if len(members) < 2:
+                continue
+            for start in range(0, len(members), block_size):
+                rows = members[start:start + block_size]
+                cols = members[start:]
+                sims = E[rows] @ E[cols].T
+                compared += sims.size
+                for r, c in zip(*np.nonzero(sims >= threshold)):
+                    i, j = int(rows[r]), int(cols[c])
+                    if i != j:
+                        pairs.add((min(i, j), max(i, j)))
+    return sorted(pairs), compared
+
+
+# ================================================================
+# Training comparison
+# ================================================================
+def group_split(groups, test_size=0.2, seed=42):
+    """Train/test split by cluster, so near-duplicates never straddle the split."""
+    unique = np.unique(groups)
+    rng = np.random.default_rng(seed)
+    test_groups = set(rng.choice(unique, size=max(1, int(len(unique) * test_size)), replace=False))
+    test = np.array([g in test_groups for g in groups])
+    return np.flatnonzero(~test), np.flatnonzero(test)
+
+
+def train_and_score(model_family, X_train, y_train, X_test, y_test):
+    from intent_system.trainer import MODEL_REGISTRY
+
+    handler = MODEL_REGISTRY[model_family]()
+    start = time.perf_counter()
+    model = handler.train(X_train, y_train)
+    elapsed = time.perf_counter() - start
+
+    accuracy = float((model.predict(X_test) == y_test).mean()) if len(y_test) else float("nan")
+    support = int(model.n_support_.sum()) if hasattr(model, "n_support_") else None
+    return elapsed, accuracy, support
+
+
+# ================================================================
+# Main
+# ================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Intent dataset EDA and near-duplicate removal")
+    parser.add_argument("dataset", help="CSV with text,intent columns (name in dataset/ or a path)")
+    parser.add_argument("--text-threshold", type=float, default=0.8, help="MinHash Jaccard threshold")
+    parser.add_argument("--cos-threshold", type=float, default=0.92, help="Embedding cosine threshold")
+    parser.add_argument("--num-perm", type=int, default=64)
+    parser.add_argument("--bands", type=int, default=16)
+    parser.add_argument("--model-family", default="LR", help="Family for the before/after training run")
+    parser.add_argument("--no-train", action="store_true")
+    parser.add_argument("--out-dir", default=config.DATASET_DIR)
+    args = parser.parse_args(argv)
+
+    path = args.dataset if os.path.exists(args.dataset) else os.path.join(config.DATASET_DIR, args.dataset)
+    df = pd.read_csv(path)
+    if not {"text", "intent"} <= set(df.columns):
+        raise ValueError(f"[EDA] {path} needs 'text' and 'intent' columns, got {list(df.columns)}")
+    df = df.dropna(subset=["text", "intent"]).reset_index(drop=True)
+    stem = os.path.splitext(os.path.basename(path))[0]
+
+    # ---------------- Overview ----------------
+    texts = [normalize(t) for t in df["text"]]
+    lengths = np.array([len(t.split()) for t in texts])
+    print(f"[EDA] {path}: {len(df)} rows, {df['intent'].nunique()} intents, "
+          f"{lengths.mean():.1f} words/row (max {lengths.max()})")
+    print(df["intent"].value_counts().to_string())
+
+    # ---------------- Near-duplicates ----------------
+    from utils.ensure_transformer import get_shared_transformer_model
+
+    start = time.perf_counter()
+    embeddings = get_shared_transformer_model().encode(texts, batch_size=256, normalize_embeddings=True)
+    embed_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    text_pairs, text_candidates = minhash_pairs(texts, args.text_threshold, args.num_perm, args.bands)
+    emb_pairs, compared = embedding_pairs(embeddings, args.cos_threshold)
+    search_s = time.perf_counter() - start
+
+    dsu = DisjointSet(len(df))
+    for i, j in text_pairs + emb_pairs:
+        dsu.union(i, j)
+    clusters = dsu.labels()
+    df["cluster"] = clusters
+
+    n = len(df)
+    print(f"\n[EDA] Embedded in {embed_s:.2f}s; search {search_s:.2f}s "
+          f"({text_candidates} LSH candidates, {compared} cosine comparisons vs {n * (n - 1) // 2} all-pairs)")
+    print(f"[EDA] {len(text_pairs)} text pairs, {len(emb_pairs)} embedding pairs → "
+          f"{len(np.unique(clusters))} clusters for {n} rows")
+
+    # ---------------- Label conflicts ----------------
+    intents_per_cluster = df.groupby("cluster")["intent"].nunique()
+    conflict_ids = intents_per_cluster[intents_per_cluster > 1].index
+    conflicts = df[df["cluster"].isin(conflict_ids)].sort_values(["cluster", "intent"])
+
+    exact = pd.DataFrame({"norm": texts, "intent": df["intent"]}).groupby("norm")["intent"].nunique()
+    print(f"\n[EDA] Label conflicts: {len(conflict_ids)} clusters "
+          f"({int((exact > 1).sum())} with identical text)")
+    for cid, rows in list(conflicts.groupby("cluster"))[:10]:
+        print("  - " + " | ".join(f"'{t}' → {i}" for t, i in zip(rows["text"], rows["intent"])))
+
+    # ---------------- Dedup ----------------
+    # One row per (cluster, intent): conflicts are reported, not resolved silently
+    keep = ~df.duplicated(subset=["cluster", "intent"], keep="first")
+    dedup = df[keep].drop(columns=["cluster"])
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    dedup_path = os.path.join(args.out_dir, f"{stem}_dedup.csv")
+    dedup.to_csv(dedup_path, index=False)
+    print(f"\n[EDA] {len(df)} → {len(dedup)} rows ({1 - len(dedup) / len(df):.1%} removed), written to {dedup_path}")
+    if len(conflicts):
+        conflicts_path = os.path.join(args.out_dir, f"{stem}_conflicts.csv")
+        conflicts.to_csv(conflicts_path, index=False)
+        print(f"[EDA] Conflicts written to {conflicts_path}")
+
+    if args.no_train:
+        return
+
+    # ---------------- Before / after training ----------------
+    from sklearn.preprocessing import LabelEncoder
+
+    y = LabelEncoder().fit_transform(df["intent"])
+    train_idx, test_idx = group_split(clusters)
+    dedup_train = train_idx[keep.values[train_idx]]
+
+    print(f"\n[EDA] Training {args.model_family} (held-out: {len(test_idx)} rows from unseen clusters)")
+    for name, idx in (("original", train_idx), ("dedup", dedup_train)):
+        elapsed, accuracy, support = train_and_score(
+            args.model_family, embeddings[idx], y[idx], embeddings[test_idx], y[test_idx]
+        )
+        extra = f", {support} support vectors" if support is not None else ""
+        print(f"[EDA] {name:<8}: {len(idx):>6} rows, train {elapsed * 1000:8.1f}ms, "
+              f"accuracy {accuracy:.1%}{extra}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+# intent_system/calibration.py
+"""
+SVC with decoupled probability calibration.
+
+SVC(probability=True) makes libsvm run an internal 5-fold cross-validation
+to fit Platt scaling, i.e. six SVM fits per training, and at inference
+predict() and predict_proba() each evaluate the kernel against every
+support vector. CalibratedSVC instead
+
+- fits the RBF SVC on all rows (no internal CV; small intent datasets
+  cannot spare held-out rows)
+- calibrates its one-vs-rest decision scores on out-of-fold scores from
+  SVC_CALIBRATION_FOLDS cross-fitted SVCs, sigmoid (Platt-style temperature
+  softmax) or isotonic, stored in the same pickle; four fits instead of six
+- fits calibrators to Platt's smoothed targets, so a perfectly separated
+  calibration set does not saturate every probability at 1.0
+- derives label and probabilities from one decision_function() call
+  (predict_with_proba)
+
+refit=False keeps the older scheme: SVC on a stratified split, calibrator
+on the held-out rows.
+
+Compare against the old handler (training time, accuracy, calibration error):
+
+    python -m intent_system.calibration intents2.csv
+    python -m intent_system.calibration intents2.arrow --repeats 5
+"""
+
+import os
+import time
+import argparse
+
+import numpy as np
+from scipy.optimize import minimize_scalar
+from scipy.special import log_softmax, softmax
+from sklearn.svm import SVC
+from sklearn.isotonic import IsotonicRegression
+
+from core import config
+
+CALIBRATION_METHODS = ("sigmoid", "isotonic")
+
+
+# ================================================================
+# Calibrators (fit on the held-out one-vs-rest decision scores)
+# ================================================================
+def _smoothed_targets(y_idx, n_classes):
+    """
+    Platt's prior: the true class gets (N+1)/(N+2) instead of 1, where N is
+    its calibration count, the rest is spread over the other classes.
+    Keeps separable calibration sets from driving probabilities to 1.0.
+    """
+    counts = np.bincount(y_idx, minlength=n_classes)
+    hit = (counts[y_idx] + 1.0) / (counts[y_idx] + 2.0)
+    targets = np.repeat(((1.0 - hit) / max(n_classes - 1, 1))[:, None], n_classes, axis=1)
+    targets[np.arange(len(y_idx)), y_idx] = hit
+    return targets
+
+
+class _SigmoidCalibrator:
+    """
+    Multiclass Platt scaling: softmax(scores / T) with one fitted
+    temperature. For two classes this is the sigmoid 1 / (1 + exp(-2d / T));
+    a single shared slope never reorders classes, so the label is unchanged.
+    """
+
+    MIN_TEMPERATURE = 0.05
+
+    def fit(self, scores, y_idx):
+        targets = _smoothed_targets(y_idx, scores.shape[1])
+
+        def nll(log_t):
+            return -(targets * log_softmax(scores * np.exp(-log_t), axis=1)).sum()
+
+        bounds = (np.log(self.MIN_TEMPERATURE), 5.0)
+        self.temperature = float(np.exp(minimize_scalar(nll, bounds=bounds, method="bounded").x))
+        return self
+
+    def predict(self, scores):
+        return softmax(scores / self.temperature, axis=1)
+
+
+class _IsotonicCalibrator:
+    """Per-class isotonic regression on its score, renormalized across classes."""
+
+    def fit(self, scores, y_idx):
+        targets = _smoothed_targets(y_idx, scores.shape[1])
+        self.models = []
+        for k in range(scores.shape[1]):
+            model = IsotonicRegression(out_of_bounds="clip", y_min=0.0, y_max=1.0)
+            self.models.append(model.fit(scores[:, k], targets[:, k]))
+        return self
+
+    def predict(self, scores):
+        probs = np.column_stack([m.predict(scores[:, k]) for k, m in enumerate(self.models)])
+        total = probs.sum(axis=1, keepdims=True)
+        return np.divide(probs, total, out=np.full_like(probs, 1.0 / probs.shape[1]), where=total > 0)
+
+
+def _calibration_split(y, holdout, seed):
+    """Stratified split; every class keeps at least one training example."""
+    rng = np.random.default_rng(seed)
+    fit_idx, cal_idx = [], []
+    for cls in np.unique(y):
+        idx = rng.permutation(np.flatnonzero(y == cls))
+        n_cal = min(len(idx) - 1, max(1, int(round(len(idx) * holdout)))) if len(idx) > 1 else 0
+        cal_idx.extend(idx[:n_cal])
+        fit_idx.extend(idx[n_cal:])
+    return np.sort(fit_idx), np.sort(cal_idx)
+
+
+def _fold_ids(y, folds, seed):
+    """Stratified fold number per row (round-robin within each class)."""
+    rng = np.random.default_rng(seed)
+    fold = np.empty(len(y), dtype=int)
+    for cls in np.unique(y):
+        idx = rng.permutation(np.flatnonzero(y == cls))
+        fold[idx] = (np.arange(len(idx)) + rng.integers(folds)) % folds
+    return fold
+
+
+# ================================================================
+# Model
+# ================================================================
+class CalibratedSVC:
+    """
+    RBF SVC + calibrator. Exposes predict / predict_proba /
+    classes_ / n_support_ like sklearn's SVC, plus predict_with_proba().
+    """
+
+    def __init__(self, method="sigmoid", holdout=0.2, C=1.0, gamma="scale", random_state=42, refit=True,
+                 folds=None):
+        """
+        refit: ship an SVC trained on all rows, calibrated on cross-fitted
+        scores over `folds` folds (default SVC_CALIBRATION_FOLDS). False
+        trains on a split and calibrates on the `holdout` fraction.
+        """
+        if method not in CALIBRATION_METHODS:
+            raise ValueError(f"Unknown calibration method '{method}', expected one of {CALIBRATION_METHODS}")
+        self.method = method
+        self.holdout = holdout
+        self.C = C
+        self.gamma = gamma
+        self.random_state = random_state
+        self.refit = refit
+        self.folds = folds or config.SVC_CALIBRATION_FOLDS
+
+    @property
+    def n_support_(self):
+        return self.svc.n_support_
+
+    def _svc(self, X, y):
+        return SVC(kernel="rbf", C=self.C, gamma=self.gamma, decision_function_shape="ovr").fit(X, y)
+
+    def _scores(self, svc, X):
+        """One-vs-rest scores of svc laid out on self.classes_ (missing classes score lowest)."""
+        raw = svc.decision_function(X)
+        if raw.ndim == 1:
+            # Binary SVC returns one score for classes_[1]
+            raw = np.column_stack([-raw, raw])
+        if len(svc.classes_) == len(self.classes_):
+            return raw
+
+        scores = np.repeat(raw.min(axis=1, keepdims=True) - 1.0, len(self.classes_), axis=1)
+        scores[:, np.searchsorted(self.classes_, svc.classes_)] = raw
+        return scores
+
+    def _cross_fitted_scores(self, X, y):
+        """Out-of-fold scores for every row whose fold could be trained (>= 2 classes left)."""
+        fold = _fold_ids(y, min(self.folds, len(y)), self.random_state)
+        scores, rows = [], []
+        for k in np.unique(fold):
+            train, test = fold != k, fold == k
+            if len(np.unique(y[train])) < 2:
+                continue
+            scores.append(self._scores(self._svc(X[train], y[train]), X[test]))
+            rows.append(np.flatnonzero(test))
+        return np.concatenate(scores), np.concatenate(rows)
+
+    def fit(self, X, y):
+        X, y = np.asarray(X), np.asarray(y)
+        self.classes_ = np.unique(y)
+
+        if self.refit:
+            # Calibrate the score scale of the shipped (all-rows) model, not of a split model
+            scores, cal_idx = self._cross_fitted_scores(X, y)
+            self.svc = self._svc(X, y)
+        else:
+            fit_idx, cal_idx = _calibration_split(y, self.holdout, self.random_state)
+            if not len(cal_idx):
+                # Every class has a single example: nothing to hold out
+                fit_idx = cal_idx = np.arange(len(y))
+            self.svc = self._svc(X[fit_idx], y[fit_idx])
+            scores = self.decision_function(X[cal_idx])
+
+        calibrator = _SigmoidCalibrator if self.method == "sigmoid" else _IsotonicCalibrator
+        self.calibrator_ = calibrator().fit(scores, np.searchsorted(self.classes_, y[cal_idx]))
+        self.calibration_size_ = len(cal_idx)
+        return self
+
+    def decision_function(self, X):
+        return self._scores(self.svc, X)
+
+    def predict_with_proba(self, X):
+        """(labels, probabilities) from a single kernel evaluation."""
+        scores = self.decision_function(X)
+        probs = self.calibrator_.predict(scores)
+
+        # Highest probability; on ties (isotonic steps) the SVC's own ranking decides
+        rows = np.arange(len(scores))
+        best = scores.argmax(axis=1)
+        top = np.where(probs[rows, best] >= probs.max(axis=1), best, probs.argmax(axis=1))
+        return self.classes_[top], probs
+
+    def predict(self, X):
+        return self.predict_with_proba(X)[0]
+
+    def predict_proba(self, X):
+        return self.predict_with_proba(X)[1]
+
+
+# ================================================================
+# Metrics
+# ================================================================
+def expected_calibration_error(probs, y_idx, bins=10):
+    """Top-label ECE: |accuracy - confidence| averaged over confidence bins."""
+    confidence = probs.max(axis=1)
+    correct = probs.argmax(axis=1) == y_idx
+    edges = np.linspace(0.0, 1.0, bins + 1)
+
+    ece = 0.0
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        in_bin = (confidence > lo) & (confidence <= hi)
+        if in_bin.any():
+            ece += abs(correct[in_bin].mean() - confidence[in_bin].mean()) * in_bin.mean()
+    return float(ece)
+
+
+def _brier(probs, y_idx):
+    onehot = np.zeros_like(probs)
+    onehot[np.arange(len(y_idx)), y_idx] = 1.0
+    return float(((probs - onehot) ** 2).sum(axis=1).mean())
+
+
+# ================================================================
+# Comparison against SVC(probability=True)
+# ================================================================
+def _load_embeddings(dataset):
+    from intent_system.columnar import is_columnar, load_columnar
+
+    path = dataset if os.path.exists(dataset) else os.path.join(config.DATASET_DIR, dataset)
+    if is_columnar(path):
+        df, embeddings = load_columnar(path)
+        if embeddings is not None:
+            return np.asarray(embeddings), df["intent"].tolist()
+        texts, labels = df["cleaned"].tolist(), df["intent"].tolist()
+    else:
+        import pandas as pd
+        from intent_system.trainer import preprocess_dataset
+        texts, labels = preprocess_dataset(pd.read_csv(path))
+
+    from utils.ensure_transformer import get_transformer_model
+    return get_transformer_model().encode(texts), labels
+
+
+def compare(X, y, test_size=0.25, repeats=3, seed=42):
+    """
+    Returns {mode: metrics} for platt_cv (the old handler), sigmoid and
+    isotonic, plus sigmoid_holdout (refit=False: SVC trained without the
+    calibration rows) to show what training on all rows buys in accuracy.
+    """
+    from sklearn.metrics import log_loss
+    from sklearn.model_selection import train_test_split
+
+    y = np.asarray(y)
+    counts = np.unique(y, return_counts=True)[1]
+    stratify = y if counts.min() >= 2 else None
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=seed, stratify=stratify
+    )
+
+    modes = {
+        "platt_cv": lambda: SVC(kernel="rbf", probability=True, random_state=seed),
+        "sigmoid": lambda: CalibratedSVC("sigmoid", config.SVC_CALIBRATION_HOLDOUT, random_state=seed),
+        "isotonic": lambda: CalibratedSVC("isotonic", config.SVC_CALIBRATION_HOLDOUT, random_state=seed),
+        "sigmoid_holdout": lambda: CalibratedSVC(
+            "sigmoid", config.SVC_CALIBRATION_HOLDOUT, random_state=seed, refit=False
+        ),
+    }
+
+    results = {}
+    for name, build in modes.items():
+        fit_times, infer_times = [], []
+        for _ in range(repeats):
+            model = build()
+            start = time.perf_counter()
+            model.fit(X_train, y_train)
+            fit_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            if hasattr(model, "predict_with_proba"):
+                preds, probs = model.predict_with_proba(X_test)
+            else:
+                preds, probs = model.predict(X_test), model.predict_proba(X_test)
+            infer_times.append(time.perf_counter() - start)
+
+        y_idx = np.searchsorted(model.classes_, y_test)
+        results[name] = {
+            "fit_ms": float(np.median(fit_times) * 1000),
+            "infer_ms": float(np.median(infer_times) * 1000),
+            "accuracy": float((preds == y_test).mean()),
+            "ece": expected_calibration_error(probs, y_idx),
+            "log_loss": float(log_loss(y_idx, probs, labels=np.arange(len(model.classes_)))),
+            "brier": _brier(probs, y_idx),
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare SVC probability calibration modes")
+    parser.add_argument("dataset", help="CSV / .arrow / .parquet in dataset/ or a path")
+    parser.add_argument("--test-size", type=float, default=0.25)
+    parser.add_argument("--repeats", type=int, default=3, help="Timing repeats (median reported)")
+    args = parser.parse_args(argv)
+
+    X, y = _load_embeddings(args.dataset)
+    results = compare(X, y, args.test_size, args.repeats)
+
+    print(f"\n[Calibration] {len(y)} samples, {len(set(y))} intents, test size {args.test_size}")
+    print(f"{'mode':<16} {'fit ms':>9} {'infer ms':>9} {'accuracy':>9} {'ECE':>7} {'log loss':>9} {'Brier':>7}")
+    for name, r in results.items():
+        print(f"{name:<16} {r['fit_ms']:>9.1f} {r['infer_ms']:>9.2f} {r['accuracy']:>9.1%} "
+              f"{r['ece']:>7.3f} {r['log_loss']:>9.3f} {r['brier']:>7.3f}")
+
+    base = results["platt_cv"]
+    for name in (*CALIBRATION_METHODS, "sigmoid_holdout"):
+        r = results[name]
+        print(f"[Calibration] {name}: {base['fit_ms'] / max(r['fit_ms'], 1e-9):.1f}x faster training, "
+              f"accuracy {(r['accuracy'] - base['accuracy']) * 100:+.1f} pts vs platt_cv")
+
+
+if __name__ == "__main__":
+    main()
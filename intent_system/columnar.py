@@ -0,0 +1,212 @@
+# intent_system/columnar.py
+"""
+Columnar datasets: raw text, cleaned text, label and the sentence embedding
+stored together, so training and evaluation skip CSV parsing, preprocessing
+and encoding.
+
+    python -m intent_system.columnar intents.csv
+    python -m intent_system.columnar multi_label_dataset.csv --format both
+
+writes dataset/<name>.arrow (Arrow IPC, uncompressed) and/or
+dataset/<name>.parquet with columns
+
+    text       string                    raw query
+    cleaned    string                    preprocess_text() output
+    intent     string                    label (first label for multi-label rows)
+    intents    list<string>              multi-label datasets only
+    params     string (JSON)             multi-label datasets only
+    embedding  fixed_size_list<float32>  embedding of `cleaned`
+
+.arrow files are memory-mapped: the embedding column becomes a read-only
+NumPy view on the mapped file, no copy and no parse. Parquet is compressed
+and must be decoded, so it is the smaller file to ship, not the faster one
+to load. The schema records the embedding model; a file built with another
+model is re-encoded on load.
+"""
+
+import os
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from core import config
+from core.logger import log
+
+COLUMNAR_EXTENSIONS = (".arrow", ".parquet")
+EMBEDDING_COLUMN = "embedding"
+
+
+def is_columnar(path):
+    return path.endswith(COLUMNAR_EXTENSIONS)
+
+
+# ================================================================
+# Conversion
+# ================================================================
+def _read_source(path):
+    from intent_system.joint_model import is_multi_label_dataset, load_multi_label_dataset
+
+    if is_multi_label_dataset(path):
+        return load_multi_label_dataset(path)
+    return pd.read_csv(path)
+
+
+def build_table(df, embedder, source="", batch_size=256):
+    """Arrow table for a text/intent DataFrame; rows that clean to nothing are dropped."""
+    from intent_system.preprocess import preprocess_text
+
+    cleaned = [preprocess_text(t)[1] for t in df["text"]]
+    keep = [i for i, c in enumerate(cleaned) if c.strip()]
+    df = df.iloc[keep].reset_index(drop=True)
+    cleaned = [cleaned[i] for i in keep]
+
+    embeddings = np.ascontiguousarray(
+        embedder.encode(cleaned, batch_size=batch_size, convert_to_numpy=True), dtype=np.float32
+    )
+    dim = embeddings.shape[1] if embeddings.ndim == 2 else 0
+
+    columns = {
+        "text": pa.array(df["text"].astype(str).tolist(), pa.string()),
+        "cleaned": pa.array(cleaned, pa.string()),
+        "intent": pa.array(df["intent"].astype(str).tolist(), pa.string()),
+    }
+    if "intents" in df:
+        columns["intents"] = pa.array(df["intents"].tolist(), pa.list_(pa.string()))
+        columns["params"] = pa.array([json.dumps(p) for p in df["params"]], pa.string())
+    columns[EMBEDDING_COLUMN] = pa.FixedSizeListArray.from_arrays(pa.array(embeddings.reshape(-1)), dim)
+
+    metadata = {
+        "embedding_model": config.EMBEDDING_MODEL_NAME,
+        "embedding_dim": str(dim),
+        "source": os.path.basename(source),
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    return pa.table(columns).replace_schema_metadata(metadata)
+
+
+def write_table(table, path):
+    if path.endswith(".parquet"):
+        pq.write_table(table, path, compression="zstd")
+        return
+
+    # Uncompressed, one record batch: the embedding column stays a single
+    # contiguous buffer that can be mapped straight into NumPy
+    with pa.OSFile(path, "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table.combine_chunks(), max_chunksize=max(table.num_rows, 1))
+
+
+def convert(csv_path, out_dir=None, formats=("arrow",), embedder=None, batch_size=256):
+    """Converts one CSV dataset; returns the written paths."""
+    if embedder is None:
+        from utils.ensure_transformer import get_transformer_model
+        embedder = get_transformer_model()
+
+    df = _read_source(csv_path)
+    if not {"text", "intent"} <= set(df.columns):
+        raise ValueError(f"[Columnar] {csv_path} needs 'text' and 'intent' columns, got {list(df.columns)}")
+
+    start = time.perf_counter()
+    table = build_table(df.dropna(subset=["text", "intent"]), embedder, csv_path, batch_size)
+    log.info(f"[Columnar] Encoded {table.num_rows} rows from {csv_path} in {time.perf_counter() - start:.2f}s")
+
+    out_dir = out_dir or os.path.dirname(csv_path) or config.DATASET_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+
+    paths = []
+    for fmt in formats:
+        path = os.path.join(out_dir, f"{stem}.{fmt}")
+        write_table(table, path)
+        paths.append(path)
+        log.info(f"[Columnar] Wrote {path} ({os.path.getsize(path) / 1024:.1f} KB)")
+    return paths
+
+
+# ================================================================
+# Loading
+# ================================================================
+def read_table(path):
+    """Arrow IPC files are memory-mapped (buffers point into the file); Parquet is decoded."""
+    if path.endswith(".parquet"):
+        return pq.read_table(path, memory_map=True)
+    return ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def embedding_matrix(table):
+    """(rows, dim) float32 NumPy view of the embedding column, zero-copy when possible."""
+    column = table.column(EMBEDDING_COLUMN)
+    if column.num_chunks == 0:
+        return np.empty((0, column.type.list_size), dtype=np.float32)
+    chunk = column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+
+    # .values ignores the parent offset, so slice it explicitly
+    dim = chunk.type.list_size
+    values = chunk.values.slice(chunk.offset * dim, len(chunk) * dim)
+    return values.to_numpy(zero_copy_only=True).reshape(len(chunk), dim)
+
+
+def load_columnar(path):
+    """
+    Returns (df, embeddings): the text columns as a DataFrame (intents as
+    lists, params as dicts) and the embedding matrix. embeddings is None
+    when the file was built with a different embedding model.
+    """
+    table = read_table(path)
+    metadata = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+
+    df = table.drop_columns([EMBEDDING_COLUMN]).to_pandas()
+    if "params" in df:
+        df["params"] = [json.loads(p) if p else {} for p in df["params"]]
+    if "intents" in df:
+        df["intents"] = [list(v) for v in df["intents"]]
+
+    model = metadata.get("embedding_model")
+    if model != config.EMBEDDING_MODEL_NAME:
+        log.warn(f"[Columnar] {path} was embedded with '{model}', not '{config.EMBEDDING_MODEL_NAME}'; "
+                 "embeddings will be recomputed")
+        return df, None
+
+    return df, embedding_matrix(table)
+
+
+def list_datasets():
+    """CSV and columnar dataset files in DATASET_DIR."""
+    return sorted(
+        f for f in os.listdir(config.DATASET_DIR)
+        if f.endswith(".csv") or f.endswith(COLUMNAR_EXTENSIONS)
+    )
+
+
+# ================================================================
+# CLI
+# ================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert CSV datasets to Arrow IPC / Parquet with embeddings")
+    parser.add_argument("datasets", nargs="*", help="CSV names in dataset/ or paths (default: all CSVs)")
+    parser.add_argument("--format", choices=("arrow", "parquet", "both"), default="arrow")
+    parser.add_argument("--out-dir", default=None, help="Default: next to each CSV")
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args(argv)
+
+    names = args.datasets or [f for f in os.listdir(config.DATASET_DIR) if f.endswith(".csv")]
+    formats = ("arrow", "parquet") if args.format == "both" else (args.format,)
+
+    from utils.ensure_transformer import get_transformer_model
+    embedder = get_transformer_model()
+
+    for name in names:
+        path = name if os.path.exists(name) else os.path.join(config.DATASET_DIR, name)
+        try:
+            convert(path, args.out_dir, formats, embedder, args.batch_size)
+        except Exception as e:
+            log.error(f"[Columnar] Failed to convert {path}: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,8 @@ from utils.ensure_transformer import get_transformer_model
 
 from core import config
 from intent_system.preprocess import preprocess_text
+from intent_system.columnar import is_columnar, load_columnar, list_datasets
+from intent_system.registry import get_registry
 from core.logger import log
 
 
@@ -29,19 +31,17 @@ def choose_model_family():
 
 
 def choose_model_version(model_type):
-    model_dir = config.MODEL_TYPES[model_type]
-    versions = []
-
-    for f in os.listdir(model_dir):
-        if f.startswith("classifier_v") and f.endswith(".pkl"):
-            versions.append(f.split("_v")[1].split(".")[0])
+    registry = get_registry(model_type)
+    versions = registry.versions()
 
     if not versions:
-        raise FileNotFoundError(f"No classifiers found in {model_dir}")
+        raise FileNotFoundError(f"No classifiers found in {config.MODEL_TYPES[model_type]}")
 
+    aliases = registry.aliases()
     print("\nAvailable Versions:")
     for i, v in enumerate(versions, 1):
-        print(f"{i}. v{v}")
+        tags = " ".join(f"({a})" for a, target in aliases.items() if target == v)
+        print(f"{i}. v{v} {tags}".rstrip())
 
     choice = int(input("Choose version: "))
     return versions[choice - 1]
@@ -49,7 +49,7 @@ def choose_model_version(model_type):
 
 def choose_dataset():
     print("\nAvailable Datasets:")
-    datasets = [f for f in os.listdir(config.DATASET_DIR) if f.endswith(".csv")]
+    datasets = list_datasets()
 
     for i, d in enumerate(datasets, 1):
         print(f"{i}. {d}")
@@ -62,9 +62,10 @@ def choose_dataset():
 # ARTIFACT LOADING
 # ---------------------------
 def load_classifier(model_type, version):
-    model_dir = config.MODEL_TYPES[model_type]
-    classifier_path = os.path.join(model_dir, f"classifier_v{version}.pkl")
-    classifier = joblib.load(classifier_path)
+    registry = get_registry(model_type)
+    if config.MODEL_VERIFY_CHECKSUMS:
+        registry.verify(version, names=("classifier",))
+    classifier = joblib.load(registry.artifact_path(version, "classifier"))
     return classifier
 
 
@@ -81,33 +82,50 @@ def main():
 
     classifier = load_classifier(model_type, version)
 
-    df = pd.read_csv(os.path.join(config.DATASET_DIR, dataset_name))
+    path = os.path.join(config.DATASET_DIR, dataset_name)
+    embeddings = None
+    if is_columnar(path):
+        df, embeddings = load_columnar(path)
+    else:
+        df = pd.read_csv(path)
 
-    texts, labels = [], []
+    if embeddings is not None:
+        # Cleaned and embedded at conversion time; embeddings are a view on the mapped file
+        texts, labels = df["cleaned"].tolist(), df["intent"].tolist()
+    else:
+        texts, labels = [], []
 
-    for t, l in zip(df["text"], df["intent"]):
-        _, cleaned = preprocess_text(t)
-        if cleaned.strip():
-            texts.append(cleaned)
-            labels.append(l)
+        for t, l in zip(df["text"], df["intent"]):
+            _, cleaned = preprocess_text(t)
+            if cleaned.strip():
+                texts.append(cleaned)
+                labels.append(l)
 
-    embedder = get_transformer_model()
-    embeddings = embedder.encode(texts)
+        embedder = get_transformer_model()
+        embeddings = embedder.encode(texts)
 
     # IMPORTANT: temporary label encoder
     temp_encoder = LabelEncoder()
     encoded_labels = temp_encoder.fit_transform(labels)
 
     preds = classifier.predict(embeddings)
+    accuracy = accuracy_score(encoded_labels, preds)
 
     print("\n========= Evaluation Report =========")
-    print("Accuracy:", accuracy_score(encoded_labels, preds))
+    print("Accuracy:", accuracy)
     print("\nClassification Report:")
     print(classification_report(encoded_labels, preds))
     print("Confusion Matrix:")
     print(confusion_matrix(encoded_labels, preds))
     print("=====================================")
 
+    # Latest evaluation is kept with the version in the family manifest
+    get_registry(model_type).record_metrics(version, {
+        "accuracy": float(accuracy),
+        "eval_dataset": dataset_name,
+        "eval_samples": len(labels),
+    })
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,319 @@
+# intent_system/hierarchical.py
+"""
+Hierarchical coarse-to-fine classifier ("Hierarchical" family).
+
+Large label sets are split into domains:
+
+    embedding ─▶ domain classifier ─▶ head of the chosen domain ─▶ intent
+                 (D domains)           (only that domain's intents)
+
+Training fits one D-class model plus small per-domain heads instead of one
+model over every label (a flat SVC over L labels trains L(L-1)/2 pairwise
+models). At inference only the chosen domain's head runs; HIER_BEAM > 1
+evaluates the best few domains instead.
+
+The taxonomy is either supplied next to the dataset
+
+    dataset/<dataset>.taxonomy.json    {"email": ["Request", "Informational"], "smalltalk": [...]}
+
+(intents it does not mention form an "other" domain) or clustered from the
+label centroids: KMeans over the normalized mean embedding of each intent,
+HIER_NUM_DOMAINS clusters (0 = round(sqrt(number of intents))).
+
+Probabilities are P(domain) · P(intent | domain) for the evaluated
+domain(s) and 0 for the intents of the others, so rows sum to the mass of
+the evaluated domains and the highest probability is the predicted intent.
+
+Compare against the flat families on a dataset:
+
+    python -m intent_system.hierarchical intents2.csv
+    python -m intent_system.hierarchical Email_Intent_Classification.csv --domains 2 --head SVC
+"""
+
+import os
+import json
+import time
+import argparse
+
+import numpy as np
+
+from core import config
+from core.logger import log
+
+OTHER_DOMAIN = "other"
+
+
+# ================================================================
+# Taxonomy
+# ================================================================
+def taxonomy_path(dataset_name):
+    stem = os.path.splitext(os.path.basename(dataset_name))[0]
+    return os.path.join(config.DATASET_DIR, stem + config.HIER_TAXONOMY_SUFFIX)
+
+
+def load_taxonomy(dataset_name, label_encoder=None):
+    """
+    {domain: [labels]} from dataset/<stem>.taxonomy.json, or None when there
+    is no such file. With a label_encoder the labels are returned encoded,
+    matching the labels the classifier is trained on.
+    """
+    path = taxonomy_path(dataset_name)
+    if not os.path.exists(path):
+        return None
+
+    with open(path, "r") as f:
+        taxonomy = json.load(f)
+    log.info(f"[Hierarchical] Using taxonomy {path} ({len(taxonomy)} domains)")
+
+    if label_encoder is None:
+        return taxonomy
+
+    known = set(label_encoder.classes_)
+    encoded = {}
+    for domain, labels in taxonomy.items():
+        unknown = [label for label in labels if label not in known]
+        if unknown:
+            log.warn(f"[Hierarchical] Taxonomy domain '{domain}' lists unknown intents {unknown}, ignored")
+        labels = [label for label in labels if label in known]
+        if labels:
+            encoded[domain] = label_encoder.transform(labels).tolist()
+    return encoded
+
+
+# ================================================================
+# Model
+# ================================================================
+def _make_head(kind, random_state):
+    if kind == "SVC":
+        from intent_system.calibration import CalibratedSVC
+
+        method = config.SVC_CALIBRATION if config.SVC_CALIBRATION != "platt_cv" else "sigmoid"
+        return CalibratedSVC(method, holdout=config.SVC_CALIBRATION_HOLDOUT, random_state=random_state)
+
+    from sklearn.linear_model import LogisticRegression
+    return LogisticRegression(max_iter=2000)
+
+
+def _head_proba(head, X):
+    if hasattr(head, "predict_with_proba"):
+        return head.predict_with_proba(X)[1]
+    return head.predict_proba(X)
+
+
+class HierarchicalClassifier:
+    """
+    Domain classifier + per-domain heads. Exposes predict / predict_proba /
+    predict_with_proba / classes_ like the flat classifiers, so the
+    recognizer, evaluation and benchmarks use it unchanged.
+    """
+
+    def __init__(self, taxonomy=None, n_domains=0, head="LR", beam=1, random_state=42):
+        """
+        taxonomy : {domain: [labels]} or None to cluster label centroids
+        n_domains: clusters when taxonomy is None (0 = round(sqrt(labels)))
+        head     : "LR" | "SVC" estimator for the per-domain heads
+        beam     : domains evaluated per query
+        """
+        self.taxonomy = taxonomy
+        self.n_domains = n_domains
+        self.head = head
+        self.beam = beam
+        self.random_state = random_state
+
+    # ------------------------------------------------------------
+    # Taxonomy
+    # ------------------------------------------------------------
+    def _supplied_domains(self):
+        seen, names, members = {}, [], []
+        for domain, labels in self.taxonomy.items():
+            labels = [label for label in labels if label in self._class_index]
+            for label in labels:
+                if label in seen:
+                    raise ValueError(f"[Hierarchical] Intent {label!r} is in domains '{seen[label]}' and '{domain}'")
+                seen[label] = domain
+            if labels:
+                names.append(str(domain))
+                members.append(np.array(sorted(labels)))
+
+        rest = [c for c in self.classes_ if c not in seen]
+        if rest:
+            names.append(OTHER_DOMAIN)
+            members.append(np.array(rest))
+        return names, members
+
+    def _clustered_domains(self, X, y):
+        from sklearn.cluster import KMeans
+
+        centroids = np.vstack([X[y == c].mean(axis=0) for c in self.classes_])
+        centroids /= np.clip(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12, None)
+
+        k = self.n_domains or int(round(np.sqrt(len(self.classes_))))
+        k = max(1, min(k, len(self.classes_)))
+        if k == 1:
+            return ["domain_0"], [self.classes_]
+
+        assignment = KMeans(n_clusters=k, n_init=10, random_state=self.random_state).fit_predict(centroids)
+        members = [self.classes_[assignment == d] for d in range(k) if (assignment == d).any()]
+        return [f"domain_{d}" for d in range(len(members))], members
+
+    # ------------------------------------------------------------
+    # Training
+    # ------------------------------------------------------------
+    def fit(self, X, y):
+        from sklearn.linear_model import LogisticRegression
+
+        X, y = np.asarray(X), np.asarray(y)
+        self.classes_ = np.unique(y)
+        self._class_index = {c: i for i, c in enumerate(self.classes_)}
+
+        if self.taxonomy:
+            self.domains_, members = self._supplied_domains()
+            self.taxonomy_source_ = "supplied"
+        else:
+            self.domains_, members = self._clustered_domains(X, y)
+            self.taxonomy_source_ = "clustered"
+
+        self.label_domain_ = np.empty(len(self.classes_), dtype=int)
+        for d, labels in enumerate(members):
+            self.label_domain_[[self._class_index[label] for label in labels]] = d
+
+        domain_y = self.label_domain_[np.searchsorted(self.classes_, y)]
+        self.coarse_ = None
+        if len(self.domains_) > 1:
+            self.coarse_ = LogisticRegression(max_iter=2000).fit(X, domain_y)
+
+        # heads_[d] is None for single-intent domains; columns_[d] maps head output → classes_
+        self.heads_, self.columns_ = [], []
+        for d, labels in enumerate(members):
+            if len(labels) == 1:
+                self.heads_.append(None)
+                self.columns_.append(np.array([self._class_index[labels[0]]]))
+                continue
+
+            mask = domain_y == d
+            head = _make_head(self.head, self.random_state).fit(X[mask], y[mask])
+            self.heads_.append(head)
+            self.columns_.append(np.searchsorted(self.classes_, head.classes_))
+        return self
+
+    def describe_taxonomy(self, label_encoder=None):
+        """{domain: [intent names]} as trained (names decoded with label_encoder)."""
+        out = {}
+        for d, name in enumerate(self.domains_):
+            labels = self.classes_[self.columns_[d]]
+            if label_encoder is not None:
+                labels = label_encoder.inverse_transform(labels)
+            out[name] = [str(label) for label in labels]
+        return out
+
+    # ------------------------------------------------------------
+    # Inference
+    # ------------------------------------------------------------
+    def predict_with_proba(self, X):
+        """(labels, probabilities); each row only evaluates its best `beam` domains."""
+        X = np.asarray(X)
+        n = len(X)
+        probs = np.zeros((n, len(self.classes_)))
+
+        if self.coarse_ is None:
+            domain_p = np.ones((n, 1))
+            chosen = np.zeros((n, 1), dtype=int)
+        else:
+            domain_p = self.coarse_.predict_proba(X)
+            beam = max(1, min(self.beam, domain_p.shape[1]))
+            if beam == 1:
+                chosen = domain_p.argmax(axis=1)[:, None]
+            else:
+                chosen = np.argsort(-domain_p, axis=1)[:, :beam]
+
+        # One head call per domain, on the rows routed to it
+        for d in np.unique(chosen):
+            rows = np.flatnonzero((chosen == d).any(axis=1))
+            head = self.heads_[d]
+            local = np.ones((len(rows), 1)) if head is None else _head_proba(head, X[rows])
+            probs[np.ix_(rows, self.columns_[d])] = domain_p[rows, d][:, None] * local
+
+        return self.classes_[probs.argmax(axis=1)], probs
+
+    def predict(self, X):
+        return self.predict_with_proba(X)[0]
+
+    def predict_proba(self, X):
+        return self.predict_with_proba(X)[1]
+
+
+# ================================================================
+# Comparison against the flat families
+# ================================================================
+def compare(X, y, taxonomy=None, n_domains=0, head="LR", test_size=0.25, repeats=3, seed=42):
+    """Returns {model: metrics} for flat LR, flat SVC and the hierarchical model."""
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import train_test_split
+    from intent_system.calibration import CalibratedSVC
+
+    X, y = np.asarray(X), np.asarray(y)
+    counts = np.unique(y, return_counts=True)[1]
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=seed, stratify=y if counts.min() >= 2 else None
+    )
+
+    models = {
+        "flat_LR": lambda: LogisticRegression(max_iter=2000),
+        "flat_SVC": lambda: CalibratedSVC("sigmoid", config.SVC_CALIBRATION_HOLDOUT, random_state=seed),
+        f"hier_{head}": lambda: HierarchicalClassifier(taxonomy, n_domains, head, config.HIER_BEAM, seed),
+    }
+
+    results = {}
+    for name, build in models.items():
+        fit_times, batch_times, single_times = [], [], []
+        for _ in range(repeats):
+            model = build()
+            start = time.perf_counter()
+            model.fit(X_train, y_train)
+            fit_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            preds = model.predict(X_test)
+            batch_times.append(time.perf_counter() - start)
+
+            for row in X_test[:50]:
+                start = time.perf_counter()
+                model.predict(row[None, :])
+                single_times.append(time.perf_counter() - start)
+
+        results[name] = {
+            "fit_ms": float(np.median(fit_times) * 1000),
+            "batch_ms": float(np.median(batch_times) * 1000),
+            "single_ms": float(np.median(single_times) * 1000),
+            "accuracy": float((preds == y_test).mean()),
+            "domains": len(model.domains_) if hasattr(model, "domains_") else None,
+        }
+    return results
+
+
+def main(argv=None):
+    from intent_system.calibration import _load_embeddings
+
+    parser = argparse.ArgumentParser(description="Compare hierarchical vs flat intent classification")
+    parser.add_argument("dataset", help="CSV / .arrow / .parquet in dataset/ or a path")
+    parser.add_argument("--domains", type=int, default=config.HIER_NUM_DOMAINS, help="0 = sqrt(intents)")
+    parser.add_argument("--head", choices=("LR", "SVC"), default=config.HIER_HEAD)
+    parser.add_argument("--test-size", type=float, default=0.25)
+    parser.add_argument("--repeats", type=int, default=3, help="Timing repeats (median reported)")
+    args = parser.parse_args(argv)
+
+    X, y = _load_embeddings(args.dataset)
+    taxonomy = load_taxonomy(args.dataset)
+    results = compare(X, y, taxonomy, args.domains, args.head, args.test_size, args.repeats)
+
+    print(f"\n[Hierarchical] {len(y)} samples, {len(set(y))} intents, "
+          f"taxonomy: {'supplied' if taxonomy else 'clustered'}")
+    print(f"{'model':<10} {'domains':>8} {'fit ms':>9} {'batch ms':>9} {'1-query ms':>11} {'accuracy':>9}")
+    for name, r in results.items():
+        domains = r["domains"] if r["domains"] is not None else "-"
+        print(f"{name:<10} {domains:>8} {r['fit_ms']:>9.1f} {r['batch_ms']:>9.2f} "
+              f"{r['single_ms']:>11.3f} {r['accuracy']:>9.1%}")
+
+
+if __name__ == "__main__":
+    main()
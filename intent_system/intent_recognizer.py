@@ -2,28 +2,74 @@
 
 import os
 import json
+import time
 import joblib
+import threading
 from sentence_transformers import SentenceTransformer
-from utils.ensure_transformer import get_transformer_model
+from utils.ensure_transformer import get_shared_transformer_model
+from utils.timer import span, start_trace
 
 from core import config
 from core.logger import log
+from core.journal import get_journal
+from core.metrics import REQUESTS, STAGE_LATENCY, timed_load
+from intent_system.joint_model import encode_with_tokens
+from intent_system.registry import get_registry
+
+
+# =====================================================
+# SHARED HELPERS
+# =====================================================
+
+def available_versions(model_type):
+    """Registered versions of a family, oldest first (read from its manifest)."""
+    versions = get_registry(model_type).versions()
+    if not versions:
+        raise FileNotFoundError(f"[Recognizer] No registered versions in {config.MODEL_TYPES[model_type]}")
+    return versions
+
+
+_artifacts = {}
+_artifact_locks = {}
+_artifacts_lock = threading.Lock()
+
+
+def load_artifact(path):
+    """
+    joblib.load with a process-wide cache. Concurrent callers for the same
+    path wait for the first load instead of loading twice, so a background
+    warm-up and the recognizer share one copy.
+    """
+    cached = _artifacts.get(path)
+    if cached is not None:
+        return cached
+
+    with _artifacts_lock:
+        lock = _artifact_locks.setdefault(path, threading.Lock())
+
+    with lock:
+        if path not in _artifacts:
+            _artifacts[path] = joblib.load(path)
+        return _artifacts[path]
 
 
 class IntentRecognizer:
     """
-    Loads a specific family of models (LR, SVC, NeuralNet) 
+    Loads a specific family of models (LR, SVC, NeuralNet, Joint, Hierarchical) 
     and a specific version (v1, v2, ...) from:
     
     models/intent_models/<MODEL_TYPE>/classifier_vX.pkl
     models/intent_models/<MODEL_TYPE>/label_encoder_vX.pkl
-    models/intent_models/<MODEL_TYPE>/metadata.json
+    models/intent_models/<MODEL_TYPE>/metadata_vX.json
+
+    resolved through the family's manifest (intent_system/registry.py).
     """
 
     def __init__(self, model_type=None, version=None, interactive=False):
         """
-        model_type : "LR" | "SVC" | "NeuralNet"
-        version    : "1", "2", "3", ...
+        model_type : "LR" | "SVC" | "NeuralNet" | "Joint" | "Hierarchical"
+        version    : "1", "2", "3", ... or an alias ("production", "latest");
+                     None → production if set, else latest
         interactive: If True → ask the user which model to load
         """
 
@@ -35,13 +81,16 @@ class IntentRecognizer:
             raise ValueError(f"[Recognizer] Unknown model type: {model_type}")
 
         self.model_type = model_type
-        self.version = version
         self.model_dir = config.MODEL_TYPES[model_type]
+        self.registry = get_registry(model_type)
+        self.version = self.registry.resolve(version)
 
         self.embedding_model = None
         self.classifier = None
         self.label_encoder = None
         self.metadata = {}
+        self.joint = False
+        self.journal = get_journal()
 
         self._load_models()
 
@@ -77,90 +126,199 @@ class IntentRecognizer:
     # =====================================================
 
     def _available_versions(self, model_type):
-        model_dir = config.MODEL_TYPES[model_type]
-        versions = []
-
-        for f in os.listdir(model_dir):
-            if f.startswith("classifier_v") and f.endswith(".pkl"):
-                ver = f.split("_v")[1].split(".")[0]
-                versions.append(ver)
-
-        if not versions:
-            raise FileNotFoundError(f"[Recognizer] No classifier files found in {model_dir}")
-
-        return sorted(versions, key=lambda x: int(x))
+        return available_versions(model_type)
 
     # =====================================================
     # PATH RESOLUTION
     # =====================================================
 
     def _resolve_path(self, prefix, version):
-        """
-        Finds a classifier/encoder path either by:
-        - exact version provided, OR
-        - automatically loading latest version.
-        """
-        if version:
-            # Load specific version
-            filename = f"{prefix}_v{version}.pkl"
-            full_path = os.path.join(self.model_dir, filename)
-            if not os.path.exists(full_path):
-                raise FileNotFoundError(f"[Recognizer] {filename} not found.")
-            return full_path
-
-        # Auto-load latest version
-        versions = self._available_versions(self.model_type)
-        latest = versions[-1]
-        filename = f"{prefix}_v{latest}.pkl"
-        return os.path.join(self.model_dir, filename)
+        """Artifact path recorded in the manifest for this (resolved) version."""
+        path = self.registry.artifact_path(version, prefix)
+        if path is None or not os.path.exists(path):
+            raise FileNotFoundError(f"[Recognizer] {prefix} for {self.model_type} v{version} not found.")
+        return path
 
     # =====================================================
     # MODEL LOADING
     # =====================================================
 
     def _load_models(self):
-        log.info(f"[Recognizer] Loading {self.model_type} model...")
+        log.info(f"[Recognizer] Loading {self.model_type} v{self.version}...")
+
+        if config.MODEL_VERIFY_CHECKSUMS:
+            self.registry.verify(self.version)
 
         # Load embedding model
-        self.embedding_model = get_transformer_model()
+        with timed_load("transformer"):
+            self.embedding_model = get_shared_transformer_model()
         log.info("[Recognizer] Embedding model loaded.")
 
         # Load classifier
         classifier_path = self._resolve_path("classifier", self.version)
-        self.classifier = joblib.load(classifier_path)
+        with timed_load(f"classifier_{self.model_type}"):
+            self.classifier = load_artifact(classifier_path)
         log.info(f"[Recognizer] Loaded classifier: {classifier_path}")
 
+        # Joint family: multi-intent scores + slot tags from the same encoder pass
+        self.joint = hasattr(self.classifier, "tag_slots")
+
         # Load label encoder
         encoder_path = self._resolve_path("label_encoder", self.version)
-        self.label_encoder = joblib.load(encoder_path)
+        with timed_load(f"label_encoder_{self.model_type}"):
+            self.label_encoder = load_artifact(encoder_path)
         log.info(f"[Recognizer] Loaded label encoder: {encoder_path}")
 
         # Load optional metadata
-        # Load versioned metadata
-        meta_filename = f"metadata_v{self.version}.json"
-        metadata_path = os.path.join(self.model_dir, meta_filename)
-
-        if os.path.exists(metadata_path):
+        metadata_path = self.registry.artifact_path(self.version, "metadata")
+        if metadata_path and os.path.exists(metadata_path):
             with open(metadata_path, "r") as f:
                 self.metadata = json.load(f)
-            log.info(f"[Recognizer] Loaded {meta_filename}")
+            log.info(f"[Recognizer] Loaded {os.path.basename(metadata_path)}")
         else:
-            log.warn(f"[Recognizer] No metadata file found for version v{self.version}.")
+            self.metadata = self.registry.entry(self.version).get("metadata", {})
+            if not self.metadata:
+                log.warn(f"[Recognizer] No metadata file found for version v{self.version}.")
+
 
+    def warmup(self, text="hello"):
+        """
+        One throwaway inference so lazy initialization (tokenizer, torch
+        kernels, BLAS pools) is paid before the first real request.
+        Bypasses metrics so warm-up isn't counted as traffic.
+        """
+        embedding = self.embedding_model.encode([text])
+        self._classify(embedding)
+        if self.joint:
+            encode_with_tokens(self.embedding_model, [text])
 
     # =====================================================
     # INFERENCE
     # =====================================================
 
-    def predict_intent(self, text):
-        embedding = self.embedding_model.encode([text])
-        pred_class = self.classifier.predict(embedding)[0]
-        label = self.label_encoder.inverse_transform([pred_class])[0]
+    def predict_intent(self, text, return_timings=False):
+        """
+        Returns (label, probs), or (label, probs, timings) when
+        return_timings=True, where timings maps stage → milliseconds.
+        """
+        if return_timings:
+            with start_trace("recognizer.predict_intent") as trace:
+                label, probs = self._predict(text)
+            return label, probs, trace.breakdown()
 
-        # Probability support
-        if hasattr(self.classifier, "predict_proba"):
-            probs = self.classifier.predict_proba(embedding)[0]
-        else:
-            probs = None
+        with span("recognizer.predict_intent"):
+            return self._predict(text)
+
+    def parse(self, text, journal=True):
+        """
+        Returns {"intent", "intents", "probs", "params", "timings"}.
+        Joint-family models report every intent above JOINT_INTENT_THRESHOLD
+        and the slot values found in the text (e.g. {"location": "Sydney"});
+        other families give the single predicted intent and no params.
+        timings maps stage → milliseconds. journal=False keeps the
+        prediction out of the prediction journal (speculative partials).
+        """
+        with span("recognizer.parse"):
+            return self._parse(text, journal)
+
+    def record(self, text, result):
+        """Journals a parse() result obtained with journal=False once it is used."""
+        if self.journal is not None:
+            self.journal.record(text, self.model_type, self.version, result, self.label_encoder.classes_)
 
-        return label, probs
+    def predict_batch(self, texts, batch_size=64):
+        """
+        Returns a list of (label, probs) for many texts. Each batch is one
+        encode() and one predict() call instead of one per text.
+        """
+        texts = list(texts)
+        results = []
+
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+
+            t0 = time.perf_counter()
+            with span("recognizer.embed_batch"):
+                embeddings = self.embedding_model.encode(batch, batch_size=batch_size)
+            t1 = time.perf_counter()
+
+            with span("recognizer.classify_batch"):
+                preds, probs = self._classify(embeddings)
+                labels = self.label_encoder.inverse_transform(preds)
+                if probs is None:
+                    probs = [None] * len(batch)
+            t2 = time.perf_counter()
+
+            STAGE_LATENCY.observe(t1 - t0, stage="embed_batch")
+            STAGE_LATENCY.observe(t2 - t1, stage="classify_batch")
+            for label, p in zip(labels, probs):
+                REQUESTS.inc(intent=label)
+                results.append((label, p))
+
+        return results
+
+    def _classify(self, embeddings):
+        """
+        (predicted classes, probabilities or None). Calibrated SVCs give both
+        from one decision_function() call; other classifiers need two.
+        """
+        if hasattr(self.classifier, "predict_with_proba"):
+            return self.classifier.predict_with_proba(embeddings)
+
+        preds = self.classifier.predict(embeddings)
+        probs = self.classifier.predict_proba(embeddings) if hasattr(self.classifier, "predict_proba") else None
+        return preds, probs
+
+    def _predict(self, text):
+        result = self._parse(text)
+        return result["intent"], result["probs"]
+
+    def _parse(self, text, journal=True):
+        result = self._parse_joint(text) if self.joint else self._parse_single(text)
+        if journal:
+            self.record(text, result)
+        return result
+
+    def _parse_single(self, text):
+        t0 = time.perf_counter()
+        with span("recognizer.embed"):
+            embedding = self.embedding_model.encode([text])
+        t1 = time.perf_counter()
+
+        with span("recognizer.classify"):
+            preds, probs = self._classify(embedding)
+            label = self.label_encoder.inverse_transform(preds[:1])[0]
+            probs = probs[0] if probs is not None else None
+        t2 = time.perf_counter()
+
+        STAGE_LATENCY.observe(t1 - t0, stage="embed")
+        STAGE_LATENCY.observe(t2 - t1, stage="classify")
+        REQUESTS.inc(intent=label)
+
+        timings = {"embed": (t1 - t0) * 1000, "classify": (t2 - t1) * 1000}
+        return {"intent": label, "intents": [label], "probs": probs, "params": {}, "timings": timings}
+
+    def _parse_joint(self, text):
+        t0 = time.perf_counter()
+        with span("recognizer.embed"):
+            sentence, tokens, offsets = encode_with_tokens(self.embedding_model, [text])
+        t1 = time.perf_counter()
+
+        with span("recognizer.classify"):
+            probs = self.classifier.predict_proba(sentence)[0]
+            intents = self.classifier.active_intents(probs)
+        t2 = time.perf_counter()
+
+        with span("recognizer.slots"):
+            params = self.classifier.tag_slots(tokens[0], offsets[0], text)
+        t3 = time.perf_counter()
+
+        label = intents[0][0]
+        STAGE_LATENCY.observe(t1 - t0, stage="embed")
+        STAGE_LATENCY.observe(t2 - t1, stage="classify")
+        STAGE_LATENCY.observe(t3 - t2, stage="slots")
+        REQUESTS.inc(intent=label)
+
+        timings = {"embed": (t1 - t0) * 1000, "classify": (t2 - t1) * 1000, "slots": (t3 - t2) * 1000}
+        return {"intent": label, "intents": [i for i, _ in intents], "probs": probs, "params": params,
+                "timings": timings}
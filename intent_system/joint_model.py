@@ -0,0 +1,311 @@
+# intent_system/joint_model.py
+"""
+Joint multi-intent + slot model ("Joint" family).
+
+One encoder pass gives both outputs: SentenceTransformer.encode(output_value=None)
+returns the token embeddings and their mean-pooled sentence embedding, so
+
+- intents : one-vs-rest logistic regression on the sentence embedding
+            (every intent above JOINT_INTENT_THRESHOLD fires, not just one)
+- slots   : a per-token classifier over BIO tags on the token embeddings,
+            decoded back to character spans of the query
+
+    python -m intent_system.joint_model multi_label_dataset.csv     # check the dataset parses
+
+Training data (dataset/multi_label_dataset.csv) is query / intent / parameters
+JSON; slot labels come from finding each parameter value in its query.
+"""
+
+import os
+import io
+import re
+import csv
+import json
+
+import numpy as np
+import pandas as pd
+
+from core import config
+from core.logger import log
+
+OUTSIDE = "O"
+_NUMBER = re.compile(r"^-?\d+(\.\d+)?$")
+
+
+# ================================================================
+# Dataset
+# ================================================================
+def _split_intents(value):
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [v.strip() for v in re.split(r"[|;]", str(value)) if v.strip()]
+
+
+def _parse_params(value):
+    if isinstance(value, dict):
+        return value
+    if value is None or (isinstance(value, float) and np.isnan(value)) or not str(value).strip():
+        return {}
+    return json.loads(value)
+
+
+def _repair_exported_lines(path):
+    """
+    The shipped file is a tab-separated query/intent/parameters table that
+    went through a CSV writer: each line was cut at the commas inside the
+    parameters JSON, the first piece landing in the column holding the tabs,
+    the following pieces after it and the last one before it. Reassembles
+    the original tab-separated lines.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+
+    lines = []
+    for fields in rows[1:]:
+        heads = [i for i, field in enumerate(fields) if "\t" in field]
+        if not heads:
+            continue
+        h = heads[0]
+        pieces = [p for p in fields[h + 1:] + fields[:h] if p]
+        lines.append(",".join([fields[h]] + pieces))
+
+    header = rows[0][0].split("\t") if rows else []
+    return header, lines
+
+
+def load_multi_label_dataset(path):
+    """
+    Returns a DataFrame with columns text, intent (first label), intents
+    (list) and params (dict). Accepts a clean CSV with query|text,
+    intent|intents ("a|b" for several) and parameters columns, or the
+    mangled export of dataset/multi_label_dataset.csv.
+    """
+    df = pd.read_csv(path)
+    columns = set(df.columns)
+
+    if not ({"query", "text"} & columns) and any("\t" in c for c in df.columns):
+        header, lines = _repair_exported_lines(path)
+        df = pd.read_csv(io.StringIO("\n".join(lines)), sep="\t", names=header, quotechar='"')
+        columns = set(df.columns)
+
+    text_col = "query" if "query" in columns else "text"
+    intent_col = "intents" if "intents" in columns else "intent"
+    params_col = "parameters" if "parameters" in columns else ("params" if "params" in columns else None)
+    if text_col not in columns or intent_col not in columns:
+        raise ValueError(f"[Joint] {path} needs query/text and intent columns, got {list(df.columns)}")
+
+    out = pd.DataFrame({
+        "text": df[text_col].astype(str).str.strip(),
+        "intents": [_split_intents(v) for v in df[intent_col]],
+        "params": [_parse_params(v) for v in df[params_col]] if params_col else [{} for _ in range(len(df))],
+    })
+    out = out[(out["text"] != "") & (out["intents"].map(len) > 0)].reset_index(drop=True)
+    out.insert(1, "intent", out["intents"].map(lambda labels: labels[0]))
+    return out
+
+
+def is_multi_label_dataset(path):
+    """True when the CSV is in query/intent/parameters form rather than text,intent."""
+    header = pd.read_csv(path, nrows=0).columns
+    return "parameters" in header or "intents" in header or any("\t" in c for c in header)
+
+
+# ================================================================
+# Slot labels
+# ================================================================
+def slot_spans(text, params):
+    """(start, end, slot) character spans of each parameter value found in text."""
+    spans = []
+    for slot, value in params.items():
+        if value is None or isinstance(value, (dict, list)):
+            continue
+        match = re.search(rf"(?<!\w){re.escape(str(value))}(?!\w)", text, flags=re.IGNORECASE)
+        if match:
+            spans.append((match.start(), match.end(), slot))
+    return spans
+
+
+def bio_tags(offsets, spans):
+    """BIO tag per token; special tokens (empty offsets) get None and are not trained on."""
+    tags = []
+    for start, end in offsets:
+        if start == end:
+            tags.append(None)
+            continue
+        tag = OUTSIDE
+        for s, e, slot in spans:
+            if s <= start < e:
+                tag = ("B-" if start == s else "I-") + slot
+                break
+        tags.append(tag)
+    return tags
+
+
+def _slot_value(text):
+    if not _NUMBER.match(text):
+        return text
+    return float(text) if "." in text else int(text)
+
+
+# ================================================================
+# Encoding (one pass → sentence + token embeddings)
+# ================================================================
+def _to_numpy(x):
+    if hasattr(x, "detach"):
+        x = x.detach().cpu().float().numpy()
+    return np.asarray(x, dtype=np.float32)
+
+
+def encode_with_tokens(embedder, texts, batch_size=64):
+    """
+    Returns (sentence_embeddings [n, d], token_embeddings [list of (t, d)],
+    offsets [list of [(start, end), ...]]) from a single encode() call.
+    Offsets come from the (fast) tokenizer and index into the original text.
+    """
+    texts = list(texts)
+    outputs = embedder.encode(texts, batch_size=batch_size, output_value=None)
+    encoded = embedder.tokenizer(
+        texts, return_offsets_mapping=True, truncation=True, max_length=embedder.max_seq_length
+    )
+
+    sentences, tokens, offsets = [], [], []
+    for i, out in enumerate(outputs):
+        token_emb = _to_numpy(out["token_embeddings"])
+        mapping = [tuple(o) for o in encoded["offset_mapping"][i]]
+        n = min(len(mapping), len(token_emb))   # token_embeddings are padded to the batch length
+
+        sentences.append(_to_numpy(out["sentence_embedding"]))
+        tokens.append(token_emb[:n])
+        offsets.append(mapping[:n])
+
+    return np.vstack(sentences), tokens, offsets
+
+
+# ================================================================
+# Model
+# ================================================================
+class JointIntentSlotModel:
+    """
+    Intent scores and slot tags over the same encoder output. Exposes
+    predict / predict_proba / classes_ like the single-label classifiers,
+    so evaluation, batch prediction and warm-up work on it unchanged.
+    """
+
+    def __init__(self):
+        self.intent_binarizer = None
+        self.intent_model = None
+        self.slot_model = None
+        self.slot_labels = [OUTSIDE]
+
+    @property
+    def classes_(self):
+        return self.intent_binarizer.classes_
+
+    # ------------------------------------------------------------
+    # Training
+    # ------------------------------------------------------------
+    def fit(self, sentence_embeddings, intent_lists, token_embeddings, token_tags):
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.multiclass import OneVsRestClassifier
+        from sklearn.preprocessing import MultiLabelBinarizer
+
+        self.intent_binarizer = MultiLabelBinarizer()
+        Y = self.intent_binarizer.fit_transform(intent_lists)
+        self.intent_model = OneVsRestClassifier(LogisticRegression(max_iter=2000))
+        self.intent_model.fit(sentence_embeddings, Y)
+
+        X, y = [], []
+        for emb, tags in zip(token_embeddings, token_tags):
+            for vec, tag in zip(emb, tags):
+                if tag is not None:
+                    X.append(vec)
+                    y.append(tag)
+
+        self.slot_labels = sorted(set(y)) or [OUTSIDE]
+        if len(self.slot_labels) > 1:
+            self.slot_model = LogisticRegression(max_iter=2000)
+            self.slot_model.fit(np.asarray(X), y)
+        else:
+            self.slot_model = None
+        return self
+
+    # ------------------------------------------------------------
+    # Intents
+    # ------------------------------------------------------------
+    def predict_proba(self, X):
+        """One-vs-rest scores: independent per intent, rows do not sum to 1."""
+        return self.intent_model.predict_proba(X)
+
+    def predict(self, X):
+        """Index of the top-scoring intent (LabelEncoder-compatible)."""
+        return self.predict_proba(X).argmax(axis=1)
+
+    def active_intents(self, scores, threshold=None, max_intents=None):
+        """[(intent, score), ...] above the threshold, best first; always at least the top one."""
+        threshold = config.JOINT_INTENT_THRESHOLD if threshold is None else threshold
+        max_intents = max_intents or config.JOINT_MAX_INTENTS
+
+        order = np.argsort(scores)[::-1]
+        picked = [i for i in order if scores[i] >= threshold][:max_intents] or [order[0]]
+        return [(self.classes_[i], float(scores[i])) for i in picked]
+
+    # ------------------------------------------------------------
+    # Slots
+    # ------------------------------------------------------------
+    def tag_slots(self, token_embeddings, offsets, text):
+        """Slot values ({slot: value}) decoded from BIO tags of one query's tokens."""
+        if self.slot_model is None or not len(token_embeddings):
+            return {}
+
+        tags = self.slot_model.predict(token_embeddings)
+        params, current, start, end = {}, None, 0, 0
+
+        def close():
+            if current is not None and current not in params:
+                params[current] = _slot_value(text[start:end].strip())
+
+        for tag, (s, e) in zip(tags, offsets):
+            if s == e:
+                continue
+            if tag == OUTSIDE:
+                close()
+                current = None
+                continue
+
+            prefix, slot = tag.split("-", 1)
+            if prefix == "I" and slot == current:
+                end = e
+                continue
+
+            close()
+            current, start, end = slot, s, e
+
+        close()
+        return params
+
+
+# ================================================================
+# Dataset check
+# ================================================================
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Parse a multi-label intent/slot dataset")
+    parser.add_argument("dataset", help="CSV name in dataset/ or a path")
+    args = parser.parse_args(argv)
+
+    path = args.dataset if os.path.exists(args.dataset) else os.path.join(config.DATASET_DIR, args.dataset)
+    df = load_multi_label_dataset(path)
+
+    found = total = 0
+    for text, params in zip(df["text"], df["params"]):
+        total += len(params)
+        found += len(slot_spans(text, params))
+
+    log.info(f"[Joint] {len(df)} queries, {df['intent'].nunique()} intents, "
+             f"{found}/{total} parameter values located in their query")
+    print(df.head(10).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
 # intent_system/model_handlers.py
 
+import time
+
 from sklearn.linear_model import LogisticRegression
 from sklearn.svm import SVC
+
+from core import config
+from intent_system.calibration import CalibratedSVC
 # from sklearn.neural_network import MLPClassifier
 
 
@@ -24,13 +29,69 @@ class LogisticRegressionHandler(BaseModelHandler):
 
 
 class SVCHandler(BaseModelHandler):
-    def __init__(self):
-        self.model = SVC(kernel="rbf", probability=True)
+    """
+    RBF SVC. With SVC_CALIBRATION "sigmoid" / "isotonic" it is fit on all
+    rows and calibrated on cross-fitted scores (intent_system/calibration.py);
+    "platt_cv" keeps SVC(probability=True) and its internal 5-fold CV.
+    """
 
-    print("[TRAINER] Training SVC (RBF)...")
+    def __init__(self, calibration=None):
+        self.calibration = calibration or config.SVC_CALIBRATION
+        if self.calibration == "platt_cv":
+            self.model = SVC(kernel="rbf", probability=True)
+        else:
+            self.model = CalibratedSVC(self.calibration, holdout=config.SVC_CALIBRATION_HOLDOUT)
 
     def train(self, embeddings, labels):
+        print(f"[TRAINER] Training SVC (RBF, calibration: {self.calibration})...")
+        start = time.perf_counter()
         self.model.fit(embeddings, labels)
+        print(f"[TRAINER] SVC trained in {time.perf_counter() - start:.2f}s")
+        return self.model
+
+
+class JointIntentSlotHandler(BaseModelHandler):
+    """
+    Multi-intent + slot family. Trained on sentence and token embeddings
+    from one encoder pass (see intent_system/joint_model.py).
+    """
+
+    joint = True
+
+    def __init__(self):
+        from intent_system.joint_model import JointIntentSlotModel
+        self.model = JointIntentSlotModel()
+
+    def train(self, embeddings, labels, token_embeddings=None, token_tags=None):
+        print("[TRAINER] Training joint intent + slot model...")
+        if token_embeddings is None:
+            token_embeddings, token_tags = [], []
+        self.model.fit(embeddings, labels, token_embeddings, token_tags)
+        return self.model
+
+
+class HierarchicalHandler(BaseModelHandler):
+    """
+    Coarse domain classifier routing to small per-domain heads (see
+    intent_system/hierarchical.py). The trainer sets `taxonomy` from
+    dataset/<stem>.taxonomy.json; None clusters the label centroids.
+    """
+
+    hierarchical = True
+
+    def __init__(self, taxonomy=None):
+        self.taxonomy = taxonomy
+
+    def train(self, embeddings, labels):
+        from intent_system.hierarchical import HierarchicalClassifier
+
+        print(f"[TRAINER] Training hierarchical model (heads: {config.HIER_HEAD})...")
+        start = time.perf_counter()
+        self.model = HierarchicalClassifier(
+            self.taxonomy, config.HIER_NUM_DOMAINS, config.HIER_HEAD, config.HIER_BEAM
+        ).fit(embeddings, labels)
+        print(f"[TRAINER] {len(self.model.domains_)} {self.model.taxonomy_source_} domains "
+              f"trained in {time.perf_counter() - start:.2f}s")
         return self.model
 
 
@@ -0,0 +1,361 @@
+# intent_system/registry.py
+"""
+Per-family model registry.
+
+Each family directory holds a manifest next to its artifacts:
+
+    models/intent_models/<MODEL_TYPE>/manifest.json
+    {
+      "family": "LR",
+      "next_version": 3,
+      "aliases": {"production": "2"},
+      "versions": {
+        "2": {"status": "ready", "created": "...",
+              "artifacts": {"classifier": {"file": "classifier_v2.pkl", "sha256": "...", "bytes": 1234},
+                            "label_encoder": {...}, "metadata": {...}},
+              "metadata": {...}, "metrics": {"accuracy": 0.93, ...}}
+      }
+    }
+
+Lookups (versions, latest, aliases, artifact paths) are dict reads on the
+cached manifest, which is only re-read when its mtime changes; no directory
+listing. Writers hold an exclusive lock file and replace the manifest
+atomically, so two trainings never claim the same version number.
+
+    python -m intent_system.registry LR                 # list versions
+    python -m intent_system.registry LR --promote 2     # set the production alias
+    python -m intent_system.registry LR --verify        # re-check artifact checksums
+    python -m intent_system.registry LR --rebuild       # (re)create from the files on disk
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import argparse
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from core import config
+from core.logger import log
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+_ARTIFACT_FILE = re.compile(r"^(classifier|label_encoder)_v(\d+)\.pkl$")
+
+
+class ModelIntegrityError(RuntimeError):
+    """Raised when an artifact no longer matches the checksum recorded at registration."""
+
+
+def sha256_file(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+
+    def __init__(self, model_type):
+        if model_type not in config.MODEL_TYPES:
+            raise ValueError(f"[Registry] Unknown model type: {model_type}")
+
+        self.model_type = model_type
+        self.model_dir = config.MODEL_TYPES[model_type]
+        self.manifest_path = os.path.join(self.model_dir, config.MODEL_MANIFEST_NAME)
+        self.lock_path = self.manifest_path + ".lock"
+
+        self._thread_lock = threading.RLock()
+        self._manifest = None
+        self._mtime = None
+
+    # ------------------------------------------------------------
+    # Manifest I/O
+    # ------------------------------------------------------------
+    def _empty(self):
+        return {"family": self.model_type, "next_version": 1, "aliases": {}, "versions": {}}
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive across threads and processes (lock file next to the manifest)."""
+        os.makedirs(self.model_dir, exist_ok=True)
+        with self._thread_lock, open(self.lock_path, "a+b") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _read(self):
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        if self._manifest is None or mtime != self._mtime:
+            with open(self.manifest_path, "r") as f:
+                self._manifest = json.load(f)
+            self._mtime = mtime
+        return self._manifest
+
+    def _write(self, manifest):
+        # Temp file + os.replace: readers see the old or the new manifest, never half of one
+        fd, tmp = tempfile.mkstemp(prefix=".manifest.", dir=self.model_dir)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(manifest, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.manifest_path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self._manifest = manifest
+        self._mtime = os.stat(self.manifest_path).st_mtime_ns
+
+    def manifest(self):
+        """Current manifest; built once from the files on disk if there is none yet."""
+        manifest = self._read()
+        if manifest is None:
+            if not os.path.isdir(self.model_dir):
+                return self._empty()
+            manifest = self._migrate()
+        return manifest
+
+    @contextmanager
+    def _update(self):
+        with self._locked():
+            manifest = self._read() or self._scan()
+            yield manifest
+            self._write(manifest)
+
+    # ------------------------------------------------------------
+    # Migration
+    # ------------------------------------------------------------
+    def _entry(self, artifacts, metadata=None, metrics=None):
+        return {
+            "status": "ready",
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "artifacts": {
+                name: {"file": os.path.basename(path), "sha256": sha256_file(path), "bytes": os.path.getsize(path)}
+                for name, path in artifacts.items()
+            },
+            "metadata": metadata or {},
+            "metrics": metrics or {},
+        }
+
+    def _scan(self):
+        """Manifest from classifier_vN.pkl / label_encoder_vN.pkl pairs; stray files are ignored."""
+        manifest = self._empty()
+        if not os.path.isdir(self.model_dir):
+            return manifest
+
+        found = {}
+        for f in os.listdir(self.model_dir):
+            match = _ARTIFACT_FILE.match(f)
+            if match:
+                found.setdefault(str(int(match.group(2))), {})[match.group(1)] = os.path.join(self.model_dir, f)
+
+        for version, artifacts in sorted(found.items(), key=lambda kv: int(kv[0])):
+            if set(artifacts) != {"classifier", "label_encoder"}:
+                log.warn(f"[Registry] {self.model_type} v{version} is incomplete ({sorted(artifacts)}), skipped")
+                continue
+
+            metadata = {}
+            metadata_path = os.path.join(self.model_dir, f"metadata_v{version}.json")
+            if os.path.exists(metadata_path):
+                artifacts["metadata"] = metadata_path
+                with open(metadata_path, "r") as f:
+                    metadata = json.load(f)
+            manifest["versions"][version] = self._entry(artifacts, metadata)
+
+        if manifest["versions"]:
+            manifest["next_version"] = max(int(v) for v in manifest["versions"]) + 1
+        return manifest
+
+    def _migrate(self):
+        with self._locked():
+            # Another process may have written it while we waited for the lock
+            manifest = self._read()
+            if manifest is None:
+                manifest = self._scan()
+                self._write(manifest)
+                log.info(f"[Registry] {self.model_type}: created manifest with {len(manifest['versions'])} versions")
+        return manifest
+
+    def rebuild(self):
+        """Recreates the manifest from the artifact files, keeping aliases and metrics."""
+        with self._locked():
+            old = self._read() or {}
+            manifest = self._scan()
+            for version, entry in manifest["versions"].items():
+                entry["metrics"] = old.get("versions", {}).get(version, {}).get("metrics", {})
+            manifest["aliases"] = {
+                alias: v for alias, v in old.get("aliases", {}).items() if v in manifest["versions"]
+            }
+            manifest["next_version"] = max(manifest["next_version"], old.get("next_version", 1))
+            self._write(manifest)
+
+        log.info(f"[Registry] {self.model_type}: manifest built with {len(manifest['versions'])} versions")
+        return manifest
+
+    # ------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------
+    def versions(self):
+        """Registered (ready) versions, oldest first."""
+        entries = self.manifest()["versions"]
+        return sorted((v for v, e in entries.items() if e.get("status") == "ready"), key=int)
+
+    def latest(self):
+        versions = self.versions()
+        return versions[-1] if versions else None
+
+    def aliases(self):
+        return dict(self.manifest().get("aliases", {}))
+
+    def resolve(self, version=None):
+        """
+        Concrete version for a version number, an alias ("production",
+        "latest") or None (production if set, else latest).
+        """
+        manifest = self.manifest()
+        aliases = manifest.get("aliases", {})
+        version = None if version is None else str(version).lstrip("v")
+
+        if not version:
+            version = aliases.get(config.MODEL_PRODUCTION_ALIAS) or self.latest()
+        elif version == "latest":
+            version = self.latest()
+        elif version in aliases:
+            version = aliases[version]
+
+        entry = manifest["versions"].get(version) if version is not None else None
+        if entry is None or entry.get("status") != "ready":
+            raise FileNotFoundError(
+                f"[Registry] {self.model_type} has no version '{version}' "
+                f"(run: python -m intent_system.registry {self.model_type} --rebuild)"
+            )
+        return version
+
+    def entry(self, version):
+        return self.manifest()["versions"][self.resolve(version)]
+
+    def artifact_path(self, version, name):
+        artifact = self.entry(version)["artifacts"].get(name)
+        if artifact is None:
+            return None
+        return os.path.join(self.model_dir, artifact["file"])
+
+    def verify(self, version, names=None):
+        """Raises ModelIntegrityError when an artifact is missing or its checksum changed."""
+        entry = self.entry(version)
+        for name, artifact in entry["artifacts"].items():
+            if names is not None and name not in names:
+                continue
+            path = os.path.join(self.model_dir, artifact["file"])
+            if not os.path.exists(path):
+                raise ModelIntegrityError(f"[Registry] {self.model_type} v{version}: {artifact['file']} is missing")
+            if sha256_file(path) != artifact["sha256"]:
+                raise ModelIntegrityError(
+                    f"[Registry] {self.model_type} v{version}: {artifact['file']} does not match its recorded checksum"
+                )
+
+    # ------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------
+    def reserve_version(self):
+        """Claims the next version number (safe across concurrent trainings)."""
+        with self._update() as manifest:
+            version = str(manifest["next_version"])
+            manifest["next_version"] += 1
+            manifest["versions"][version] = {"status": "reserved", "created": time.strftime("%Y-%m-%d %H:%M:%S")}
+        return version
+
+    def register(self, version, artifacts, metadata=None, metrics=None):
+        """Records checksums of the saved artifact files and marks the version ready."""
+        entry = self._entry(artifacts, metadata, metrics)
+        with self._update() as manifest:
+            manifest["versions"][str(version)] = entry
+            manifest["next_version"] = max(manifest["next_version"], int(version) + 1)
+        log.info(f"[Registry] Registered {self.model_type} v{version}")
+
+    def record_metrics(self, version, metrics):
+        version = self.resolve(version)
+        with self._update() as manifest:
+            manifest["versions"][version].setdefault("metrics", {}).update(metrics)
+
+    def set_alias(self, alias, version):
+        version = self.resolve(version)
+        with self._update() as manifest:
+            manifest.setdefault("aliases", {})[alias] = version
+        log.info(f"[Registry] {self.model_type}: '{alias}' → v{version}")
+        return version
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(model_type):
+    registry = _registries.get(model_type)
+    if registry is None:
+        with _registries_lock:
+            registry = _registries.setdefault(model_type, ModelRegistry(model_type))
+    return registry
+
+
+# ================================================================
+# CLI
+# ================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect and manage the model registry of a family")
+    parser.add_argument("model_type", choices=list(config.MODEL_TYPES))
+    parser.add_argument("--promote", metavar="VERSION", help=f"Point '{config.MODEL_PRODUCTION_ALIAS}' at VERSION")
+    parser.add_argument("--alias", default=config.MODEL_PRODUCTION_ALIAS, help="Alias set by --promote")
+    parser.add_argument("--verify", action="store_true", help="Re-check every artifact checksum")
+    parser.add_argument("--rebuild", action="store_true", help="Recreate the manifest from the files on disk")
+    args = parser.parse_args(argv)
+
+    registry = get_registry(args.model_type)
+    if args.rebuild:
+        registry.rebuild()
+    if args.promote:
+        registry.set_alias(args.alias, args.promote)
+
+    aliases = registry.aliases()
+    print(f"\n{args.model_type} ({registry.manifest_path})")
+    for version in registry.versions():
+        entry = registry.entry(version)
+        tags = [a for a, v in aliases.items() if v == version]
+        metrics = ", ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}"
+                            for k, v in entry.get("metrics", {}).items())
+        status = ""
+        if args.verify:
+            try:
+                registry.verify(version)
+                status = "  ok"
+            except ModelIntegrityError as e:
+                status = f"  CORRUPT: {e}"
+        print(f"  v{version:<4} {entry['created']}  {' '.join(tags):<12} {metrics}{status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,17 +12,31 @@ from utils.ensure_transformer import get_transformer_model
 from core import config
 from core.logger import log
 from intent_system.preprocess import preprocess_text
+from intent_system.joint_model import (
+    is_multi_label_dataset,
+    load_multi_label_dataset,
+    encode_with_tokens,
+    slot_spans,
+    bio_tags,
+)
+from intent_system.columnar import is_columnar, load_columnar, list_datasets
+from intent_system.registry import get_registry
 
 from intent_system.model_handlers import (
     LogisticRegressionHandler,
     SVCHandler,
+    JointIntentSlotHandler,
+    HierarchicalHandler,
 )
+from intent_system.hierarchical import load_taxonomy
 
 
 # Register available models
 MODEL_REGISTRY = {
     "LR": LogisticRegressionHandler,
     "SVC": SVCHandler,
+    "Joint": JointIntentSlotHandler,
+    "Hierarchical": HierarchicalHandler,
     # "NeuralNet": NeuralNetHandler   # later
 }
 
@@ -31,9 +45,19 @@ MODEL_REGISTRY = {
 # Dataset loader
 # ================================================================
 def load_dataset(dataset_name):
+    """
+    Returns (df, embeddings). Columnar datasets (.arrow / .parquet from
+    intent_system/columnar.py) carry cleaned text and precomputed embeddings;
+    for CSVs embeddings is None.
+    """
     path = os.path.join(config.DATASET_DIR, dataset_name)
     print(f"[TRAINER] Loading dataset: {dataset_name}")
-    return pd.read_csv(path)
+    if is_columnar(path):
+        return load_columnar(path)
+    if is_multi_label_dataset(path):
+        # query / intent / parameters JSON → text, intent (first label), intents, params
+        return load_multi_label_dataset(path), None
+    return pd.read_csv(path), None
 
 
 def preprocess_dataset(df):
@@ -63,28 +87,49 @@ def create_embeddings(texts):
     return embeddings
 
 
-# ================================================================
-# Versioning
-# ================================================================
-def get_next_version(model_type, prefix):
-    model_dir = config.MODEL_TYPES[model_type]
-    os.makedirs(model_dir, exist_ok=True)
+def train_joint(model_handler, df):
+    """
+    Joint family: intents and slot tags from one encoder pass. Uses the raw
+    queries (as seen at inference) so slot values map back onto the text.
+    """
+    if "intents" not in df:
+        df = df.assign(intents=[[label] for label in df["intent"]], params=[{} for _ in range(len(df))])
+    texts = [str(t).strip() for t in df["text"]]
+
+    print(f"[TRAINER] Loading embedding model: {config.EMBEDDING_MODEL_NAME}")
+    embedder = SentenceTransformer(config.EMBEDDING_MODEL_NAME)
+
+    print("[TRAINER] Creating sentence + token embeddings...")
+    embeddings, token_embeddings, offsets = encode_with_tokens(embedder, texts)
+
+    token_tags, located, total = [], 0, 0
+    for text, params, token_offsets in zip(texts, df["params"], offsets):
+        spans = slot_spans(text, params)
+        located, total = located + len(spans), total + len(params)
+        token_tags.append(bio_tags(token_offsets, spans))
+    print(f"[TRAINER] {located}/{total} parameter values located in their query")
+
+    classifier = model_handler.train(embeddings, list(df["intents"]), token_embeddings, token_tags)
 
-    versions = []
+    # Same class order as the binarizer, so the recognizer's label lookup stays unchanged
+    label_encoder = LabelEncoder().fit(classifier.classes_)
+    labels = [label for labels in df["intents"] for label in labels]
+    return classifier, label_encoder, texts, labels
 
-    for f in os.listdir(model_dir):
-        if f.startswith(prefix) and f.endswith(".pkl"):
-            ver = int(f.split("_v")[1].split(".")[0])
-            versions.append(ver)
 
-    return max(versions) + 1 if versions else 1
+# ================================================================
+# Versioning
+# ================================================================
+def reserve_version(model_type):
+    """Next version number, claimed in the family manifest so concurrent trainings never collide."""
+    return get_registry(model_type).reserve_version()
 
 
 # ================================================================
 # Save artifacts
 # ================================================================
 def save_artifacts(model_type, version, classifier, label_encoder,
-                   dataset_name, cleaned_texts, labels):
+                   dataset_name, cleaned_texts, labels, extra=None):
 
     model_dir = config.MODEL_TYPES[model_type]
 
@@ -97,16 +142,24 @@ def save_artifacts(model_type, version, classifier, label_encoder,
 
     metadata = {
         "model_type": model_type,
-        "version": version,
+        "version": int(version),
         "samples": len(cleaned_texts),
         "unique_labels": len(set(labels)),
         "embedding_model": config.EMBEDDING_MODEL_NAME,
         "dataset_used": dataset_name
     }
+    metadata.update(extra or {})
 
     with open(metadata_path, "w") as f:
         json.dump(metadata, f, indent=4)
 
+    # Ready (visible to loaders) only once every file is written and checksummed
+    get_registry(model_type).register(
+        version,
+        {"classifier": classifier_path, "label_encoder": encoder_path, "metadata": metadata_path},
+        metadata=metadata,
+    )
+
     log.info("\n[TRAINER] Saved:")
     log.info(f" → {classifier_path}")
     log.info(f" → {encoder_path}")
@@ -138,7 +191,7 @@ def main():
     # -------------------------
     # Select dataset
     # -------------------------
-    datasets = [f for f in os.listdir(config.DATASET_DIR) if f.endswith(".csv")]
+    datasets = list_datasets()
     print("\nAvailable Datasets:")
     for i, d in enumerate(datasets, 1):
         print(f"{i}. {d}")
@@ -146,27 +199,46 @@ def main():
     dataset_choice = int(input("Select dataset: "))
     dataset_name = datasets[dataset_choice - 1]
 
-    df = load_dataset(dataset_name)
-    cleaned_texts, labels = preprocess_dataset(df)
-
-    label_encoder = LabelEncoder()
-    encoded_labels = label_encoder.fit_transform(labels)
-
-    embeddings = create_embeddings(cleaned_texts)
+    df, embeddings = load_dataset(dataset_name)
 
     # -------------------------
     # Train model
     # -------------------------
-    classifier = model_handler.train(embeddings, encoded_labels)
+    extra = None
+    if getattr(model_handler, "joint", False):
+        classifier, label_encoder, cleaned_texts, labels = train_joint(model_handler, df)
+        extra = {"multi_label": True, "slot_tags": classifier.slot_labels}
+    else:
+        if embeddings is not None:
+            # Columnar dataset: cleaned once at conversion, embeddings memory-mapped
+            print(f"[TRAINER] Using {len(embeddings)} precomputed embeddings")
+            cleaned_texts, labels = df["cleaned"].tolist(), df["intent"].tolist()
+        else:
+            cleaned_texts, labels = preprocess_dataset(df)
+            embeddings = create_embeddings(cleaned_texts)
+
+        label_encoder = LabelEncoder()
+        encoded_labels = label_encoder.fit_transform(labels)
+
+        if getattr(model_handler, "hierarchical", False):
+            model_handler.taxonomy = load_taxonomy(dataset_name, label_encoder)
+
+        classifier = model_handler.train(embeddings, encoded_labels)
+
+        if getattr(model_handler, "hierarchical", False):
+            extra = {
+                "taxonomy": classifier.describe_taxonomy(label_encoder),
+                "taxonomy_source": classifier.taxonomy_source_,
+            }
 
     # -------------------------
     # Save?
     # -------------------------
     choice = input("\n[TRAINER] Save model? (Y/N): ").strip().lower()
     if choice in ("y", "yes"):
-        version = get_next_version(model_type, "classifier")
+        version = reserve_version(model_type)
         save_artifacts(model_type, version, classifier, label_encoder,
-                       dataset_name, cleaned_texts, labels)
+                       dataset_name, cleaned_texts, labels, extra)
     else:
         log.info("[TRAINER] Model NOT saved.")
 
@@ -1,30 +1,343 @@
 #Decides which model handles the request (vosk or whisper)
+"""
+Confidence-gated Vosk → Whisper cascade.
+
+Vosk answers every utterance. Only when its word confidences fall below
+threshold is the audio sent to Whisper, which runs in a separate worker
+process (loaded lazily on first use, so startup stays fast and Whisper's
+compute never holds the GIL of the main process). Where the low-confidence
+words form a short span, only that segment (plus padding) is re-decoded and
+spliced back into the Vosk transcript.
+
+    router = STTRouter()
+    result = router.transcribe(duration=3)            # waits for Whisper if needed
+    result = router.transcribe(duration=3, wait=False)
+    result.text                                       # Vosk text, available immediately
+    result.refined.result()                           # Whisper-corrected text (Future) or None
+
+The engine uses it for voice input when INTENTIQ_STT_CASCADE=1 (sequential
+mode only: speculation and the pipelined engine need Vosk's streaming
+partials, which the cascade's fixed-window transcribe() does not produce).
+"""
+
+import time
+import queue
+import itertools
+import threading
+import multiprocessing
+from concurrent.futures import Future
+
+from core import config
+from core.logger import log
+from core.metrics import registry
+from io_layer.advanced_io.stt_vosk import VoskSTT
+
+CASCADE_REQUESTS = registry.counter(
+    "intentiq_stt_cascade_total", "Utterances by cascade path (vosk, whisper_segment, whisper_full).", ("path",)
+)
+CASCADE_EXTRA_LATENCY = registry.histogram(
+    "intentiq_stt_cascade_extra_seconds", "Extra latency added by the Whisper fallback."
+)
+
+
+# ================================================================
+# Whisper worker process
+# ================================================================
+def _whisper_worker(model_name, requests, responses):
+    # Imported here so the parent process never loads torch/whisper for this
+    try:
+        from io_layer.advanced_io.stt_whisper import WhisperSTT
+        whisper_stt = WhisperSTT(model_name=model_name)
+    except Exception as e:
+        responses.put(("failed", None, f"{type(e).__name__}: {e}"))
+        return
+    responses.put(("ready", None, None))
+
+    while True:
+        item = requests.get()
+        if item is None:
+            break
+        request_id, audio = item
+        try:
+            responses.put((request_id, whisper_stt.transcribe(audio), None))
+        except Exception as e:
+            responses.put((request_id, None, str(e)))
+
+
+class WhisperWorker:
+    """
+    Owns the Whisper process; returns Futures for transcription requests.
+
+    If the worker fails to load (model download) or dies (OOM), its pending
+    requests fail at once and the next request starts a new worker. After
+    CASCADE_WHISPER_MAX_RESTARTS failures in a row the fallback is disabled.
+    """
+
+    def __init__(self, model_name=None):
+        self.model_name = model_name or config.WHISPER_MODEL_NAME
+        self._ctx = multiprocessing.get_context("spawn")
+        self._process = None
+        self._requests = None
+        self._responses = None
+        self._pending = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._failures = 0
+        self.disabled = False
+        self.ready = threading.Event()
+
+    def _start(self):
+        # Caller holds _lock
+        if self.disabled:
+            raise RuntimeError("Whisper fallback is disabled after repeated worker failures")
+        if self._process is not None:
+            if self._process.is_alive():
+                return
+            self._lost(self._process, f"Whisper worker exited (code {self._process.exitcode})")
+            if self.disabled:
+                raise RuntimeError("Whisper fallback is disabled after repeated worker failures")
+
+        log.info(f"[STTRouter] Starting Whisper worker ({self.model_name})...")
+        self._requests = self._ctx.Queue()
+        self._responses = self._ctx.Queue()
+        self._process = self._ctx.Process(
+            target=_whisper_worker,
+            args=(self.model_name, self._requests, self._responses),
+            name="whisper-worker",
+            daemon=True,
+        )
+        self._process.start()
+        threading.Thread(
+            target=self._collect, args=(self._process, self._responses), name="whisper-results", daemon=True
+        ).start()
+
+    def start(self):
+        with self._lock:
+            self._start()
+
+    def _lost(self, process, reason):
+        """`process` failed: fail its pending requests (caller holds _lock)."""
+        if self._process is not process:
+            return   # already handled (or closed)
+        if process.is_alive():
+            process.terminate()
+        self._process = None
+        self.ready.clear()
+
+        self._failures += 1
+        if self._failures > config.CASCADE_WHISPER_MAX_RESTARTS:
+            self.disabled = True
+            log.error(f"[STTRouter] {reason}; Whisper fallback disabled after {self._failures} failures.")
+        else:
+            log.error(f"[STTRouter] {reason}; restarting on the next fallback.")
+
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(RuntimeError(reason))
+
+    def _collect(self, process, responses):
+        while True:
+            try:
+                request_id, text, error = responses.get(timeout=1.0)
+            except queue.Empty:
+                if not process.is_alive():
+                    with self._lock:
+                        self._lost(process, f"Whisper worker died (exit code {process.exitcode})")
+                    break
+                continue
+            except (EOFError, OSError):
+                break
+
+            if request_id is None:
+                break
+            if request_id == "ready":
+                self.ready.set()
+                log.info("[STTRouter] Whisper worker ready.")
+                continue
+            if request_id == "failed":
+                with self._lock:
+                    self._lost(process, f"Whisper worker failed to start: {error}")
+                break
+
+            with self._lock:
+                future = self._pending.pop(request_id, None)
+                if error is None:
+                    self._failures = 0
+            if future is None:
+                continue
+            if error is not None:
+                future.set_exception(RuntimeError(f"Whisper failed: {error}"))
+            else:
+                future.set_result(text)
+
+    def submit(self, audio):
+        future = Future()
+        with self._lock:
+            try:
+                self._start()
+            except Exception as e:
+                future.set_exception(e)
+                return future
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            self._requests.put((request_id, audio))
+        return future
+
+    def close(self):
+        with self._lock:
+            if self._process is None:
+                return
+            process, self._process = self._process, None
+            self._requests.put(None)
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+            self._responses.put((None, None, None))
+
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(RuntimeError("Whisper worker closed"))
+
+
+# ================================================================
+# Cascade
+# ================================================================
+class CascadeResult:
+    __slots__ = ("text", "vosk_text", "confidence", "path", "refined")
+
+    def __init__(self, text, vosk_text, confidence, path, refined=None):
+        self.text = text                # best text available right now
+        self.vosk_text = vosk_text
+        self.confidence = confidence
+        self.path = path                # "vosk" | "whisper_segment" | "whisper_full"
+        self.refined = refined          # Future[str] with the corrected text, or None
 
-from io_layer.stt_vosk import VoskSTT
-from io_layer.stt_whisper import WhisperSTT
 
 class STTRouter:
-    def __init__(self):
-        # Load both engines once, reused forever
-        self.vosk = VoskSTT()
-        self.whisper = WhisperSTT(model_name = "medium")
-        
+    def __init__(self, vosk=None, whisper=None):
+        # Vosk is loaded once and reused forever; Whisper only on first fallback
+        self.vosk = vosk or VoskSTT()
+        self.whisper = whisper or WhisperWorker()
+        self.sample_rate = self.vosk.sample_rate
+
         # Routing thresholds
-        self.short_command_max_len = 3 #words
-        self.low_conf_threshold = 0.75 #below this confidence, fallback to whisper
-        
-    def transcribe(self, duration = 3):
+        self.low_conf_threshold = config.CASCADE_MIN_CONFIDENCE #below this confidence, fallback to whisper
+        self.word_conf_threshold = config.CASCADE_WORD_CONFIDENCE
+
+        self.stats = {"utterances": 0, "fallbacks": 0, "segment_fallbacks": 0, "extra_latency_s": 0.0}
+
+    # ------------------------------------------------------------
+    # Segment selection
+    # ------------------------------------------------------------
+    def _low_confidence_span(self, words):
+        """Returns (first_idx, last_idx) of the low-confidence words, or None."""
+        low = [i for i, w in enumerate(words) if w.get("conf", 1.0) < self.word_conf_threshold]
+        if not low:
+            return None
+        return low[0], low[-1]
+
+    def _plan(self, text, confidence, words, audio):
+        """Decides what (if anything) Whisper should decode."""
+        if audio is None or len(audio) == 0:
+            return "vosk", None, None   # nothing to re-decode
+        if not text:
+            return "whisper_full", audio, None
+
+        span = self._low_confidence_span(words)
+        if confidence >= self.low_conf_threshold and span is None:
+            return "vosk", None, None
+
+        if span is None:
+            return "whisper_full", audio, None
+
+        first, last = span
+        pad = config.CASCADE_SEGMENT_PAD
+        start = max(0.0, words[first]["start"] - pad)
+        end = min(len(audio) / self.sample_rate, words[last]["end"] + pad)
+
+        if (end - start) * self.sample_rate > config.CASCADE_FULL_REDECODE_RATIO * len(audio):
+            return "whisper_full", audio, None
+
+        segment = audio[int(start * self.sample_rate):int(end * self.sample_rate)]
+        return "whisper_segment", segment, span
+
+    @staticmethod
+    def _splice(words, span, replacement):
+        first, last = span
+        before = [w["word"] for w in words[:first]]
+        after = [w["word"] for w in words[last + 1:]]
+        middle = replacement.strip().rstrip(".!?").split()
+
+        # The padding lets Whisper hear the neighbouring words; don't repeat them
+        if before and middle and middle[0].lower().strip(",") == before[-1].lower():
+            middle = middle[1:]
+        if after and middle and middle[-1].lower().strip(",") == after[0].lower():
+            middle = middle[:-1]
+        return " ".join(before + middle + after).strip()
+
+    # ------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------
+    def transcribe(self, duration = 3, wait = True):
         #Step 1: Real-time transcription with Vosk
-        #Step 2: Check confidence score
-        #Step 3: Decide if whisper fallback is needed
-        
-        text, confidence = self.vosk.trancribe(duration)
-        
-        if len(text.split()) <= self.short_command_max_len and confidence >= self.low_conf_threshold:
-            return text #vosk is fine for this one
-        else:
-            # command is big, gotta use whisper
-            audio = self.vosk.last_audio
-            whisper_text = self.whisper.transcribe(audio)
-            return whisper_text
-        
\ No newline at end of file
+        #Step 2: Check word confidence scores
+        #Step 3: Fall back to Whisper (segment or full) only when needed
+        text, confidence = self.vosk.transcribe(duration)
+        return self._route(text, confidence, list(self.vosk.last_words), self.vosk.last_audio, wait)
+
+    def transcribe_audio(self, audio_bytes, wait = True):
+        #Same cascade for an already captured 16 kHz int16 buffer (offline / tests).
+        import numpy as np
+        text, confidence = self.vosk.transcribe_audio(audio_bytes)
+        audio = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
+        return self._route(text, confidence, list(self.vosk.last_words), audio, wait)
+
+    def _route(self, text, confidence, words, audio, wait):
+        self.stats["utterances"] += 1
+        path, audio_to_decode, span = self._plan(text, confidence, words, audio)
+        if path != "vosk" and self.whisper.disabled:
+            path = "vosk"   # fallback given up after repeated worker failures
+        CASCADE_REQUESTS.inc(path=path)
+
+        if path == "vosk":
+            return CascadeResult(text, text, confidence, path)  # vosk is fine for this one
+
+        self.stats["fallbacks"] += 1
+        if path == "whisper_segment":
+            self.stats["segment_fallbacks"] += 1
+
+        started = time.perf_counter()
+        whisper_future = self.whisper.submit(audio_to_decode)
+        refined = Future()
+
+        def finish(f):
+            elapsed = time.perf_counter() - started
+            self.stats["extra_latency_s"] += elapsed
+            CASCADE_EXTRA_LATENCY.observe(elapsed)
+            try:
+                whisper_text = f.result()
+            except Exception as e:
+                log.warn("[STTRouter] Whisper fallback failed, keeping Vosk text: %s", e)
+                refined.set_result(text)
+                return
+            refined.set_result(self._splice(words, span, whisper_text) if span else whisper_text)
+
+        whisper_future.add_done_callback(finish)
+        result = CascadeResult(text, text, confidence, path, refined)
+
+        if wait:
+            try:
+                result.text = refined.result(timeout=config.CASCADE_WHISPER_TIMEOUT)
+            except Exception:
+                log.warn("[STTRouter] Whisper fallback timed out, using Vosk text.")
+        return result
+
+    def summary(self):
+        s = dict(self.stats)
+        n = s["utterances"]
+        s["fallback_rate"] = s["fallbacks"] / n if n else 0.0
+        s["avg_extra_latency_ms"] = s["extra_latency_s"] / s["fallbacks"] * 1000 if s["fallbacks"] else 0.0
+        return s
+
+    def close(self):
+        self.whisper.close()
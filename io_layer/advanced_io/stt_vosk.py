@@ -1,15 +1,17 @@
 import os
+import time
 import numpy as np
-import queue
 import json
-import sounddevice as sd
 from vosk import Model, KaldiRecognizer
+from utils.timer import span
+from core import config
+from io_layer.audio_utils import AudioCapture, VoiceActivityDetector
 
 class VoskSTT:
-    def __init__ (self, model_path = "models/voice_models/vosk"):
+    def __init__ (self, model_path = config.VOSK_MODEL_PATH):
         #Load Vosk model for real-time command recognition.
         print ("[Vosk] initializing...")
-        os.mkdirs(model_path, exist_ok = True)
+        os.makedirs(model_path, exist_ok = True)
         
         if not os.listdir(model_path):
             raise RuntimeError("❌ No Vosk model found! Download a model into: " + model_path)
@@ -18,49 +20,86 @@ class VoskSTT:
         self.recognizer = KaldiRecognizer(self.model, self.sample_rate)
         self.recognizer.SetWords(True)
 
-        self.audio_q = queue.Queue()
+        # One mic stream at the device rate, resampled into a 16 kHz ring (see audio_utils)
+        self.capture = AudioCapture(rates=(self.sample_rate,), blocksize=4000)
+        self.ring = self.capture.rings[self.sample_rate]
         self.last_audio = None  # Used by Whisper fallback
+        self.last_words = []    # [{"word", "start", "end", "conf"}] of the last transcription
+        self.vad = VoiceActivityDetector(self.sample_rate) if config.VAD_ENABLED else None
         
         print ("[VOSK] ready..")
         
-    def _audio_callback(self, indata, frames, time, status):
-        #Store live audio chunks into queue.
-        if status:
-            print(f"[Audio Status] {status}")
-        
-        self.audio_q.put(bytes(indata))
-        
+    @span("stt.vosk.transcribe")
     def transcribe(self, duration = 2):
         #Capture & recognize short voice commands.
+        #Records for at most 'duration' seconds; with the VAD on, recording stops as soon as
+        #the speaker stops and only speech frames are kept (for Kaldi and the Whisper fallback).
         #Returns: text, confidence_score (0–1)
         
         print(f"[Vosk] listening for {duration}s...")
-        self.audio_q = queue.Queue() #clear old audio
+        if self.vad is not None:
+            self.vad.reset()
         
-        #Start non-blocking stream
-        with sd.RawInputStream(
-            samplerate=self.sample_rate,
-            blocksize=4000,
-            dtype="int16",
-            channels=1,
-            callback=self._audio_callback,
-        ):
-            sd.sleep(duration * 1000)
+        #Start non-blocking stream (the ring is cleared on start)
+        with span("stt.vosk.record"), self.capture:
+            if self.vad is None:
+                time.sleep(duration)
+                audio_bytes = self._drain()
+            else:
+                audio_bytes = self._record_speech(duration)
         
-        audio_bytes = b"".join(list(self.audio_q.queue))
+        # Single int16 → float32 conversion, shared with the Whisper fallback
         self.last_audio = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
+        if not audio_bytes:
+            self.last_words = []
+            print("[VOSK] → (no speech)")
+            return "", 0.0
         
-        if self.recognizer.AcceptWaveform(audio_bytes):
-            result_json = json.loads(self.recognizer.Result())
-        else:
-            result_json = json.loads(self.recognizer.PartialResult())
+        return self.transcribe_audio(audio_bytes)
+
+    def _drain(self):
+        #Everything currently buffered in the ring, as bytes.
+        parts = []
+        while True:
+            view = self.ring.read(self.ring.max_read, timeout=0, partial=True)
+            if view is None:
+                return b"".join(parts)
+            parts.append(view)
+
+    def _record_speech(self, duration):
+        #Pulls mic chunks through the VAD until the utterance ends or time runs out.
+        deadline = time.monotonic() + duration
+        speech = []
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            chunk = self.ring.read(4000, timeout=remaining, partial=True)
+            if chunk is None:
+                break
+            voiced, ended = self.vad.process(chunk)
+            speech.append(voiced)
+            if ended:
+                break
+        return b"".join(speech)
+
+    def transcribe_audio(self, audio_bytes):
+        #Recognize an already captured 16 kHz int16 buffer.
+        #Returns: text, confidence_score (0–1); word timings/confidences in self.last_words
+        with span("stt.vosk.decode"):
+            if self.recognizer.AcceptWaveform(audio_bytes):
+                result_json = json.loads(self.recognizer.Result())
+            else:
+                # FinalResult (unlike PartialResult) flushes and keeps word confidences
+                result_json = json.loads(self.recognizer.FinalResult())
 
         text = result_json.get("text", "").strip()
         confidence = 0.0
+        self.last_words = result_json.get("result", [])
 
         # Confidence available only in full results
-        if "result" in result_json and len(result_json["result"]) > 0:
-            conf_scores = [w["conf"] for w in result_json["result"] if "conf" in w]
+        if len(self.last_words) > 0:
+            conf_scores = [w["conf"] for w in self.last_words if "conf" in w]
             if conf_scores:
                 confidence = sum(conf_scores) / len(conf_scores)
 
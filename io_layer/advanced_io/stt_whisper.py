@@ -1,31 +1,43 @@
 import whisper
 import os
-import sounddevice as sd
+import time
 import numpy as np
+from utils.timer import span
+from core import config
+from io_layer.audio_utils import AudioCapture
 
 class WhisperSTT:
     def __init__(self, model_name = "base"):
         #Loads Whisper model into memory.
         #model_name: Which Whisper version to use (base)
-        model_path = f"models/voice_models/{model_name}"
+        model_path = os.path.join(config.VOICE_MODEL_DIR, model_name)
         os.makedirs(model_path, exist_ok=True)
         print(f"[STT] Loading Whisper model: {model_name}")
         self.model = whisper.load_model(model_name, download_root=model_path)
         print(f"[STT] {model_name} model loaded successfully")
         
-        self.sample_rate = 44100 #my macbook prorequires 44.1khz sample rate
+        self.sample_rate = 16000 #Whisper's rate; the mic runs at config.AUDIO_DEVICE_RATE (INTENTIQ_MIC_RATE)
         
+    @span("stt.whisper.record")
     def record_audio(self, duration):
         #Records audio from the microphone for 'duration' seconds.
-        #Returns: numpy array of audio samples
+        #Same capture path as Vosk: one stream at the device rate, resampled to 16 kHz.
+        #Returns: numpy array of 16 kHz float32 samples
         print(f"[STT] Listening for {duration} seconds...")
-        audio = sd.rec(int(duration * self.sample_rate),
-                        samplerate = self.sample_rate,
-                        channels = 1,
-                        dtype = 'float32')
-        sd.wait() # Wait for recording to finish
-        return audio.flatten()
+        capture = AudioCapture(rates=(self.sample_rate,), seconds=max(duration + 1, config.AUDIO_RING_SECONDS))
+        ring = capture.rings[self.sample_rate]
+        with capture:
+            time.sleep(duration)
+        parts = []
+        while True:
+            view = ring.read(ring.max_read, timeout=0, partial=True)
+            if view is None:
+                break
+            parts.append(np.array(view, dtype=np.int16))
+        audio = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int16)
+        return audio.astype(np.float32) / 32768.0
     
+    @span("stt.whisper.transcribe")
     def transcribe(self, audio):
         #Converts audio (numpy array) → text using Whisper
         print("[STT] Transcribing audio...")
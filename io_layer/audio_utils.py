@@ -0,0 +1,673 @@
+# io_layer/audio_utils.py
+"""
+Audio helpers shared by the STT layer (capture ring buffer, resampling,
+offline replay, format checks, voice-activity detection).
+
+Check the VAD against recordings:
+    python -m io_layer.audio_utils recordings/*.wav
+    python -m io_layer.audio_utils recordings/*.wav --out-dir trimmed/
+"""
+
+import os
+import sys
+import time
+import wave
+import argparse
+import threading
+from math import gcd
+from collections import deque
+
+import numpy as np
+
+from core import config
+
+
+def iter_wav_chunks(path, chunk_frames=4000, expected_rate=16000):
+    """
+    Streams raw int16 mono PCM bytes from a WAV file in fixed-size chunks,
+    the same shape the microphone callback produces. Used to replay
+    recordings through the recognizers offline.
+    """
+    with wave.open(path, "rb") as wf:
+        if wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected mono 16-bit PCM, got "
+                             f"{wf.getnchannels()} ch / {wf.getsampwidth() * 8}-bit")
+        if expected_rate and wf.getframerate() != expected_rate:
+            raise ValueError(f"{path}: expected {expected_rate} Hz, got {wf.getframerate()} Hz")
+
+        while True:
+            data = wf.readframes(chunk_frames)
+            if not data:
+                break
+            yield data
+
+
+# ================================================================
+# File input (WAV / FLAC)
+# ================================================================
+AUDIO_EXTENSIONS = (".wav", ".flac")
+
+
+def find_audio_files(inputs):
+    """Expands files and directories (recursively) into a sorted list of audio paths."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                paths.extend(os.path.join(root, f) for f in files if f.lower().endswith(AUDIO_EXTENSIONS))
+        elif item.lower().endswith(AUDIO_EXTENSIONS):
+            paths.append(item)
+        else:
+            raise ValueError(f"Unsupported audio file: {item}")
+    return sorted(paths)
+
+
+def _soundfile():
+    try:
+        import soundfile
+    except ImportError:
+        raise RuntimeError("FLAC input needs the 'soundfile' package (pip install soundfile)")
+    return soundfile
+
+
+def audio_info(path):
+    """(sample_rate, n_frames, channels) without reading the samples."""
+    if path.lower().endswith(".wav"):
+        with wave.open(path, "rb") as wf:
+            return wf.getframerate(), wf.getnframes(), wf.getnchannels()
+    info = _soundfile().info(path)
+    return info.samplerate, info.frames, info.channels
+
+
+def iter_audio_chunks(path, chunk_frames=4000):
+    """
+    Streams int16 mono PCM bytes from a WAV or FLAC file at its native rate
+    (multi-channel audio is averaged to mono). Only one chunk is in memory
+    at a time.
+    """
+    if path.lower().endswith(".wav"):
+        with wave.open(path, "rb") as wf:
+            if wf.getsampwidth() != 2:
+                raise ValueError(f"{path}: expected 16-bit PCM, got {wf.getsampwidth() * 8}-bit")
+            channels = wf.getnchannels()
+            while True:
+                data = wf.readframes(chunk_frames)
+                if not data:
+                    break
+                if channels > 1:
+                    block = np.frombuffer(data, dtype=np.int16).reshape(-1, channels)
+                    data = block.mean(axis=1).astype(np.int16).tobytes()
+                yield data
+        return
+
+    for block in _soundfile().blocks(path, blocksize=chunk_frames, dtype="int16", always_2d=True):
+        yield block.mean(axis=1).astype(np.int16).tobytes() if block.shape[1] > 1 else block[:, 0].tobytes()
+
+
+def memmap_wav(path):
+    """
+    Memory-maps the PCM data of a 16-bit WAV file. Returns (samples, rate)
+    where samples is an int16 array of shape (n_frames,) or (n_frames, channels);
+    pages are only read when touched.
+    """
+    with open(path, "rb") as f:
+        header = f.read(12)
+        if header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            raise ValueError(f"{path}: not a RIFF/WAVE file")
+
+        rate = channels = bits = None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                raise ValueError(f"{path}: no data chunk")
+            chunk_id, size = chunk[:4], int.from_bytes(chunk[4:], "little")
+
+            if chunk_id == b"fmt ":
+                fmt = f.read(size)
+                channels = int.from_bytes(fmt[2:4], "little")
+                rate = int.from_bytes(fmt[4:8], "little")
+                bits = int.from_bytes(fmt[14:16], "little")
+            elif chunk_id == b"data":
+                offset = f.tell()
+                break
+            else:
+                f.seek(size + (size & 1), os.SEEK_CUR)
+
+    if bits != 16:
+        raise ValueError(f"{path}: expected 16-bit PCM, got {bits}-bit")
+
+    n_frames = size // (2 * channels)
+    shape = (n_frames,) if channels == 1 else (n_frames, channels)
+    return np.memmap(path, dtype=np.int16, mode="r", offset=offset, shape=shape), rate
+
+
+def load_audio_16k(path):
+    """Whole file as float32 mono at 16 kHz (Whisper's input format)."""
+    if path.lower().endswith(".wav"):
+        samples, rate = memmap_wav(path)
+        if samples.ndim > 1:
+            samples = samples.mean(axis=1)
+    else:
+        samples, rate = _soundfile().read(path, dtype="int16", always_2d=True)
+        samples = samples.mean(axis=1)
+
+    audio = np.asarray(samples, dtype=np.float32) / 32768.0
+    return resample(audio, rate, 16000)
+
+
+# ================================================================
+# Capture: ring buffer + resampler
+# ================================================================
+class AudioRingBuffer:
+    """
+    Preallocated int16 ring buffer between one producer (the audio
+    callback) and one consumer thread.
+
+    Each side only advances its own counter, so the data path takes no
+    lock; the producer publishes a block by bumping `_written` after the
+    samples are in place. The first `max_read` samples are mirrored past
+    the end of the buffer, so every read is one contiguous memoryview
+    (no copy, no wrap-around handling in the caller). A view stays valid
+    until the producer laps it, i.e. for about (capacity - n) samples of
+    new audio.
+
+    Overflow policy when the consumer falls behind:
+        "drop_oldest"  keep recording, the consumer skips the overwritten audio
+        "drop_newest"  keep the buffered audio, incoming samples are discarded
+    Dropped samples are counted in `dropped`.
+    """
+
+    def __init__(self, capacity, max_read=None, overflow="drop_oldest"):
+        if overflow not in ("drop_oldest", "drop_newest"):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+
+        self.capacity = int(capacity)
+        self.max_read = int(max_read or self.capacity // 4)
+        self.overflow = overflow
+
+        self._buf = np.zeros(self.capacity + self.max_read, dtype=np.int16)
+        self._written = 0               # producer-owned
+        self._read = 0                  # consumer-owned
+        self._dropped_newest = 0        # producer-owned
+        self._overrun = 0               # consumer-owned
+        self._data_ready = threading.Event()
+
+    # ------------------------------------------------------------
+    # Producer
+    # ------------------------------------------------------------
+    def _mirror(self, start, end):
+        lo, hi = max(start, 0), min(end, self.max_read)
+        if lo < hi:
+            self._buf[self.capacity + lo:self.capacity + hi] = self._buf[lo:hi]
+
+    def write(self, data):
+        """Appends int16 samples (array, bytes or a sounddevice buffer). Returns samples kept."""
+        samples = data if isinstance(data, np.ndarray) else np.frombuffer(data, dtype=np.int16)
+        n = len(samples)
+
+        if self.overflow == "drop_newest":
+            free = self.capacity - (self._written - self._read)
+            if n > free:
+                self._dropped_newest += n - free
+                samples, n = samples[:free], free
+        elif n > self.capacity:
+            self._dropped_newest += n - self.capacity
+            samples, n = samples[-self.capacity:], self.capacity
+
+        if n:
+            pos = self._written % self.capacity
+            first = min(n, self.capacity - pos)
+            self._buf[pos:pos + first] = samples[:first]
+            self._mirror(pos, pos + first)
+            if first < n:
+                self._buf[:n - first] = samples[first:]
+                self._mirror(0, n - first)
+
+            self._written += n
+            self._data_ready.set()
+        return n
+
+    # ------------------------------------------------------------
+    # Consumer
+    # ------------------------------------------------------------
+    def _skip_overrun(self, written):
+        behind = written - self._read - self.capacity
+        if behind > 0:
+            self._overrun += behind
+            self._read += behind
+
+    def read(self, n, timeout=None, partial=False):
+        """
+        Returns a memoryview of n int16 samples (n <= max_read), waiting up
+        to `timeout` seconds. With partial=True, returns whatever is buffered
+        (up to n) instead of waiting for all of it. None on timeout.
+        """
+        if n > self.max_read:
+            raise ValueError(f"read of {n} samples exceeds max_read={self.max_read}")
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            written = self._written
+            self._skip_overrun(written)
+            ready = written - self._read
+
+            if ready >= n or (partial and ready > 0):
+                count = min(n, ready)
+                pos = self._read % self.capacity
+                view = memoryview(self._buf[pos:pos + count])
+                self._read += count
+                return view
+
+            self._data_ready.clear()
+            if self._written != written:
+                continue    # producer wrote between the check and clear()
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            self._data_ready.wait(remaining)
+
+    def available(self):
+        return min(self._written - self._read, self.capacity)
+
+    qsize = available   # lets metrics.track_queue report the fill level (in samples)
+
+    def clear(self):
+        """Consumer side: discards everything buffered so far."""
+        self._read = self._written
+
+    @property
+    def dropped(self):
+        return self._dropped_newest + self._overrun
+
+
+class PolyphaseResampler:
+    """
+    Streaming rational-ratio resampler (e.g. 44.1 kHz → 16 kHz is up 160,
+    down 441). Only the output samples that are actually needed are
+    computed: each one is a `taps_per_phase`-tap dot product with one phase
+    of a Kaiser-windowed sinc low-pass. State carries across calls, so
+    chunked output matches resampling the whole signal at once.
+    """
+
+    def __init__(self, in_rate, out_rate, taps_per_phase=24, rolloff=0.9, beta=8.0):
+        g = gcd(int(in_rate), int(out_rate))
+        self.in_rate, self.out_rate = in_rate, out_rate
+        self.up, self.down = out_rate // g, in_rate // g
+        self.taps = taps_per_phase
+
+        # Prototype low-pass at the upsampled rate, cut off below the lower Nyquist
+        n_taps = self.up * taps_per_phase
+        cutoff = 0.5 * rolloff / max(self.up, self.down)
+        t = np.arange(n_taps) - (n_taps - 1) / 2
+        h = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(n_taps, beta) * self.up
+
+        # phases[p, k] = h[p + k * up]: the taps used by outputs that land on phase p
+        self._phases = h.reshape(taps_per_phase, self.up).T.astype(np.float32)
+        self._history = np.zeros(taps_per_phase - 1, dtype=np.float32)
+        self._t = 0   # position of the next output, in upsampled units from the chunk start
+        self._k = np.arange(taps_per_phase)
+
+    def reset(self):
+        self._history[:] = 0
+        self._t = 0
+
+    def process(self, samples):
+        """Resamples one chunk. int16 in → int16 out, float in → float32 out."""
+        is_int = np.asarray(samples).dtype == np.int16
+        x = np.asarray(samples, dtype=np.float32)
+        if self.up == self.down:
+            return np.asarray(samples)
+
+        total = len(x) * self.up
+        n_out = max(0, -(-(total - self._t) // self.down))
+        buf = np.concatenate((self._history, x))
+
+        positions = self._t + np.arange(n_out) * self.down
+        offsets = positions // self.up
+        phases = positions % self.up
+        windows = buf[(self.taps - 1) + offsets[:, None] - self._k[None, :]]
+        out = np.einsum("ij,ij->i", windows, self._phases[phases])
+
+        self._t += n_out * self.down - total
+        self._history = buf[len(buf) - (self.taps - 1):].copy()
+
+        if is_int:
+            return np.clip(np.rint(out), -32768, 32767).astype(np.int16)
+        return out.astype(np.float32)
+
+
+def resample(samples, in_rate, out_rate):
+    """One-shot resampling of a whole signal."""
+    if in_rate == out_rate:
+        return samples
+    return PolyphaseResampler(in_rate, out_rate).process(samples)
+
+
+class AudioCapture:
+    """
+    One microphone stream feeding several consumers at their native rates:
+
+        capture = AudioCapture(device_rate=44100, rates=(16000,))
+        with capture:
+            view = capture.rings[16000].read(4000, timeout=1.0)
+
+    The callback only converts the int16 block to a view, resamples it and
+    writes it into a preallocated ring per rate; nothing is allocated per
+    block except the resampled output. Pass `rings={rate: ring}` to capture
+    into rings the caller already owns.
+    """
+
+    def __init__(self, device_rate=None, rates=(16000,), seconds=None, blocksize=None, overflow="drop_oldest",
+                 rings=None):
+        self.device_rate = int(device_rate or config.AUDIO_DEVICE_RATE)
+        self.blocksize = blocksize or config.AUDIO_BLOCKSIZE
+        seconds = seconds or config.AUDIO_RING_SECONDS
+
+        self.rings = dict(rings or {})
+        self._resamplers = {}
+        for rate in rates:
+            if rate not in self.rings:
+                self.rings[rate] = AudioRingBuffer(int(rate * seconds), max_read=int(rate * seconds) // 2,
+                                                   overflow=overflow)
+        for rate in self.rings:
+            if rate != self.device_rate:
+                self._resamplers[rate] = PolyphaseResampler(self.device_rate, rate)
+
+        self._stream = None
+
+    def _callback(self, indata, frames, time_info, status):
+        if status:
+            print(f"[Audio Status] {status}")
+
+        block = np.frombuffer(indata, dtype=np.int16)
+        for rate, ring in self.rings.items():
+            resampler = self._resamplers.get(rate)
+            ring.write(block if resampler is None else resampler.process(block))
+
+    def start(self):
+        import sounddevice as sd
+
+        for ring in self.rings.values():
+            ring.clear()
+        for resampler in self._resamplers.values():
+            resampler.reset()
+
+        self._stream = sd.RawInputStream(
+            samplerate=self.device_rate,
+            blocksize=self.blocksize,
+            dtype="int16",
+            channels=1,
+            callback=self._callback,
+        )
+        self._stream.start()
+        return self
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# ================================================================
+# Voice activity detection
+# ================================================================
+def frame_features(samples, frame_len):
+    """
+    Per-frame level (dBFS) and zero-crossing rate of int16 samples.
+    Trailing samples that do not fill a frame are ignored.
+    """
+    n = len(samples) // frame_len
+    frames = np.asarray(samples[:n * frame_len], dtype=np.int16).reshape(n, frame_len)
+
+    x = frames.astype(np.float32)
+    rms = np.sqrt(np.mean(x * x, axis=1))
+    db = 20.0 * np.log10(rms / 32768.0 + 1e-10)
+
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame_len - 1)
+    return db, zcr
+
+
+class VoiceActivityDetector:
+    """
+    Energy + zero-crossing VAD with an adaptive noise floor and hangover.
+
+    A frame is speech when its level is VAD_NOISE_MARGIN_DB above the
+    running noise floor (and above VAD_ENERGY_DBFS). Frames barely above
+    threshold with a very high zero-crossing rate are treated as hiss.
+    An utterance starts after VAD_MIN_SPEECH_MS of speech (with
+    VAD_PRE_ROLL_MS of audio before it) and ends after VAD_END_SILENCE_MS
+    of silence; only the first VAD_HANGOVER_MS of a pause is passed on.
+
+    Streaming use (microphone / replayed chunks):
+        speech, ended = vad.process(chunk)   # speech: bytes to feed the recognizer
+
+    The noise floor is estimated from the audio itself, so streams should
+    start with a moment of background (the mic is opened before "Speak now").
+    Offline, pass noise_db=estimate_noise_floor(...) of the whole clip so
+    recordings may start with speech.
+    """
+
+    def __init__(self, sample_rate=16000, noise_db=None):
+        self.sample_rate = sample_rate
+        self.frame_len = int(sample_rate * config.VAD_FRAME_MS / 1000)
+        self.frame_bytes = self.frame_len * 2
+
+        ms = lambda v: max(1, int(round(v / config.VAD_FRAME_MS)))
+        self.min_speech_frames = ms(config.VAD_MIN_SPEECH_MS)
+        self.hangover_frames = ms(config.VAD_HANGOVER_MS)
+        self.end_frames = ms(config.VAD_END_SILENCE_MS)
+        self.pre_roll_frames = ms(config.VAD_PRE_ROLL_MS) + self.min_speech_frames - 1
+
+        self.noise_db = noise_db
+        self.reset()
+
+    def reset(self):
+        # Utterance state only; the noise floor carries over between utterances
+        self.triggered = False
+        self._run = 0
+        self._silence = 0
+        self._pending = b""
+        self._pre_roll = deque(maxlen=self.pre_roll_frames)
+
+    # ------------------------------------------------------------
+    # Frame decisions
+    # ------------------------------------------------------------
+    def _classify(self, db, zcr):
+        flags = np.zeros(len(db), dtype=bool)
+        margin = config.VAD_NOISE_MARGIN_DB
+
+        for i in range(len(db)):
+            level = db[i]
+            if self.noise_db is None:
+                self.noise_db = level
+
+            threshold = max(config.VAD_ENERGY_DBFS, self.noise_db + margin)
+            speech = level > threshold and not (zcr[i] > config.VAD_ZCR_MAX and level < threshold + margin)
+            flags[i] = speech
+
+            # Noise floor: drops immediately, rises slowly and only outside speech
+            if level < self.noise_db:
+                self.noise_db = level
+            elif not speech:
+                self.noise_db += 0.05 * (level - self.noise_db)
+
+        return flags
+
+    def _step(self, speech):
+        # → "wait" | "start" | "speech" | "silence" | "end"
+        if not self.triggered:
+            self._run = self._run + 1 if speech else 0
+            if self._run >= self.min_speech_frames:
+                self.triggered = True
+                self._silence = 0
+                return "start"
+            return "wait"
+
+        if speech:
+            self._silence = 0
+            return "speech"
+
+        self._silence += 1
+        if self._silence >= self.end_frames:
+            self.triggered = False
+            self._run = 0
+            return "end"
+        return "speech" if self._silence <= self.hangover_frames else "silence"
+
+    def _actions(self, samples):
+        db, zcr = frame_features(samples, self.frame_len)
+        for i, speech in enumerate(self._classify(db, zcr)):
+            yield i, self._step(speech)
+
+    # ------------------------------------------------------------
+    # Streaming
+    # ------------------------------------------------------------
+    def process(self, chunk):
+        """
+        Feeds raw int16 PCM bytes. Returns (speech_bytes, ended): the audio
+        that should reach the recognizer, and whether the utterance just
+        ended. Audio after the end is kept for the next utterance.
+        """
+        data = self._pending + chunk
+        n = len(data) // self.frame_bytes
+        self._pending = data[n * self.frame_bytes:]
+        samples = np.frombuffer(data, dtype=np.int16, count=n * self.frame_len)
+
+        out = []
+        fb = self.frame_bytes
+        for i, action in self._actions(samples):
+            frame = data[i * fb:(i + 1) * fb]
+            if action == "wait":
+                self._pre_roll.append(frame)
+            elif action == "start":
+                out.extend(self._pre_roll)
+                out.append(frame)
+                self._pre_roll.clear()
+            elif action == "speech":
+                out.append(frame)
+            elif action == "end":
+                self._pending = data[(i + 1) * fb:]
+                self._pre_roll.clear()
+                return b"".join(out), True
+
+        return b"".join(out), False
+
+
+def _as_samples(pcm):
+    if isinstance(pcm, (bytes, bytearray, memoryview)):
+        return np.frombuffer(pcm, dtype=np.int16)
+    return np.asarray(pcm, dtype=np.int16)
+
+
+def estimate_noise_floor(samples, frame_len):
+    """
+    Background level (dBFS) of a whole clip: a low percentile of its frame
+    levels (VAD_NOISE_PERCENTILE). None for clips shorter than one frame.
+    """
+    db, _ = frame_features(samples, frame_len)
+    if len(db) == 0:
+        return None
+    return float(np.percentile(db, config.VAD_NOISE_PERCENTILE))
+
+
+def speech_segments(pcm, sample_rate=16000):
+    """
+    (start_sample, end_sample) of every utterance in int16 PCM (bytes or array).
+    The noise floor is seeded from the whole clip, not from its first frames.
+    """
+    samples = _as_samples(pcm)
+    vad = VoiceActivityDetector(sample_rate)
+    vad.noise_db = estimate_noise_floor(samples, vad.frame_len)
+    L = vad.frame_len
+
+    segments = []
+    start, last, waiting = None, 0, 0
+    for i, action in vad._actions(samples):
+        if action == "wait":
+            waiting = min(waiting + 1, vad.pre_roll_frames)
+        elif action == "start":
+            start, last, waiting = i - waiting, i, 0
+        elif action == "speech":
+            last = i
+        elif action == "end":
+            segments.append((start * L, (last + 1) * L))
+            start = None
+
+    if start is not None:
+        segments.append((start * L, (last + 1) * L))
+    return segments
+
+
+def trim_silence(pcm, sample_rate=16000):
+    """
+    Drops leading and trailing silence. Returns the same type it was given
+    (bytes or int16 array); empty when no speech is found.
+    """
+    samples = _as_samples(pcm)
+    segments = speech_segments(samples, sample_rate)
+    trimmed = samples[segments[0][0]:segments[-1][1]] if segments else samples[:0]
+    return trimmed.tobytes() if isinstance(pcm, (bytes, bytearray, memoryview)) else trimmed
+
+
+def speech_only(pcm, sample_rate=16000):
+    """Concatenation of the speech segments only (inner pauses removed too)."""
+    samples = _as_samples(pcm)
+    parts = [samples[s:e] for s, e in speech_segments(samples, sample_rate)]
+    joined = np.concatenate(parts) if parts else samples[:0]
+    return joined.tobytes() if isinstance(pcm, (bytes, bytearray, memoryview)) else joined
+
+
+# ================================================================
+# Offline check
+# ================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the VAD over WAV files and report speech segments")
+    parser.add_argument("wav", nargs="+", help="mono 16-bit PCM WAV files")
+    parser.add_argument("--out-dir", help="write trimmed copies here")
+    args = parser.parse_args(argv)
+
+    total_in = total_out = 0.0
+    for path in args.wav:
+        with wave.open(path, "rb") as wf:
+            if wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+                print(f"{path}: skipped (expected mono 16-bit PCM)", file=sys.stderr)
+                continue
+            rate = wf.getframerate()
+            samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+        start = time.perf_counter()
+        segments = speech_segments(samples, rate)
+        elapsed = time.perf_counter() - start
+
+        duration = len(samples) / rate
+        speech = sum(e - s for s, e in segments) / rate
+        total_in += duration
+        total_out += speech
+
+        spans = ", ".join(f"{s / rate:.2f}-{e / rate:.2f}s" for s, e in segments) or "no speech"
+        print(f"{path}: {duration:.2f}s → {speech:.2f}s speech [{spans}] (VAD {elapsed * 1000:.1f}ms)")
+
+        if args.out_dir and segments:
+            os.makedirs(args.out_dir, exist_ok=True)
+            out_path = os.path.join(args.out_dir, os.path.basename(path))
+            with wave.open(out_path, "wb") as out:
+                out.setnchannels(1)
+                out.setsampwidth(2)
+                out.setframerate(rate)
+                out.writeframes(trim_silence(samples, rate).tobytes())
+
+    if total_in:
+        print(f"\n[VAD] {total_in:.2f}s audio → {total_out:.2f}s speech ({1 - total_out / total_in:.1%} removed)")
+
+
+if __name__ == "__main__":
+    main()
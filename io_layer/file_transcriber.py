@@ -0,0 +1,245 @@
+# io_layer/file_transcriber.py
+"""
+Offline transcription of recorded audio (no microphone).
+
+WAV/FLAC files (or directories of them) are streamed in chunks through Vosk
+on a process pool (one Model per worker process), and/or decoded by Whisper
+in batches (clips up to 30 s are padded into one mel batch per forward
+pass). Transcripts go straight into batched intent recognition, and the
+real-time factor of each engine is reported (RTF < 1 = faster than real time).
+
+    python -m io_layer.file_transcriber recordings/ --engine both --model-family LR
+    python -m io_layer.file_transcriber recordings/ --references refs.csv --out results.jsonl
+
+The optional references CSV has columns path,text[,intent] and adds word
+error rate and intent accuracy to the report.
+"""
+
+import os
+import csv
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from core import config
+from io_layer.audio_utils import audio_info, find_audio_files, iter_audio_chunks, load_audio_16k
+
+WHISPER_MAX_SECONDS = 30  # Whisper's fixed input window; longer clips are decoded on their own
+
+
+# ================================================================
+# Vosk (process pool)
+# ================================================================
+_vosk_model = None
+
+
+def _init_vosk_worker(model_path):
+    global _vosk_model
+    from vosk import Model, SetLogLevel
+    SetLogLevel(-1)
+    _vosk_model = Model(model_path)
+
+
+def _vosk_transcribe_file(path, chunk_frames):
+    from vosk import KaldiRecognizer
+
+    rate, n_frames, _ = audio_info(path)
+    recognizer = KaldiRecognizer(_vosk_model, rate)  # Kaldi resamples internally
+
+    start = time.perf_counter()
+    parts = []
+    for data in iter_audio_chunks(path, chunk_frames):
+        if recognizer.AcceptWaveform(data):
+            parts.append(json.loads(recognizer.Result()).get("text", ""))
+    parts.append(json.loads(recognizer.FinalResult()).get("text", ""))
+
+    return {
+        "path": path,
+        "text": " ".join(p for p in parts if p).strip(),
+        "audio_s": n_frames / rate,
+        "decode_s": time.perf_counter() - start,
+    }
+
+
+def transcribe_vosk(paths, workers=None, chunk_frames=8000, model_path=None):
+    workers = workers or config.FILE_STT_WORKERS
+    model_path = model_path or config.VOSK_MODEL_PATH
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_vosk_worker, initargs=(model_path,)) as pool:
+        return list(pool.map(_vosk_transcribe_file, paths, [chunk_frames] * len(paths)))
+
+
+# ================================================================
+# Whisper (batched)
+# ================================================================
+def transcribe_whisper(paths, model_name=None, batch_size=None):
+    import torch
+    import whisper
+
+    model_name = model_name or config.WHISPER_MODEL_NAME
+    batch_size = batch_size or config.FILE_WHISPER_BATCH
+    model = whisper.load_model(model_name, download_root=os.path.join(config.VOICE_MODEL_DIR, model_name))
+    options = whisper.DecodingOptions(language="en", fp16=False, without_timestamps=True)
+
+    results = {}
+    short = []   # (path, seconds); audio is only loaded for the batch being decoded
+    for path in paths:
+        rate, n_frames, _ = audio_info(path)
+        seconds = n_frames / rate
+        if seconds <= WHISPER_MAX_SECONDS:
+            short.append((path, seconds))
+            continue
+
+        start = time.perf_counter()
+        audio = load_audio_16k(path)
+        text = model.transcribe(audio, fp16=False, language="en").get("text", "").strip()
+        results[path] = {"path": path, "text": text, "audio_s": seconds, "decode_s": time.perf_counter() - start}
+
+    for i in range(0, len(short), batch_size):
+        batch = short[i:i + batch_size]
+        audios = [load_audio_16k(path) for path, _ in batch]
+
+        start = time.perf_counter()
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels=model.dims.n_mels)
+            for audio in audios
+        ]).to(model.device)
+        decoded = whisper.decode(model, mels, options)
+        elapsed = time.perf_counter() - start
+
+        # Batch time is shared out by clip length
+        total = sum(s for _, s in batch) or 1.0
+        for (path, seconds), result in zip(batch, decoded):
+            results[path] = {
+                "path": path,
+                "text": result.text.strip(),
+                "audio_s": seconds,
+                "decode_s": elapsed * seconds / total,
+            }
+
+    return [results[p] for p in paths]
+
+
+# ================================================================
+# Scoring
+# ================================================================
+def word_error_rate(reference, hypothesis):
+    ref, hyp = reference.lower().split(), hypothesis.lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        cur = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (r != h))
+        prev = cur
+    return prev[-1] / len(ref)
+
+
+def load_references(path):
+    refs = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            refs[os.path.normpath(row["path"])] = row
+    return refs
+
+
+# ================================================================
+# CLI
+# ================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcribe recorded audio files and recognize their intents")
+    parser.add_argument("inputs", nargs="+", help="WAV/FLAC files or directories")
+    parser.add_argument("--engine", choices=["vosk", "whisper", "both"], default="vosk")
+    parser.add_argument("--workers", type=int, default=config.FILE_STT_WORKERS, help="Vosk worker processes")
+    parser.add_argument("--whisper-model", default=config.WHISPER_MODEL_NAME)
+    parser.add_argument("--whisper-batch", type=int, default=config.FILE_WHISPER_BATCH)
+    parser.add_argument("--model-family", default=config.DEFAULT_MODEL_FAMILY)
+    parser.add_argument("--model-version", default=config.DEFAULT_MODEL_VERSION)
+    parser.add_argument("--no-intent", action="store_true", help="Transcribe only")
+    parser.add_argument("--references", help="CSV with path,text[,intent] for WER / intent accuracy")
+    parser.add_argument("--out", help="Write per-file results as JSON lines")
+    args = parser.parse_args(argv)
+
+    paths = find_audio_files(args.inputs)
+    if not paths:
+        parser.error("no .wav/.flac files found")
+    print(f"[Transcriber] {len(paths)} files")
+
+    engines = ["vosk", "whisper"] if args.engine == "both" else [args.engine]
+    refs = load_references(args.references) if args.references else {}
+
+    recognizer = None
+    if not args.no_intent:
+        from intent_system.intent_recognizer import IntentRecognizer
+        recognizer = IntentRecognizer(model_type=args.model_family, version=args.model_version)
+
+    all_rows = []
+    summaries = []
+    for engine in engines:
+        start = time.perf_counter()
+        if engine == "vosk":
+            rows = transcribe_vosk(paths, workers=args.workers)
+        else:
+            rows = transcribe_whisper(paths, args.whisper_model, args.whisper_batch)
+        wall = time.perf_counter() - start
+
+        if recognizer is not None:
+            start = time.perf_counter()
+            predictions = recognizer.predict_batch([r["text"] for r in rows])
+            intent_s = time.perf_counter() - start
+            for row, (intent, probs) in zip(rows, predictions):
+                row["intent"] = intent
+                row["confidence"] = float(max(probs)) if probs is not None else None
+        else:
+            intent_s = 0.0
+
+        wers, correct, labelled = [], 0, 0
+        for row in rows:
+            row["engine"] = engine
+            ref = refs.get(os.path.normpath(row["path"]))
+            if ref is None:
+                continue
+            row["wer"] = word_error_rate(ref["text"], row["text"])
+            wers.append(row["wer"])
+            if ref.get("intent") and "intent" in row:
+                labelled += 1
+                correct += row["intent"] == ref["intent"]
+
+        for row in rows:
+            print(f"[{engine}] {row['path']}: '{row['text']}'" + (f" → {row['intent']}" if "intent" in row else ""))
+
+        audio = sum(r["audio_s"] for r in rows)
+        decode = sum(r["decode_s"] for r in rows)
+        summaries.append({
+            "engine": engine,
+            "files": len(rows),
+            "audio_s": audio,
+            "decode_s": decode,
+            "wall_s": wall,
+            "rtf": decode / audio if audio else 0.0,
+            "wall_rtf": wall / audio if audio else 0.0,
+            "intent_ms_per_file": intent_s / len(rows) * 1000 if rows else 0.0,
+            "wer": sum(wers) / len(wers) if wers else None,
+            "intent_accuracy": correct / labelled if labelled else None,
+        })
+        all_rows.extend(rows)
+
+    print("\n[Transcriber] engine    files   audio(s)   RTF    wall RTF   intent/file    WER    intent acc")
+    for s in summaries:
+        wer = f"{s['wer']:.1%}" if s["wer"] is not None else "-"
+        acc = f"{s['intent_accuracy']:.1%}" if s["intent_accuracy"] is not None else "-"
+        print(f"[Transcriber] {s['engine']:<8} {s['files']:>6} {s['audio_s']:>10.1f} {s['rtf']:>6.3f} "
+              f"{s['wall_rtf']:>10.3f} {s['intent_ms_per_file']:>10.2f}ms {wer:>7} {acc:>10}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            for row in all_rows:
+                f.write(json.dumps(row) + "\n")
+        print(f"[Transcriber] Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
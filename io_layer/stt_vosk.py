@@ -1,9 +1,10 @@
 #stt_vosk
 import os
-import queue
 import json
-import sounddevice as sd
 from vosk import Model, KaldiRecognizer
+from utils.timer import span
+from core import config
+from io_layer.audio_utils import AudioCapture, AudioRingBuffer, VoiceActivityDetector
 
 class VoskSTT:
     def __init__(self, model_path):
@@ -15,35 +16,85 @@ class VoskSTT:
         self.recognizer = KaldiRecognizer(self.model, 16000)
         self.recognizer.SetWords(False)
         
-        self.audio_queue = queue.Queue()
         self.samplerate = 16000
         self.blocksize = 8000
+        # Mic blocks land in a preallocated ring (no per-block bytes copy / queue node),
+        # resampled from the device rate (INTENTIQ_MIC_RATE) when it isn't 16 kHz
+        self.ring = AudioRingBuffer(self.samplerate * config.AUDIO_RING_SECONDS, max_read=self.blocksize)
+
+        # Silence never reaches Kaldi; end of speech finalizes without waiting for Vosk's endpointer
+        self.vad = VoiceActivityDetector(self.samplerate) if config.VAD_ENABLED else None
     
-    def _callback(self, indata, frames, time, status):
-        #Audio callback pushes mic chunks into queue.
-        if status:
-            print(f"[VOSK ERROR] {status}", flush=True)
-        self.audio_queue.put(bytes(indata))
+    def read_block(self, timeout=None):
+        #Next mic block (memoryview into the ring); None on timeout.
+        return self.ring.read(self.blocksize, timeout=timeout)
         
+    def open_stream(self, ring=None):
+        #Mic capture at config.AUDIO_DEVICE_RATE, written at 16 kHz into `ring` (default self.ring).
+        #Caller owns start/stop or uses it as a context manager (pipelined engine, speculation).
+        blocksize = round(self.blocksize * config.AUDIO_DEVICE_RATE / self.samplerate)
+        ring = self.ring if ring is None else ring
+        return AudioCapture(rates=(self.samplerate,), blocksize=blocksize, rings={self.samplerate: ring})
+
+    def accept_chunk(self, data):
+        #Feeds one audio chunk. Returns the final text when an utterance ends, else None.
+        with span("stt.vosk.decode"):
+            final = self.recognizer.AcceptWaveform(bytes(data))
+
+        if final:
+            result = json.loads(self.recognizer.Result())
+            text = result.get("text", "").strip()
+            if text != "":
+                return text
+        # else:
+        #     partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        #     print("Partial:", partial)
+        return None
+
+    def accept_speech(self, data):
+        #VAD-gated accept_chunk: only speech frames are decoded, and the utterance is
+        #finalized as soon as the VAD hears the end of speech.
+        if self.vad is None:
+            return self.accept_chunk(data)
+
+        speech, ended = self.vad.process(data)
+        text = self.accept_chunk(speech) if speech else None
+        if text is None and ended:
+            text = self.flush() or None
+        return text
+
+    def accept_chunk_streaming(self, data):
+        #Streaming variant of accept_chunk.
+        #Returns (final_text, partial_text): final_text is set ("" for silence) when an
+        #utterance ends, otherwise partial_text holds the current hypothesis.
+        with span("stt.vosk.decode"):
+            final = self.recognizer.AcceptWaveform(bytes(data))
+
+        if final:
+            result = json.loads(self.recognizer.Result())
+            return result.get("text", "").strip(), None
+
+        partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        return None, partial.strip()
+
+    def flush(self):
+        #Forces the final result for any buffered audio (end of a replayed file).
+        result = json.loads(self.recognizer.FinalResult())
+        return result.get("text", "").strip()
+
+    @span("stt.listen")
     def listen(self):
         #Captures one full sentence and returns the transcribed text.
         print("\n[Listening...] Speak now.")
+        if self.vad is not None:
+            self.vad.reset()
+        self.ring.clear()
 
-        with sd.RawInputStream(samplerate = self.samplerate,
-                               blocksize = self.blocksize,
-                               dtype = 'int16',
-                               channels = 1,
-                               callback = self._callback):
+        with self.open_stream():
             while True:
-                data = self.audio_queue.get()
-                
-                if self.recognizer.AcceptWaveform(data):
-                    result = json.loads(self.recognizer.Result())
-                    text = result.get("text", "").strip()
-
-                    if text != "":
-                        print(f"[Voice Captured] : {text}")
-                        return text
-                # else:
-                #     partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
-                #     print("Partial:", partial)
\ No newline at end of file
+                data = self.read_block()
+                text = self.accept_speech(data)
+
+                if text is not None:
+                    print(f"[Voice Captured] : {text}")
+                    return text
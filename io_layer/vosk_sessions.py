@@ -0,0 +1,277 @@
+# io_layer/vosk_sessions.py
+"""
+Many concurrent Vosk audio streams on one loaded model.
+
+The Vosk Model (~2 GB for gigaspeech) is loaded once and shared; each
+session only owns a KaldiRecognizer, taken from a pool and returned on
+close (Reset() makes it reusable), so opening a session is cheap.
+
+    manager = VoskSessionManager()
+    session = manager.open_session(on_result=lambda sid, event: print(sid, event))
+    session.feed(chunk)      # returns immediately; decoded on a worker thread
+    ...
+    manager.close_session(session.id)
+
+Audio of one session is always decoded in order by one worker at a time;
+different sessions run in parallel on VOSK_SESSION_WORKERS threads (Kaldi
+releases the GIL while decoding). Results are delivered to `on_result`
+and also queued on `session.results`:
+
+    {"type": "partial", "text": ...}    # only with partials=True
+    {"type": "final",   "text": ...}
+    {"type": "closed",  "reason": "closed" | "evicted"}
+
+Sessions with no audio for VOSK_SESSION_IDLE_TIMEOUT seconds are evicted.
+"""
+
+import json
+import time
+import queue
+import itertools
+import threading
+from collections import deque
+
+from core import config
+from core.logger import log
+from core.metrics import registry
+from io_layer.audio_utils import VoiceActivityDetector
+
+SESSION_EVENTS = registry.counter(
+    "intentiq_vosk_sessions_total", "Vosk sessions by event (opened, closed, evicted, rejected).", ("event",)
+)
+SESSIONS_ACTIVE = registry.gauge("intentiq_vosk_sessions_active", "Open Vosk sessions.")
+
+
+class SessionLimitReached(RuntimeError):
+    """Raised when VOSK_MAX_SESSIONS sessions are already open."""
+
+
+class VoskSession:
+
+    def __init__(self, manager, session_id, recognizer, on_result=None, partials=False, vad=False,
+                 sample_rate=16000):
+        self._manager = manager
+        self.id = session_id
+        self.recognizer = recognizer
+        self.on_result = on_result
+        self.partials = partials
+        self.vad = VoiceActivityDetector(sample_rate) if vad else None
+
+        self.results = queue.Queue()
+        self.last_activity = time.monotonic()
+        self.closed = False
+
+        # Guarded by the manager's lock
+        self._inbox = deque()
+        self._scheduled = False
+
+    def feed(self, chunk):
+        """Queues raw 16 kHz int16 PCM for this session. Non-blocking."""
+        self._manager._enqueue(self, bytes(chunk))
+
+    def pending(self):
+        """Chunks queued but not decoded yet (for producer-side backpressure)."""
+        return len(self._inbox)
+
+    def _emit(self, event):
+        self.results.put(event)
+        if self.on_result is not None:
+            try:
+                self.on_result(self.id, event)
+            except Exception as e:
+                log.warn("[VoskSessions] on_result callback failed for session %s: %s", self.id, e)
+
+    # Runs on a worker thread, never concurrently for the same session
+    def _decode(self, chunk):
+        if chunk is None:
+            # Close marker: flush what is left
+            text = json.loads(self.recognizer.FinalResult()).get("text", "").strip()
+            if text:
+                self._emit({"type": "final", "text": text})
+            return
+
+        ended = False
+        if self.vad is not None:
+            chunk, ended = self.vad.process(chunk)
+
+        if chunk and self.recognizer.AcceptWaveform(chunk):
+            text = json.loads(self.recognizer.Result()).get("text", "").strip()
+            if text:
+                self._emit({"type": "final", "text": text})
+        elif ended:
+            text = json.loads(self.recognizer.FinalResult()).get("text", "").strip()
+            if text:
+                self._emit({"type": "final", "text": text})
+        elif chunk and self.partials:
+            partial = json.loads(self.recognizer.PartialResult()).get("partial", "").strip()
+            if partial:
+                self._emit({"type": "partial", "text": partial})
+
+
+class VoskSessionManager:
+
+    def __init__(self, model_path=None, model=None, workers=None, sample_rate=16000):
+        """
+        model : an already loaded vosk.Model to share (e.g. VoskSTT.model);
+                otherwise it is loaded once from model_path.
+        """
+        from vosk import Model
+
+        self.sample_rate = sample_rate
+        if model is None:
+            model_path = model_path or config.VOSK_MODEL_PATH
+            log.info(f"[VoskSessions] Loading model from {model_path}...")
+            model = Model(model_path)
+        self.model = model
+
+        self._sessions = {}
+        self._pool = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._work = queue.Queue()
+        self._stopping = threading.Event()
+        self.stats_counts = {"opened": 0, "closed": 0, "evicted": 0, "rejected": 0, "recognizers_created": 0}
+
+        self._workers = [
+            threading.Thread(target=self._worker_loop, name=f"vosk-session-{i}", daemon=True)
+            for i in range(workers or config.VOSK_SESSION_WORKERS)
+        ]
+        for t in self._workers:
+            t.start()
+        threading.Thread(target=self._evict_loop, name="vosk-session-reaper", daemon=True).start()
+
+        SESSIONS_ACTIVE.set_function(lambda: len(self._sessions))
+
+    # ------------------------------------------------------------
+    # Recognizer pool
+    # ------------------------------------------------------------
+    def _acquire_recognizer(self, words):
+        from vosk import KaldiRecognizer
+
+        with self._lock:
+            recognizer = self._pool.pop() if self._pool else None
+        if recognizer is None:
+            recognizer = KaldiRecognizer(self.model, self.sample_rate)
+            self.stats_counts["recognizers_created"] += 1
+        recognizer.SetWords(words)
+        return recognizer
+
+    def _release_recognizer(self, recognizer):
+        recognizer.Reset()
+        with self._lock:
+            if len(self._pool) < config.VOSK_RECOGNIZER_POOL:
+                self._pool.append(recognizer)
+
+    # ------------------------------------------------------------
+    # Sessions
+    # ------------------------------------------------------------
+    def open_session(self, on_result=None, partials=False, vad=None, words=False):
+        if len(self._sessions) >= config.VOSK_MAX_SESSIONS:
+            self._reject()
+
+        recognizer = self._acquire_recognizer(words)
+        with self._lock:
+            # Re-checked under the lock so concurrent opens cannot overshoot the cap
+            full = len(self._sessions) >= config.VOSK_MAX_SESSIONS
+            if not full:
+                session = VoskSession(
+                    self, next(self._ids), recognizer, on_result, partials,
+                    vad=config.VAD_ENABLED if vad is None else vad,
+                    sample_rate=self.sample_rate,
+                )
+                self._sessions[session.id] = session
+        if full:
+            self._release_recognizer(recognizer)
+            self._reject()
+
+        self.stats_counts["opened"] += 1
+        SESSION_EVENTS.inc(event="opened")
+        log.debug("[VoskSessions] Opened session %s", session.id)
+        return session
+
+    def _reject(self):
+        self.stats_counts["rejected"] += 1
+        SESSION_EVENTS.inc(event="rejected")
+        raise SessionLimitReached(f"{config.VOSK_MAX_SESSIONS} Vosk sessions already open")
+
+    def get(self, session_id):
+        return self._sessions.get(session_id)
+
+    def close_session(self, session_id, reason="closed"):
+        """Flushes the final result and returns the recognizer to the pool."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None or session.closed:
+            return
+        session.closed = True
+        self._enqueue(session, None, reason=reason)
+
+    def _enqueue(self, session, chunk, reason=None):
+        with self._lock:
+            if chunk is not None and session.closed:
+                return
+            session._inbox.append((chunk, reason))
+            session.last_activity = time.monotonic()
+            if session._scheduled:
+                return
+            session._scheduled = True
+        self._work.put(session)
+
+    # ------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------
+    def _worker_loop(self):
+        while True:
+            session = self._work.get()
+            if session is None:
+                break
+
+            # Drain this session's inbox; other workers skip it meanwhile
+            while True:
+                with self._lock:
+                    if not session._inbox:
+                        session._scheduled = False
+                        break
+                    chunk, reason = session._inbox.popleft()
+
+                try:
+                    session._decode(chunk)
+                except Exception as e:
+                    log.error("[VoskSessions] Session %s decode failed: %s", session.id, e)
+
+                if chunk is None:
+                    self._finish(session, reason)
+
+    def _finish(self, session, reason):
+        self._release_recognizer(session.recognizer)
+        self.stats_counts[reason] += 1
+        SESSION_EVENTS.inc(event=reason)
+        session._emit({"type": "closed", "reason": reason})
+        log.debug("[VoskSessions] Session %s %s", session.id, reason)
+
+    def _evict_loop(self):
+        while not self._stopping.wait(config.VOSK_SESSION_IDLE_TIMEOUT / 4):
+            cutoff = time.monotonic() - config.VOSK_SESSION_IDLE_TIMEOUT
+            idle = [s.id for s in list(self._sessions.values()) if s.last_activity < cutoff]
+            for session_id in idle:
+                log.info("[VoskSessions] Evicting idle session %s", session_id)
+                self.close_session(session_id, reason="evicted")
+
+    # ------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------
+    def stats(self):
+        out = dict(self.stats_counts)
+        out["active"] = len(self._sessions)
+        out["pooled_recognizers"] = len(self._pool)
+        return out
+
+    def shutdown(self):
+        self._stopping.set()
+        for session_id in list(self._sessions):
+            self.close_session(session_id)
+        for _ in self._workers:
+            self._work.put(None)
+        for t in self._workers:
+            t.join(timeout=5)
+        SESSIONS_ACTIVE.remove_function()
@@ -1,7 +1,44 @@
 # main.py
 # command for running streamlit ui : venv/bin/python3 -m streamlit run ui/app.py
-from core.engine import IntentIQEngine
+#
+# Interactive:  python3 main.py
+# Headless:     python3 main.py --headless --model-family SVC --model-version 2 --input-mode text
+import argparse
+
+from core import config
+from core.warmup import ModelWarmup
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="IntentIQ CLI engine")
+    parser.add_argument("--headless", action="store_true", default=config.HEADLESS,
+                        help="No prompts; unset choices fall back to config / INTENTIQ_* env vars")
+    parser.add_argument("--input-mode", choices=["text", "voice"])
+    parser.add_argument("--model-family", choices=list(config.MODEL_TYPES.keys()))
+    parser.add_argument("--model-version")
+    parser.add_argument("--pipeline", action="store_true", help="Run the pipelined engine")
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    engine = IntentIQEngine()
+    args = parse_args()
+
+    if args.pipeline:
+        config.ENGINE_PIPELINED = True
+
+    # Start loading models before the heavy engine imports and the prompts
+    warmup = ModelWarmup(
+        model_type=args.model_family,
+        version=args.model_version or config.DEFAULT_MODEL_VERSION,
+    ).start()
+
+    from core.engine import IntentIQEngine
+
+    engine = IntentIQEngine(
+        headless=args.headless,
+        input_mode=args.input_mode,
+        model_type=args.model_family,
+        version=args.model_version,
+        warmup=warmup,
+    )
     engine.run()
@@ -1,5 +1,8 @@
 # skills/exit.py
 
+# exit() must run on the caller's thread to stop the process
+EXECUTOR = "inline"
+
 def run(text):
     print("[Task] System shutting down by intent request...")
     exit(0)
\ No newline at end of file
@@ -1,7 +1,28 @@
 # skills/get_time.py
 
 import datetime
+from zoneinfo import ZoneInfo, available_timezones
 
-def run(text):
-    now = datetime.datetime.now().strftime("%H:%M:%S")
-    print(f"[Task] Current time is {now}")
+# Read-only: safe to start on a partial transcript (core/speculation.py)
+SPECULATIVE = True
+
+
+def _find_timezone(location):
+    # "Los Angeles" → America/Los_Angeles, "Sydney" → Australia/Sydney
+    city = str(location).strip().replace(" ", "_").lower()
+    for name in available_timezones():
+        if name.lower().rsplit("/", 1)[-1] == city:
+            return ZoneInfo(name)
+    return None
+
+
+def run(text, params=None):
+    location = (params or {}).get("location")
+    zone = _find_timezone(location) if location else None
+
+    if zone is None:
+        now = datetime.datetime.now().strftime("%H:%M:%S")
+        return f"Current time is {now}"
+
+    now = datetime.datetime.now(zone).strftime("%H:%M:%S")
+    return f"Current time in {location} is {now}"
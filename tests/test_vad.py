@@ -0,0 +1,116 @@
+# tests/test_vad.py
+"""
+Offline VAD checks on synthetic WAV fixtures (io_layer/audio_utils.py).
+
+Each fixture is written to a temporary directory and read back through the
+same wave path as `python -m io_layer.audio_utils`. Boundaries are asserted
+to within one pre-roll / hangover, which is what the VAD adds around speech.
+
+    python -m pytest -q tests/test_vad.py
+"""
+
+import os
+import sys
+import wave
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import config
+from io_layer import audio_utils
+from io_layer.audio_utils import speech_segments, trim_silence
+
+RATE = 16000
+PRE_ROLL = config.VAD_PRE_ROLL_MS / 1000
+HANGOVER = config.VAD_HANGOVER_MS / 1000
+FRAME = config.VAD_FRAME_MS / 1000
+
+
+def _tone(seconds, amplitude=8000, freq=220.0):
+    # Voiced-speech stand-in: low zero-crossing rate, well above the energy floor
+    t = np.arange(int(seconds * RATE)) / RATE
+    return amplitude * np.sin(2 * np.pi * freq * t)
+
+
+def _noise(seconds, amplitude=30, seed=0):
+    # Room background around -60 dBFS
+    return np.random.default_rng(seed).normal(0, amplitude, int(seconds * RATE))
+
+
+def _write_wav(path, *parts):
+    samples = np.clip(np.concatenate(parts), -32768, 32767).astype(np.int16)
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(RATE)
+        wf.writeframes(samples.tobytes())
+    return str(path)
+
+
+def _read_wav(path):
+    with wave.open(path, "rb") as wf:
+        return np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+
+def _seconds(segments):
+    return [(s / RATE, e / RATE) for s, e in segments]
+
+
+@pytest.fixture
+def fixtures(tmp_path):
+    return {
+        "speech_first": _write_wav(tmp_path / "speech_first.wav", _tone(1.0), np.zeros(RATE)),
+        "speech_first_noisy": _write_wav(tmp_path / "speech_first_noisy.wav", _tone(1.0) + _noise(1.0), _noise(1.0)),
+        "centered": _write_wav(tmp_path / "centered.wav", _noise(0.5), _tone(1.0) + _noise(1.0, seed=1), _noise(0.5, seed=2)),
+        "two_utterances": _write_wav(
+            tmp_path / "two_utterances.wav",
+            _noise(0.5), _tone(0.6), _noise(1.5, seed=1), _tone(0.8, freq=180.0), _noise(0.5, seed=2),
+        ),
+        "silence": _write_wav(tmp_path / "silence.wav", _noise(2.0)),
+    }
+
+
+def test_clip_starting_with_speech(fixtures):
+    for name in ("speech_first", "speech_first_noisy"):
+        (start, end), = _seconds(speech_segments(_read_wav(fixtures[name]), RATE))
+        assert start == 0.0
+        assert 1.0 <= end <= 1.0 + HANGOVER + FRAME
+
+
+def test_centered_utterance(fixtures):
+    (start, end), = _seconds(speech_segments(_read_wav(fixtures["centered"]), RATE))
+    assert 0.5 - PRE_ROLL - FRAME <= start <= 0.5
+    assert 1.5 <= end <= 1.5 + HANGOVER + FRAME
+
+
+def test_two_utterances(fixtures):
+    segments = _seconds(speech_segments(_read_wav(fixtures["two_utterances"]), RATE))
+    assert len(segments) == 2
+    (s1, e1), (s2, e2) = segments
+    assert 0.5 - PRE_ROLL - FRAME <= s1 <= 0.5 and 1.1 <= e1 <= 1.1 + HANGOVER + FRAME
+    assert 2.6 - PRE_ROLL - FRAME <= s2 <= 2.6 and 3.4 <= e2 <= 3.4 + HANGOVER + FRAME
+
+
+def test_background_only(fixtures):
+    samples = _read_wav(fixtures["silence"])
+    assert speech_segments(samples, RATE) == []
+    assert len(trim_silence(samples, RATE)) == 0
+
+
+def test_trim_silence_keeps_leading_speech(fixtures):
+    samples = _read_wav(fixtures["speech_first"])
+    trimmed = trim_silence(samples, RATE)
+    assert RATE <= len(trimmed) <= RATE * (1.0 + HANGOVER + FRAME)
+    assert isinstance(trim_silence(samples.tobytes(), RATE), bytes)
+
+
+def test_cli_writes_trimmed_copies(fixtures, tmp_path, capsys):
+    out_dir = tmp_path / "trimmed"
+    audio_utils.main([fixtures["speech_first"], fixtures["centered"], "--out-dir", str(out_dir)])
+
+    for name in ("speech_first", "centered"):
+        written = _read_wav(str(out_dir / f"{name}.wav"))
+        assert RATE <= len(written) <= RATE * (1.0 + PRE_ROLL + HANGOVER + 2 * FRAME)
+    assert "no speech" not in capsys.readouterr().out
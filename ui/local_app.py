@@ -10,6 +10,7 @@ import pandas as pd
 import streamlit as st
 from core import config
 from intent_system.intent_recognizer import IntentRecognizer
+from intent_system.registry import get_registry
 
 # ---------------------------------------------------------
 # PAGE CONFIG
@@ -20,13 +21,29 @@ st.set_page_config(
     layout="centered"
 )
 
+# ---------------------------------------------------------
+# SHARED MODEL CACHE (one copy per process, shared by all sessions)
+# ---------------------------------------------------------
+@st.cache_resource(show_spinner=False)
+def load_recognizer(model_type, version):
+    recognizer = IntentRecognizer(model_type=model_type, version=version)
+    recognizer.warmup()
+    return recognizer
+
+
+@st.cache_data(ttl=config.UI_VERSION_CACHE_TTL, show_spinner=False)
+def list_versions(model_type):
+    return get_registry(model_type).versions()
+
+
 # ---------------------------------------------------------
 # SESSION STATE INITIALIZATION
 # ---------------------------------------------------------
-if "recognizer" not in st.session_state:
-    st.session_state.recognizer = None
-if "loaded_model_info" not in st.session_state:
-    st.session_state.loaded_model_info = None
+# Sessions only remember which model they picked; the model itself lives in the cache
+if "loaded_model_key" not in st.session_state:
+    st.session_state.loaded_model_key = None
+if "batch_results" not in st.session_state:
+    st.session_state.batch_results = None
 
 # ---------------------------------------------------------
 # TITLE + DESCRIPTION
@@ -37,7 +54,7 @@ st.markdown("""
 
 This demo lets you test IntentIQ using:
 - Sentence Transformer embeddings  
-- ML classifier families (LR / SVC)  
+- ML classifier families (LR / SVC / Hierarchical)  
 - Versioned models (v1, v2, …)  
 - Dynamic skill routing  
 
@@ -67,7 +84,7 @@ if input_mode == "Voice Input (Disabled)":
 # ---------------------------------------------------------
 st.subheader("Select Model Family")
 
-model_families = ["LR", "SVC", "NeuralNet (coming soon)"]
+model_families = ["LR", "SVC", "Hierarchical", "NeuralNet (coming soon)"]
 
 model_choice = st.radio(
     "Choose a model type:",
@@ -79,7 +96,7 @@ if "NeuralNet" in model_choice:
     st.warning("NeuralNet is not implemented yet.")
     st.stop()
 
-real_model_type = model_choice  # LR or SVC
+real_model_type = model_choice  # LR, SVC or Hierarchical
 
 
 # ---------------------------------------------------------
@@ -87,21 +104,18 @@ real_model_type = model_choice  # LR or SVC
 # ---------------------------------------------------------
 st.subheader("Select Model Version")
 
-model_dir = config.MODEL_TYPES[real_model_type]
-versions = [
-    f.split("_v")[1].split(".")[0]
-    for f in os.listdir(model_dir)
-    if f.startswith("classifier_v")
-]
+versions = list_versions(real_model_type)
 
 if not versions:
-    st.error(f"No trained models found in: {model_dir}")
+    st.error(f"No trained models found in: {config.MODEL_TYPES[real_model_type]}")
     st.stop()
 
+production = get_registry(real_model_type).aliases().get(config.MODEL_PRODUCTION_ALIAS)
 version_choice = st.radio(
     "Choose model version:",
     versions,
-    index=0
+    index=versions.index(production) if production in versions else 0,
+    format_func=lambda v: f"{v} (production)" if v == production else v,
 )
 
 # ---------------------------------------------------------
@@ -110,18 +124,16 @@ version_choice = st.radio(
 if st.button("Load Model"):
     with st.spinner("Loading selected model..."):
         try:
-            recognizer = IntentRecognizer(
-                model_type=real_model_type,
-                version=version_choice
-            )
-            st.session_state.recognizer = recognizer
-            st.session_state.loaded_model_info = f"{real_model_type} v{version_choice}"
+            load_recognizer(real_model_type, version_choice)
+            st.session_state.loaded_model_key = (real_model_type, version_choice)
+            st.session_state.batch_results = None
             st.success(f"Model {real_model_type} v{version_choice} loaded successfully!")
         except Exception as e:
             st.error(f"Failed to load model: {e}")
 
-if st.session_state.loaded_model_info:
-    st.info(f"✅ Loaded Model: **{st.session_state.loaded_model_info}**")
+if st.session_state.loaded_model_key:
+    loaded_type, loaded_version = st.session_state.loaded_model_key
+    st.info(f"✅ Loaded Model: **{loaded_type} v{loaded_version}**")
 
 st.divider()
 
@@ -131,10 +143,78 @@ st.divider()
 st.subheader("Enter Text")
 
 # Show warning if model is not loaded
-if st.session_state.recognizer is None:
+if st.session_state.loaded_model_key is None:
     st.warning("⚠ Please load a model before running predictions.")
     st.stop()
 
+recognizer = load_recognizer(*st.session_state.loaded_model_key)
+
+scoring_mode = st.radio(
+    "Scoring mode:",
+    ["Single Text", "Batch CSV Upload"],
+    index=0,
+    horizontal=True
+)
+
+# ---------------------------------------------------------
+# BATCH CSV SCORING
+# ---------------------------------------------------------
+if scoring_mode == "Batch CSV Upload":
+    uploaded = st.file_uploader("Upload a CSV file", type=["csv"])
+    if uploaded is None:
+        st.stop()
+
+    # Results belong to the file they were computed from
+    source = (uploaded.name, uploaded.size)
+    if st.session_state.get("batch_source") != source:
+        st.session_state.batch_source = source
+        st.session_state.batch_results = None
+
+    data = pd.read_csv(uploaded)
+    if data.empty:
+        st.warning("The uploaded CSV has no rows.")
+        st.stop()
+
+    columns = list(data.columns)
+    text_column = st.selectbox(
+        "Text column:",
+        columns,
+        index=columns.index("text") if "text" in columns else 0
+    )
+    st.caption(f"{len(data)} rows")
+
+    if st.button("Score CSV"):
+        texts = data[text_column].fillna("").astype(str).tolist()
+        batch_size = config.UI_BATCH_SIZE
+        intents, confidences = [], []
+
+        progress = st.progress(0.0, text="Scoring...")
+        for start in range(0, len(texts), batch_size):
+            for intent, probs in recognizer.predict_batch(texts[start:start + batch_size], batch_size):
+                intents.append(intent)
+                confidences.append(round(float(max(probs)), 4) if probs is not None else None)
+            done = min(start + batch_size, len(texts))
+            progress.progress(done / len(texts), text=f"Scored {done}/{len(texts)} rows")
+
+        results = data.copy()
+        results["predicted_intent"] = intents
+        results["confidence"] = confidences
+        st.session_state.batch_results = results
+
+    results = st.session_state.batch_results
+    if results is not None:
+        st.write("### Predicted Intent Counts")
+        st.bar_chart(results["predicted_intent"].value_counts())
+
+        st.dataframe(results, use_container_width=True)
+        st.download_button(
+            "Download results (CSV)",
+            data=results.to_csv(index=False).encode("utf-8"),
+            file_name="intent_predictions.csv",
+            mime="text/csv"
+        )
+    st.stop()
+
 user_text = st.text_input("Type a command or phrase:")
 
 if st.button("Run Intent Recognition"):
@@ -142,8 +222,6 @@ if st.button("Run Intent Recognition"):
         st.warning("Enter some text first.")
         st.stop()
 
-    recognizer = st.session_state.recognizer
-
     with st.spinner("Running inference..."):
         intent, probs = recognizer.predict_intent(user_text)
 
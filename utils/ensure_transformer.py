@@ -1,8 +1,10 @@
 # utils/ensure_transformer.py
 
 import os
+import threading
 from sentence_transformers import SentenceTransformer
 from core import config
+from core.metrics import record_cache
 
 def get_transformer_model():
     model_dir = config.TRANSFORMER_PATH
@@ -10,10 +12,12 @@ def get_transformer_model():
     # If folder already contains model → load it
     if os.path.exists(model_dir) and os.listdir(model_dir):
         print(f"[TRANSFORMER] Using cached model at {model_dir}")
+        record_cache("transformer_disk", hit=True)
         return SentenceTransformer(model_dir)
 
     # Folder exists but empty → first-time download
     print("[TRANSFORMER] Downloading model for first-time setup...")
+    record_cache("transformer_disk", hit=False)
     os.makedirs(model_dir, exist_ok=True)
 
     # IMPORTANT: download using model *name*, not folder path
@@ -24,3 +28,17 @@ def get_transformer_model():
 
     print(f"[TRANSFORMER] Saved model to {model_dir}")
     return model
+
+
+# Process-wide shared instance (engine warm-up, recognizers, UI sessions)
+_shared_model = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_transformer_model():
+    global _shared_model
+    if _shared_model is None:
+        with _shared_lock:
+            if _shared_model is None:
+                _shared_model = get_transformer_model()
+    return _shared_model
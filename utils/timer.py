@@ -0,0 +1,275 @@
+# utils/timer.py
+"""
+Low-overhead tracing spans for IntentIQ.
+
+    from utils.timer import span, start_trace
+
+    with span("recognizer.embed"):
+        ...
+
+    @span("router.route")
+    def route(...):
+        ...
+
+    with start_trace("request") as trace:
+        ...
+    trace.breakdown()   # {"recognizer.embed": 3.1, ...} in milliseconds
+
+Spans are recorded when either:
+- tracing is enabled globally (config.TRACING_ENABLED / INTENTIQ_TRACE=1),
+  in which case durations are aggregated into in-memory histograms, or
+- a trace is active in the current context (start_trace), in which case the
+  span is attached to that trace for a per-request breakdown.
+
+When neither is true a span costs one bool check and one ContextVar lookup.
+The active trace lives in a ContextVar, so it follows asyncio tasks
+automatically; use `bind()` to carry it into worker threads.
+"""
+
+import time
+import bisect
+import functools
+import threading
+import contextvars
+import inspect
+
+from core import config
+from core.logger import current_request_id
+
+_enabled = config.TRACING_ENABLED
+_current_trace = contextvars.ContextVar("intentiq_trace", default=None)
+_clock = time.perf_counter_ns
+
+
+# ================================================================
+# Global switch
+# ================================================================
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+# ================================================================
+# Histograms
+# ================================================================
+# Exponential bucket upper bounds: 1µs, 2µs, 4µs ... ~68s (in ns)
+BUCKET_BOUNDS_NS = tuple(1000 * (2 ** i) for i in range(27))
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (nanosecond input)."""
+
+    __slots__ = ("counts", "count", "total_ns", "min_ns", "max_ns", "_lock")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_NS) + 1)
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+        self._lock = threading.Lock()
+
+    def record(self, duration_ns):
+        idx = bisect.bisect_left(BUCKET_BOUNDS_NS, duration_ns)
+        with self._lock:
+            self.counts[idx] += 1
+            self.count += 1
+            self.total_ns += duration_ns
+            if self.min_ns is None or duration_ns < self.min_ns:
+                self.min_ns = duration_ns
+            if duration_ns > self.max_ns:
+                self.max_ns = duration_ns
+
+    def percentile(self, pct):
+        # Upper bound of the bucket containing the percentile
+        if not self.count:
+            return 0
+        target = self.count * pct / 100.0
+        running = 0
+        for idx, c in enumerate(self.counts):
+            running += c
+            if running >= target:
+                bound = BUCKET_BOUNDS_NS[idx] if idx < len(BUCKET_BOUNDS_NS) else self.max_ns
+                return min(bound, self.max_ns)
+        return self.max_ns
+
+    def snapshot(self):
+        with self._lock:
+            count = self.count
+            mean = self.total_ns / count if count else 0
+            return {
+                "count": count,
+                "mean_ms": mean / 1e6,
+                "min_ms": (self.min_ns or 0) / 1e6,
+                "max_ms": self.max_ns / 1e6,
+                "p50_ms": self.percentile(50) / 1e6,
+                "p95_ms": self.percentile(95) / 1e6,
+                "p99_ms": self.percentile(99) / 1e6,
+                "buckets": list(self.counts),
+            }
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def _histogram(name):
+    hist = _histograms.get(name)
+    if hist is None:
+        with _histograms_lock:
+            hist = _histograms.setdefault(name, Histogram())
+    return hist
+
+
+def get_histograms():
+    return {name: h.snapshot() for name, h in list(_histograms.items())}
+
+
+def reset_histograms():
+    with _histograms_lock:
+        _histograms.clear()
+
+
+def report():
+    """Human-readable summary of all aggregated spans."""
+    lines = [f"{'span':<32} {'count':>7} {'mean':>10} {'p50<=':>10} {'p95<=':>10} {'max':>10}"]
+    for name, s in sorted(get_histograms().items()):
+        lines.append(
+            f"{name:<32} {s['count']:>7} {s['mean_ms']:>8.2f}ms {s['p50_ms']:>8.2f}ms "
+            f"{s['p95_ms']:>8.2f}ms {s['max_ms']:>8.2f}ms"
+        )
+    return "\n".join(lines)
+
+
+# ================================================================
+# Traces (per-request span collection)
+# ================================================================
+class Trace:
+    def __init__(self, name):
+        self.name = name
+        self.request_id = current_request_id()   # joins traces with JSON-lines logs
+        self.spans = []          # (name, depth, duration_ns)
+        self.depth = 0
+        self.start_ns = _clock()
+        self.duration_ns = None
+
+    def add(self, name, depth, duration_ns):
+        self.spans.append((name, depth, duration_ns))
+
+    def breakdown(self):
+        """Milliseconds per span name (repeated spans are summed)."""
+        out = {}
+        for name, _, ns in self.spans:
+            out[name] = out.get(name, 0.0) + ns / 1e6
+        if self.duration_ns is not None:
+            out[self.name] = self.duration_ns / 1e6
+        return out
+
+
+class start_trace:
+    """Context manager that collects every span opened inside it."""
+
+    def __init__(self, name="request"):
+        self.trace = Trace(name)
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current_trace.set(self.trace)
+        return self.trace
+
+    def __exit__(self, exc_type, exc, tb):
+        self.trace.duration_ns = _clock() - self.trace.start_ns
+        _current_trace.reset(self._token)
+        if _enabled:
+            _histogram(self.trace.name).record(self.trace.duration_ns)
+        return False
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def bind(fn):
+    """
+    Wraps fn so it runs inside a copy of the caller's context.
+    Use when handing work to threads / executors so spans still attach
+    to the originating request's trace.
+    """
+    ctx = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return ctx.run(fn, *args, **kwargs)
+
+    return wrapper
+
+
+# ================================================================
+# Spans
+# ================================================================
+class span:
+    """
+    Times a block (context manager) or a function (decorator).
+    Works with both sync and async functions.
+    """
+
+    __slots__ = ("name", "_start", "_trace")
+
+    def __init__(self, name):
+        self.name = name
+        self._start = 0
+        self._trace = None
+
+    def __enter__(self):
+        trace = _current_trace.get()
+        if not _enabled and trace is None:
+            self._start = 0
+            return self
+
+        self._trace = trace
+        if trace is not None:
+            trace.depth += 1
+        self._start = _clock()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self._start:
+            return False
+
+        duration = _clock() - self._start
+        trace = self._trace
+        if trace is not None:
+            trace.depth -= 1
+            trace.add(self.name, trace.depth, duration)
+            self._trace = None
+        if _enabled:
+            _histogram(self.name).record(duration)
+        return False
+
+    def __call__(self, fn):
+        name = self.name
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled and _current_trace.get() is None:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper